@@ -0,0 +1,226 @@
+"""
+Benchmark suite for the QR generation pipeline.
+
+Usage:
+    python benchmarks/run_benchmarks.py                      # run and compare to baseline
+    python benchmarks/run_benchmarks.py --quick              # smaller matrix for CI
+    python benchmarks/run_benchmarks.py --update-baseline    # store current results as baseline
+    python benchmarks/run_benchmarks.py --filter generate/Rounded
+
+Results are written as JSON. The run exits with status 1 when any case's
+median time exceeds the stored baseline by more than the threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from PIL import Image
+
+from core.batch_formatter import BatchFormatter
+from core.models import ErrorCorrection, QRStyle, QRConfig, QRType
+from core.serial_template import SerialTemplate
+from core.qr_generator import QRGenerator
+from services.file_service import FileService
+from services.history_service import HistoryService
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+DEFAULT_OUTPUT = BENCH_DIR / "results.json"
+
+PAYLOAD_LENGTHS = [16, 128, 512]
+BOX_SIZES = [5, 10, 20]
+HISTORY_SIZES = [0, 50, 100]
+SAVE_FORMATS = ['.png', '.jpg', '.bmp', '.gif']
+BATCH_ROWS = 10000
+
+
+def payload(length: int) -> str:
+    """Deterministic payload of the given length"""
+    seed = "https://example.com/product?id=0123456789&ref=benchmark-"
+    return (seed * (length // len(seed) + 1))[:length]
+
+
+def measure(func: Callable[[], object], minTime: float, maxRuns: int) -> Dict[str, float]:
+    """Time func repeatedly after one warm-up call"""
+    func()
+    samples: List[float] = []
+    started = time.perf_counter()
+    while len(samples) < maxRuns and (len(samples) < 3 or time.perf_counter() - started < minTime):
+        t0 = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - t0)
+    
+    median = statistics.median(samples)
+    return {
+        'runs': len(samples),
+        'median_ms': median * 1000,
+        'min_ms': min(samples) * 1000,
+        'mean_ms': statistics.fmean(samples) * 1000,
+        'ops_per_sec': 1 / median if median else 0.0,
+    }
+
+
+def buildCases(quick: bool, workDir: str) -> List[Tuple[str, Callable[[], object]]]:
+    """Assemble every benchmark case as (name, callable)"""
+    cases: List[Tuple[str, Callable[[], object]]] = []
+    lengths = PAYLOAD_LENGTHS[:2] if quick else PAYLOAD_LENGTHS
+    boxSizes = [10] if quick else BOX_SIZES
+    
+    # Generation: every style x error correction level, over payload lengths and box sizes
+    for style in QRStyle:
+        for ec in ErrorCorrection:
+            for length in lengths:
+                for boxSize in boxSizes:
+                    content = payload(length)
+                    name = f"generate/{style.value}/{ec.name}/len{length}/box{boxSize}"
+                    cases.append((name, lambda c=content, e=ec, b=boxSize, s=style: QRGenerator.generate(
+                        content=c, errorCorrection=e, boxSize=b, border=4,
+                        fgColor="#000000", bgColor="#FFFFFF", style=s
+                    )))
+    
+    baseImage = QRGenerator.generate(
+        content=payload(128), errorCorrection=ErrorCorrection.HIGH, boxSize=10, border=4,
+        fgColor="#000000", bgColor="#FFFFFF", style=QRStyle.SQUARE
+    )
+    
+    # Logo compositing
+    logoPath = os.path.join(workDir, "logo.png")
+    Image.new('RGBA', (256, 256), (37, 99, 235, 255)).save(logoPath)
+    cases.append(("addLogo/ratio0.3", lambda: QRGenerator.addLogo(baseImage, logoPath, 0.3)))
+    
+    # Saving per format
+    for ext in SAVE_FORMATS:
+        target = os.path.join(workDir, f"save{ext}")
+        cases.append((f"saveImage/{ext.lstrip('.')}", lambda t=target: FileService.saveImage(baseImage, t)))
+    
+    # History writes at various existing sizes
+    config = QRConfig(
+        content=payload(100), qrType="URL", errorCorrection="HIGH", boxSize=10, border=4,
+        fgColor="#000000", bgColor="#FFFFFF", style="Square", timestamp=datetime.now().isoformat()
+    )
+    for size in HISTORY_SIZES:
+        historyPath = os.path.join(workDir, f"history_{size}.json")
+        history = HistoryService(historyFile=historyPath, maxEntries=max(size, 1) + 1)
+        
+        def addEntry(h=history, n=size):
+            # Keep the history at a constant size so every sample does the same work
+            h.history = [config.toDict()] * n
+            h.add(config)
+        
+        cases.append((f"history.add/size{size}", addEntry))
+    
+    # Encoding against a prebuilt serial template versus a full encode
+    serialPayload = payload(48) + "000123"
+    template = SerialTemplate.forPayloads([serialPayload], ErrorCorrection.HIGH)
+    cases.append(("encode/full/len54", lambda: QRGenerator.getMatrix(serialPayload, ErrorCorrection.HIGH)))
+    cases.append(("encode/serialTemplate/len54", lambda: template.encode(serialPayload)))
+    
+    # Batch payload formatting from column arrays
+    for qrType in (QRType.WIFI, QRType.VCARD):
+        formatter = BatchFormatter(qrType)
+        columns = {name: [f"{name};{i},x:y" for i in range(BATCH_ROWS)] for name in formatter.fieldNames}
+        cases.append((
+            f"batchFormat/{qrType.value}/rows{BATCH_ROWS}",
+            lambda f=formatter, c=columns: sum(1 for _ in f.formatColumns(c))
+        ))
+    
+    # Preview rendering (thumbnail step of PreviewPanel.updateImage; PhotoImage needs a display)
+    try:
+        from ui.preview_panel import PreviewPanel
+        largeImage = QRGenerator.generate(
+            content=payload(128), errorCorrection=ErrorCorrection.HIGH, boxSize=20, border=4,
+            fgColor="#000000", bgColor="#FFFFFF", style=QRStyle.ROUNDED
+        )
+        cases.append(("preview/prepareImage", lambda: PreviewPanel.prepareImage(largeImage)))
+    except ImportError as e:
+        print(f"Skipping preview benchmark: {e}", file=sys.stderr)
+    
+    return cases
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """Return descriptions of cases slower than baseline by more than threshold"""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        limit = reference['median_ms'] * (1 + threshold)
+        if result['median_ms'] > limit:
+            regressions.append(
+                f"{name}: {result['median_ms']:.3f} ms vs baseline {reference['median_ms']:.3f} ms "
+                f"(+{(result['median_ms'] / reference['median_ms'] - 1) * 100:.1f}%)"
+            )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="QR generation benchmarks")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="where to write JSON results")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--update-baseline", action="store_true", help="write results to the baseline file")
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this text")
+    parser.add_argument("--quick", action="store_true", help="reduced case matrix")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per case")
+    parser.add_argument("--max-runs", type=int, default=200, help="maximum samples per case")
+    args = parser.parse_args(argv)
+    
+    results: Dict[str, Dict] = {}
+    with tempfile.TemporaryDirectory() as workDir:
+        for name, func in buildCases(args.quick, workDir):
+            if args.filter and args.filter not in name:
+                continue
+            results[name] = measure(func, args.min_time, args.max_runs)
+            print(f"{name:<55} {results[name]['median_ms']:>10.3f} ms  ({results[name]['runs']} runs)")
+    
+    document = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+    
+    if not os.path.exists(args.baseline):
+        print("No baseline found; run with --update-baseline to create one")
+        return 0
+    
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f).get('results', {})
+    
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    
+    print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -18,25 +18,28 @@ APP_DIR = os.path.join(BASE_DIR, "QRGeneratorPro")
 os.makedirs(APP_DIR, exist_ok=True)
 logFile = os.path.join(APP_DIR, 'qr_generator.log')
 
-from ui.main_window import QRGeneratorView
-from core.controller import QRGeneratorController
-from core.models import QRGeneratorModel
-from services.settings_service import SettingsService
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(logFile),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
 
-def main():
-    """Application entry point"""
+def setupLogging(consoleLevel: int = logging.INFO) -> None:
+    """Configure queued file and console logging with per-module levels"""
+    from services.logging_service import LoggingService
+    from services.settings_service import SettingsService
+    
+    LoggingService(logFile, consoleLevel).start()
+    
+    # Per-module levels from settings, overridden by QRGEN_LOG_LEVELS="core.qr_generator=WARNING,..."
+    LoggingService.applyLevels(SettingsService().get("log_levels", {}))
+    LoggingService.applyLevels(LoggingService.parseLevels(os.getenv('QRGEN_LOG_LEVELS', '')))
+
+
+def runGui():
+    """Start the desktop application"""
+    from ui.main_window import QRGeneratorView
+    from core.controller import QRGeneratorController
+    from core.models import QRGeneratorModel
+    from services.settings_service import SettingsService
+    
     try:
         logger.info("=" * 60)
         logger.info("QR Code Generator Pro - Starting")
@@ -58,11 +61,51 @@ def main():
         view.mainloop()
         
     except Exception as e:
-        logger.critical(f"Application crashed: {e}", exc_info=True)
+        logger.critical("Application crashed: %s", e, exc_info=True)
         raise
     finally:
+        from core.timing import stageTimer
+        if stageTimer.enabled:
+            stageTimer.logSummary()
         logger.info("Application terminated")
 
 
+def main():
+    """Application entry point"""
+    args = sys.argv[1:]
+    
+    # Subcommands import only core and services, never the Tk UI
+    if args and args[0] == "generate":
+        # Keep stderr quiet for scripted use; the log file still gets everything
+        setupLogging(consoleLevel=logging.WARNING)
+        from cli.generate import main as generateMain
+        return generateMain(args[1:])
+    
+    if args and args[0] == "verify":
+        setupLogging(consoleLevel=logging.WARNING)
+        from cli.verify import main as verifyMain
+        return verifyMain(args[1:])
+    
+    setupLogging()
+    
+    if args and args[0] == "serve":
+        from server.http_server import main as serveMain
+        return serveMain(args[1:])
+    
+    if args and args[0] == "daemon":
+        from server.daemon import main as daemonMain
+        return daemonMain(args[1:])
+    
+    if args and args[0] == "watch":
+        from server.watcher import main as watchMain
+        return watchMain(args[1:])
+    
+    runGui()
+    return 0
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Frozen builds re-enter here in batch worker processes
+    import multiprocessing
+    multiprocessing.freeze_support()
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,7 @@
+from .generate import main as generateMain
+from .verify import main as verifyMain
+
+__all__ = [
+    'generateMain',
+    'verifyMain'
+]
\ No newline at end of file
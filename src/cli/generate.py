@@ -0,0 +1,247 @@
+import argparse
+import csv
+import logging
+import os
+import sys
+
+from core.batch_formatter import BatchFormatter
+from core.models import QRType, ErrorCorrection, RenderOptions
+from core.serial_template import SerialTemplate, serialPayloads
+from core.styles import QUALITY_LEVELS
+from core.structured_append import StructuredAppend
+from services.batch_service import BatchRunner
+from services.disk_cache import DiskCache
+from services.print_service import PrintRenderer, PrintSpec, parseLength
+from services.export_service import DirectoryExportSink, ZipExportSink
+from services.fanout_service import ExportTarget, FanOutExporter
+from services.settings_service import SettingsService
+from services.sheet_service import LabelSheetExporter, SHEET_PRESETS
+from services.render_service import RenderService
+
+logger = logging.getLogger(__name__)
+
+# Payload fields accepted by QRGeneratorModel.formatContent, per type
+TYPE_FIELDS = {
+    QRType.TEXT: ['text'],
+    QRType.URL: ['url'],
+    QRType.EMAIL: ['email', 'subject', 'body'],
+    QRType.PHONE: ['phone'],
+    QRType.WIFI: ['ssid', 'password', 'security', 'hidden'],
+    QRType.VCARD: ['name', 'phone', 'email', 'organization'],
+}
+
+ALL_FIELDS = sorted({field for names in TYPE_FIELDS.values() for field in names})
+
+
+def buildParser() -> argparse.ArgumentParser:
+    """Create the argument parser for the generate command"""
+    parser = argparse.ArgumentParser(
+        prog="main.py generate",
+        description="Generate a QR code without starting the GUI"
+    )
+    parser.add_argument("--type", default=QRType.TEXT.value, help="one of: " + ", ".join(t.value for t in QRType))
+    parser.add_argument("-o", "--output", default="-", help="output file, or - for stdout (default)")
+    parser.add_argument("--format", help="PNG, JPEG, BMP, GIF or SVG (default: from output extension)")
+    parser.add_argument(
+        "--formats", help='write several formats from one render, e.g. "png,jpg@512,svg"; -o gives the base name'
+    )
+    
+    fields = parser.add_argument_group("payload fields")
+    for name in ALL_FIELDS:
+        if name == 'hidden':
+            fields.add_argument("--hidden", action="store_true", help="WiFi network is hidden")
+        else:
+            fields.add_argument(f"--{name}", help="use - to read the value from stdin")
+    
+    render = parser.add_argument_group("render options")
+    render.add_argument("--error-correction", dest="errorCorrection", choices=[e.name for e in ErrorCorrection])
+    render.add_argument("--box-size", dest="boxSize", type=int)
+    render.add_argument("--border", type=int)
+    render.add_argument("--fg", dest="fgColor")
+    render.add_argument("--bg", dest="bgColor")
+    render.add_argument("--style", help="module style: Square, Rounded, Circle, Gapped or a plugin style")
+    render.add_argument(
+        "--quality", choices=QUALITY_LEVELS, help="antialiasing of curved styles; none gives 1-bit edges (default: high)"
+    )
+    render.add_argument(
+        "--fill", help='foreground fill instead of --fg: "linear:#F00,#00F[,ANGLE]", "radial:#F00,#00F" or "image:PATH"'
+    )
+    
+    serial = parser.add_argument_group("serial numbers", "append an incrementing serial to the payload and write a ZIP")
+    serial.add_argument("--serial-count", dest="serialCount", type=int, help="number of codes to generate")
+    serial.add_argument("--serial-start", dest="serialStart", type=int, default=1)
+    serial.add_argument("--serial-width", dest="serialWidth", type=int, default=0, help="zero-pad serials to this width")
+    
+    printing = parser.add_argument_group(
+        "print size", "render at a physical size instead of --box-size; writes a PNG tagged with the DPI"
+    )
+    printing.add_argument("--print-size", dest="printSize", help='edge length including the border, e.g. "30cm", "120mm", "4in"')
+    printing.add_argument("--dpi", type=float, default=300.0, help="print resolution (default 300)")
+    
+    batch = parser.add_argument_group(
+        "batch", "render one code per CSV row into a ZIP (-o codes.zip) or a directory (-o codes/)"
+    )
+    batch.add_argument("--batch", help="CSV file whose columns are named after the payload fields")
+    batch.add_argument("--columns", help='map fields to other column names, e.g. "url=Link,name=Full Name"')
+    batch.add_argument(
+        "--no-dedup", dest="dedup", action="store_false", help="render repeated payloads again instead of linking them"
+    )
+    
+    linked = parser.add_argument_group(
+        "structured append", "split a large payload across up to 16 linked symbols, written as a ZIP or PDF sheet"
+    )
+    linked.add_argument("--structured-append", dest="structuredAppend", action="store_true")
+    linked.add_argument("--max-version", dest="maxVersion", type=int, default=10, help="largest symbol version (default 10)")
+    linked.add_argument("--sheet", choices=sorted(SHEET_PRESETS), default="Avery L7163", help="label sheet for PDF output")
+    return parser
+
+
+def writeSerials(content: str, options: RenderOptions, fileFormat: str, args) -> int:
+    """Render content + serial for each serial number into a ZIP archive"""
+    if args.output == "-" or not args.output.lower().endswith(".zip"):
+        raise ValueError("serial mode writes a ZIP archive; use -o codes.zip")
+    if fileFormat == 'SVG':
+        raise ValueError("serial mode supports raster formats only")
+    
+    payloads = list(serialPayloads(content, args.serialStart, args.serialCount, args.serialWidth))
+    # Every serial shares one version, so the static layer is built once for the whole run
+    template = SerialTemplate.forPayloads([payloads[0], payloads[-1]], options.errorCorrection)
+    with ZipExportSink(args.output, imageFormat=fileFormat) as sink:
+        for payload, image in template.generateSeries(payloads, options):
+            sink.add(image, payload)
+    logger.info("%s serial codes written: %s", len(payloads), args.output)
+    return 0
+
+
+def writeBatch(qrType: str, options: RenderOptions, fileFormat: str, args) -> int:
+    """Render every row of a CSV file into a ZIP archive or directory"""
+    if args.output == "-":
+        raise ValueError("batch mode writes a ZIP archive or directory; use -o codes.zip or -o codes/")
+    if fileFormat == 'SVG':
+        raise ValueError("batch mode supports raster formats only")
+    
+    formatter = BatchFormatter(RenderService.resolveType(qrType))
+    columnMap = None
+    if args.columns:
+        pairs = [item.split("=", 1) for item in args.columns.split(",")]
+        if any(len(pair) != 2 for pair in pairs):
+            raise ValueError(f"--columns expects field=column pairs: {args.columns}")
+        columnMap = {field.strip(): column.strip() for field, column in pairs}
+    
+    if args.output.lower().endswith(".zip"):
+        sink = ZipExportSink(args.output, imageFormat=fileFormat)
+    else:
+        sink = DirectoryExportSink(args.output, imageFormat=fileFormat)
+    
+    with open(args.batch, encoding='utf-8-sig', newline='') as f, sink:
+        stats = BatchRunner(options, fileFormat, args.dedup).run(formatter.formatRows(csv.DictReader(f), columnMap), sink)
+    print(stats.summary(), file=sys.stderr)
+    return 0
+
+
+def writePrint(content: str, options: RenderOptions, fileFormat: str, args) -> int:
+    """Render content at a physical size, streaming tiles into a PNG"""
+    if fileFormat != 'PNG':
+        raise ValueError("print size output is PNG only")
+    renderer = PrintRenderer(PrintSpec(parseLength(args.printSize), args.dpi), options)
+    
+    if args.output == "-":
+        renderer.render(content, sys.stdout.buffer)
+        sys.stdout.buffer.flush()
+    else:
+        with open(args.output, 'wb') as f:
+            renderer.render(content, f)
+        logger.info("Print-size QR code written: %s", args.output)
+    return 0
+
+
+def writeFanOut(content: str, options: RenderOptions, args) -> int:
+    """Write the code once per --formats target, sharing one encode and render"""
+    if args.output == "-":
+        raise ValueError("--formats writes several files; use -o to give their base name, e.g. -o qr")
+    targets = [ExportTarget.parse(spec) for spec in args.formats.split(",") if spec.strip()]
+    for path in FanOutExporter(options).save(content, targets, args.output):
+        print(path)
+    return 0
+
+
+def writeStructuredAppend(content: str, options: RenderOptions, fileFormat: str, args) -> int:
+    """Render content as a Structured Append set into a ZIP archive or a PDF label sheet"""
+    output = args.output.lower()
+    if not output.endswith((".zip", ".pdf")):
+        raise ValueError("structured append writes a ZIP archive or PDF sheet; use -o codes.zip or -o codes.pdf")
+    
+    codeSet = StructuredAppend(options.errorCorrection, args.maxVersion)
+    if output.endswith(".pdf"):
+        exporter = LabelSheetExporter(
+            SHEET_PRESETS[args.sheet], options.errorCorrection, options.border, options.fgColor, options.bgColor
+        )
+        count = exporter.exportMatrices(codeSet.getMatrices(content, options.border), args.output)
+    else:
+        if fileFormat == 'SVG':
+            raise ValueError("structured append supports raster formats only")
+        symbols = codeSet.generate(content, options)
+        count = len(symbols)
+        with ZipExportSink(args.output, imageFormat=fileFormat) as sink:
+            for spec, image in symbols:
+                sink.add(image, spec.part, f"symbol-{spec.position + 1:02d}-of-{spec.total:02d}{sink.extension}")
+    logger.info("Structured Append set of %s symbols written: %s", count, args.output)
+    return 0
+
+
+def main(argv=None) -> int:
+    """Entry point for the generate command"""
+    parser = buildParser()
+    args = parser.parse_args(argv)
+    if args.serialCount is not None and args.serialCount < 1:
+        parser.error("--serial-count must be at least 1")
+    values = vars(args)
+    
+    try:
+        params = {'type': args.type}
+        params.update({k: values[k] for k in RenderOptions.FIELDS if values.get(k) is not None})
+        for name in ALL_FIELDS:
+            value = values.get(name)
+            if value == "-":
+                value = sys.stdin.read().removesuffix("\n")
+            if value not in (None, False):
+                params[name] = value
+        
+        qrType, data, options = RenderService.splitParams(params)
+        
+        if args.format:
+            fileFormat = RenderService.normalizeFormat(args.format)
+        elif args.output != "-" and os.path.splitext(args.output)[1] and not (
+            args.serialCount is not None or args.structuredAppend or args.batch
+        ):
+            fileFormat = RenderService.normalizeFormat(os.path.splitext(args.output)[1])
+        else:
+            fileFormat = 'PNG'
+        
+        if args.batch:
+            return writeBatch(qrType, options, fileFormat, args)
+        
+        content = RenderService.buildContent(qrType, data)
+        if args.printSize:
+            return writePrint(content, options, fileFormat, args)
+        if args.serialCount is not None:
+            return writeSerials(content, options, fileFormat, args)
+        if args.structuredAppend:
+            return writeStructuredAppend(content, options, fileFormat, args)
+        if args.formats:
+            return writeFanOut(content, options, args)
+        
+        payload = RenderService.renderCached(content, options, fileFormat, DiskCache.fromSettings(SettingsService()))
+    
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    
+    if args.output == "-":
+        sys.stdout.buffer.write(payload)
+        sys.stdout.buffer.flush()
+    else:
+        with open(args.output, 'wb') as f:
+            f.write(payload)
+        logger.info("QR code written: %s", args.output)
+    return 0
@@ -0,0 +1,55 @@
+import argparse
+import csv
+import logging
+import sys
+
+from core.models import ErrorCorrection, RenderOptions
+from services.verify_service import CodeVerifier
+
+logger = logging.getLogger(__name__)
+
+
+def buildParser() -> argparse.ArgumentParser:
+    """Create the argument parser for the verify command"""
+    parser = argparse.ArgumentParser(
+        prog="main.py verify",
+        description="Check every code in a batch ZIP against its manifest payload"
+    )
+    parser.add_argument("archive", help="ZIP written by a batch or serial run")
+    parser.add_argument("--workers", type=int, help="verification processes (default: CPU count)")
+    parser.add_argument("--report", help="write per-code results to this CSV file")
+    
+    render = parser.add_argument_group("render options", "must match the options the batch was rendered with")
+    render.add_argument("--error-correction", dest="errorCorrection", choices=[e.name for e in ErrorCorrection])
+    render.add_argument("--border", type=int)
+    render.add_argument("--fg", dest="fgColor")
+    render.add_argument("--bg", dest="bgColor")
+    return parser
+
+
+def main(argv=None) -> int:
+    """Entry point for the verify command; exits 1 when any code fails"""
+    args = buildParser().parse_args(argv)
+    values = vars(args)
+    
+    try:
+        options = RenderOptions.fromDict({k: values[k] for k in RenderOptions.FIELDS if values.get(k) is not None})
+        report = CodeVerifier(options, args.workers).verifyArchive(args.archive)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['entry', 'ok', 'module_errors', 'worst_block_errors', 'block_capacity', 'reason', 'payload'])
+            for result in report.results:
+                writer.writerow([
+                    result.name, result.ok, result.moduleErrors, result.worstBlockErrors,
+                    result.blockCapacity, result.reason, result.payload
+                ])
+    
+    for result in report.failures:
+        print(f"FAIL {result.name}: {result.reason}", file=sys.stderr)
+    print(report.summary())
+    return 1 if report.failures else 0
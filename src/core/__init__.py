@@ -1,13 +1,34 @@
-from .models import QRType, ErrorCorrection, QRStyle, QRConfig, QRGeneratorModel
+from .models import QRType, ErrorCorrection, QRStyle, QRConfig, RenderOptions, QRGeneratorModel
 from .qr_generator import QRGenerator
-from .controller import QRGeneratorController
+from .fills import Fill
+from .styles import ModuleDrawer, registerStyle, styleNames
+from .batch_formatter import BatchFormatter
+from .serial_template import SerialTemplate
+from .structured_append import StructuredAppend
 
 __all__ = [
     'QRType',
     'ErrorCorrection', 
     'QRStyle',
     'QRConfig',
+    'RenderOptions',
     'QRGeneratorModel',
     'QRGenerator',
+    'Fill',
+    'ModuleDrawer',
+    'registerStyle',
+    'styleNames',
+    'BatchFormatter',
+    'SerialTemplate',
+    'StructuredAppend',
     'QRGeneratorController'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    # The controller pulls in services and tkinter, so only load it on demand;
+    # importing it eagerly also makes "import services" circular
+    if name == 'QRGeneratorController':
+        from .controller import QRGeneratorController
+        return QRGeneratorController
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
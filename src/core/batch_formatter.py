@@ -0,0 +1,136 @@
+import logging
+from itertools import islice, repeat
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+from core.models import QRType, VCARD_ESCAPES, escapeWifi, parseBool
+
+logger = logging.getLogger(__name__)
+
+def _text(column: Iterable) -> Iterator[str]:
+    return map(str, column)
+
+
+def _url(column: Iterable) -> Iterator[str]:
+    def normalise(url: str) -> str:
+        if url and not url.startswith(('http://', 'https://')):
+            return 'https://' + url
+        return url
+    return map(normalise, map(str, column))
+
+
+def _flag(column: Iterable) -> Iterator[str]:
+    return map({True: 'true', False: 'false'}.__getitem__, map(parseBool, column))
+
+
+def _wifi(column: Iterable) -> Iterator[str]:
+    return map(escapeWifi, column)
+
+
+def _vcard(column: Iterable) -> Iterator[str]:
+    return map(str.translate, map(str, column), repeat(VCARD_ESCAPES))
+
+
+def _mailtoAddress(column: Iterable) -> Iterator[str]:
+    return map(quote, map(str, column), repeat('@,+'))
+
+
+def _mailtoField(column: Iterable) -> Iterator[str]:
+    return map(quote, map(str, column), repeat(''))
+
+
+# Per type: a str.format template and its fields as (name, column converter, default).
+# Converters map a whole column through C-level callables where possible.
+# Produces the same payloads as QRGeneratorModel.formatContent.
+TEMPLATES: Dict[QRType, Tuple[str, Tuple[Tuple[str, Callable, str], ...]]] = {
+    QRType.TEXT: ("{}", (('text', _text, ''),)),
+    QRType.URL: ("{}", (('url', _url, ''),)),
+    QRType.EMAIL: ("mailto:{}?subject={}&body={}", (
+        ('email', _mailtoAddress, ''),
+        ('subject', _mailtoField, ''),
+        ('body', _mailtoField, ''),
+    )),
+    QRType.PHONE: ("tel:{}", (('phone', _text, ''),)),
+    QRType.WIFI: ("WIFI:T:{};S:{};P:{};H:{};;", (
+        ('security', _wifi, 'WPA'),
+        ('ssid', _wifi, ''),
+        ('password', _wifi, ''),
+        ('hidden', _flag, 'false'),
+    )),
+    QRType.VCARD: ("BEGIN:VCARD\nVERSION:3.0\nFN:{}\nTEL:{}\nEMAIL:{}\nORG:{}\nEND:VCARD", (
+        ('name', _vcard, ''),
+        ('phone', _vcard, ''),
+        ('email', _vcard, ''),
+        ('organization', _vcard, ''),
+    )),
+}
+
+
+class BatchFormatter:
+    """Builds payloads for many records of one QR type, column by column"""
+    
+    def __init__(self, qrType: QRType):
+        self.qrType = qrType
+        template, fields = TEMPLATES[qrType]
+        self._format = template.format
+        self.fields = fields
+    
+    @property
+    def fieldNames(self) -> List[str]:
+        """Payload fields the template consumes, in template order"""
+        return [name for name, _, _ in self.fields]
+    
+    def formatColumns(self, columns: Mapping[str, Iterable]) -> Iterator[str]:
+        """Lazily yield one payload per row of the given column arrays.
+        
+        Missing columns take the field default. Values are converted with
+        str(), so pass '' rather than None for blanks. Columns may be any iterables,
+        including generators, so results stream without materialising the batch.
+        """
+        provided = [name for name in self.fieldNames if name in columns]
+        if not provided:
+            raise ValueError(f"No {self.qrType.value} columns given; expected any of {', '.join(self.fieldNames)}")
+        
+        lengths = {len(columns[name]) for name in provided if hasattr(columns[name], '__len__')}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns differ in length: {sorted(lengths)}")
+        
+        # One converter pass per column, then one template pass per row
+        converted = [
+            convert(columns[name]) if name in columns else repeat(next(convert((default,))))
+            for name, convert, default in self.fields
+        ]
+        return map(self._format, *converted)
+    
+    def formatRows(
+        self,
+        rows: Iterable[Mapping[str, str]],
+        columnMap: Optional[Dict[str, str]] = None,
+        chunkSize: int = 4096
+    ) -> Iterator[str]:
+        """Yield payloads for dict rows such as a csv.DictReader.
+        
+        columnMap maps payload field names to source column names; by default
+        fields are read from identically named columns.
+        """
+        columnMap = columnMap or {name: name for name in self.fieldNames}
+        sources = [(field, column) for field, column in columnMap.items() if field in self.fieldNames]
+        if not sources:
+            raise ValueError(f"Column map has no {self.qrType.value} fields")
+        
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, chunkSize))
+            if not chunk:
+                return
+            # Columns absent from the source fall back to the field default, blank cells stay blank
+            columns = {
+                field: [row.get(column) or '' for row in chunk]
+                for field, column in sources if column in chunk[0]
+            }
+            yield from self.formatColumns(columns)
+    
+    @staticmethod
+    def formatBatch(qrType: QRType, columns: Mapping[str, Sequence]) -> List[str]:
+        """Format a whole batch of column arrays into a list"""
+        return list(BatchFormatter(qrType).formatColumns(columns))
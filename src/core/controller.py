@@ -1,12 +1,14 @@
 import logging
 import os
-import subprocess
-import tempfile
 from datetime import datetime
 from tkinter import filedialog, colorchooser
 
-from core.models import QRGeneratorModel, QRType, ErrorCorrection, QRStyle, QRConfig
+from core.models import QRGeneratorModel, QRType, ErrorCorrection, QRConfig, RenderOptions
 from core.qr_generator import QRGenerator
+from core.styles import resolveQuality, resolveStyle, styleName
+from core.timing import stageTimer
+from core.memory_profiler import memoryProfiler
+from services.clipboard_service import ClipboardService
 from services.file_service import FileService
 from services.history_service import HistoryService
 from services.settings_service import SettingsService
@@ -22,8 +24,14 @@ class QRGeneratorController:
         self.settingsService = settingsService
         self.historyService = HistoryService()
         self.fileService = FileService()
+        self.clipboardService = ClipboardService()
         self.view = None
         
+        if settingsService.get("timing_enabled", False):
+            stageTimer.enabled = True
+        if settingsService.get("memory_profiling_enabled", False):
+            memoryProfiler.enable()
+        
         logger.info("Controller initialized")
     
     def setView(self, view):
@@ -43,7 +51,7 @@ class QRGeneratorController:
         if self.view:
             self.view.applyTheme(newTheme)
             self.view.updateStatus(f"Theme switched to {newTheme}")
-            logger.info(f"Theme switched to {newTheme}")
+            logger.info("Theme switched to %s", newTheme)
 
     def generateQr(self) -> None:
         """Generate QR code from current inputs"""
@@ -58,7 +66,8 @@ class QRGeneratorController:
             inputData = self.view.getInputData()
             
             # Format content
-            content = self.model.formatContent(qrType, inputData)
+            with stageTimer.span("formatContent") as formatSpan:
+                content = self.model.formatContent(qrType, inputData)
             
             if not content.strip():
                 self.view.showError("Error", "Please enter content for the QR code")
@@ -71,23 +80,27 @@ class QRGeneratorController:
             border = self.view.borderVar.get()
             fgColor = self.view.fgColorVar.get()
             bgColor = self.view.bgColorVar.get()
-            style = QRStyle(self.view.styleVar.get())
+            style = resolveStyle(self.view.styleVar.get())
+            quality = resolveQuality(self.settingsService.get("antialias_quality", "high"))
             
             # Generate QR
-            qrImage = QRGenerator.generate(
-                content=content,
-                errorCorrection=errorCorrection,
-                boxSize=boxSize,
-                border=border,
-                fgColor=fgColor,
-                bgColor=bgColor,
-                style=style
-            )
+            with stageTimer.span("generate") as generateSpan:
+                qrImage = QRGenerator.generate(
+                    content=content,
+                    errorCorrection=errorCorrection,
+                    boxSize=boxSize,
+                    border=border,
+                    fgColor=fgColor,
+                    bgColor=bgColor,
+                    style=style,
+                    quality=quality
+                )
             
             self.model.currentQrImage = qrImage
             
             # Update preview
-            self.view.updatePreview(qrImage)
+            with stageTimer.span("preview") as previewSpan:
+                self.view.updatePreview(qrImage)
             
             # Save to history
             config = QRConfig(
@@ -98,13 +111,28 @@ class QRGeneratorController:
                 border=border,
                 fgColor=fgColor,
                 bgColor=bgColor,
-                style=style.value,
+                style=styleName(style),
                 timestamp=datetime.now().isoformat()
             )
-            self.historyService.add(config)
+            with stageTimer.span("history") as historySpan:
+                self.historyService.add(config)
+            
+            with stageTimer.span("log") as logSpan:
+                logger.info("QR generated: %s", qrType.value)
+            
+            status = f"QR code generated successfully • {len(content)} characters"
+            if stageTimer.enabled:
+                spans = {
+                    "format": formatSpan, "generate": generateSpan, "preview": previewSpan,
+                    "history": historySpan, "log": logSpan
+                }
+                breakdown = " / ".join(f"{name} {span.elapsed * 1000:.1f}" for name, span in spans.items())
+                total = sum(span.elapsed for span in spans.values()) * 1000
+                logger.info("Generate timing: %.1f ms (%s ms)", total, breakdown)
+                if self.settingsService.get("timing_in_status", False):
+                    status += f" • {total:.1f} ms ({breakdown})"
             
-            self.view.updateStatus(f"QR code generated successfully • {len(content)} characters")
-            logger.info(f"QR generated: {qrType.value}")
+            self.view.updateStatus(status)
             
         except Exception as e:
             errorMsg = f"Failed to generate QR code: {str(e)}"
@@ -156,36 +184,36 @@ class QRGeneratorController:
             return
         
         try:
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-                self.model.currentQrImage.save(tmp.name, 'PNG')
-                tmpPath = tmp.name
-            
-            # Robust Windows copy using PowerShell and Windows Forms
-            cmd = [
-                "powershell",
-                "-command",
-                f"Add-Type -AssemblyName System.Windows.Forms; [System.Windows.Forms.Clipboard]::SetImage([System.Drawing.Image]::FromFile('{tmpPath}'))"
-            ]
-            subprocess.run(cmd, creationflags=subprocess.CREATE_NO_WINDOW)
-            # -----------------------------------------------------------
+            self.clipboardService.copyImage(self.model.currentQrImage)
             
             self.view.showInfo("Success", "QR code copied to clipboard!")
             self.view.updateStatus("Copied to clipboard")
             
-            # Safely delete temp file after a short delay so the OS has time to finish reading it
-            def safeDelete():
-                try:
-                    os.unlink(tmpPath)
-                except OSError:
-                    pass
-                    
-            self.view.after(500, safeDelete)
-            
         except Exception as e:
             errorMsg = f"Failed to copy to clipboard: {str(e)}"
             self.view.showError("Error", errorMsg)
             logger.error(errorMsg)
     
+    def openBatchDialog(self) -> None:
+        """Open the CSV batch dialog with the current render settings"""
+        if not self.view:
+            return
+        
+        # Imported lazily so the controller does not pull in the dialog until it is used
+        from ui.batch_dialog import BatchDialog
+        
+        options = RenderOptions(
+            errorCorrection=ErrorCorrection[self.view.errorCorrectionVar.get()],
+            boxSize=self.view.boxSizeVar.get(),
+            border=self.view.borderVar.get(),
+            fgColor=self.view.fgColorVar.get(),
+            bgColor=self.view.bgColorVar.get(),
+            style=resolveStyle(self.view.styleVar.get()),
+            quality=resolveQuality(self.settingsService.get("antialias_quality", "high"))
+        )
+        BatchDialog(self.view, options, QRType(self.view.qrTypeVar.get()), self.settingsService)
+        self.view.updateStatus("Batch dialog opened")
+    
     def chooseColor(self, colorType: str) -> None:
         """Open color picker dialog"""
         initialColor = (
@@ -215,6 +243,7 @@ Keyboard Shortcuts:
 • Ctrl+G: Generate QR code
 • Ctrl+S: Save QR code
 • Ctrl+C: Copy to clipboard
+• Ctrl+B: Batch generate from a CSV file
 • F1: Show this help
 
 Features:
@@ -223,6 +252,7 @@ Features:
 • Error correction levels
 • Auto preview mode
 • Generation history
+• Batch generation from CSV files
 
 For more information, visit our documentation.
         """
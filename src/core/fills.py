@@ -0,0 +1,134 @@
+import logging
+import math
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from PIL import Image, ImageColor, ImageOps
+
+logger = logging.getLogger(__name__)
+
+FILL_KINDS = ('linear', 'radial', 'image')
+
+# 256-step ramps in C; every gradient is one affine resample of these, never a per-pixel loop
+_LINEAR_RAMP = Image.linear_gradient('L')
+_RADIAL_RAMP = Image.radial_gradient('L')
+
+
+def textureStamp(path: str) -> Tuple[int, int]:
+    """Modification time and size of a texture file; part of every cache key that covers its pixels"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+@lru_cache(maxsize=8)
+def _loadTexture(path: str, stamp: Tuple[int, int]) -> Image.Image:
+    # The stamp only keys the cache, so a texture edited in place is read again
+    with Image.open(path) as image:
+        return image.convert('RGB')
+
+
+@dataclass(frozen=True)
+class Fill:
+    """Foreground fill of a code: a linear or radial gradient, or an image texture.
+    
+    Fills are drawn as one image the size of the code and pasted through the
+    module coverage mask, so the cost does not depend on the module count.
+    """
+    kind: str
+    colors: Tuple[str, ...] = ()
+    angle: float = 0.0
+    path: str = ""
+    
+    @classmethod
+    def parse(cls, spec: str) -> 'Fill':
+        """Parse "linear:#F00,#00F[,ANGLE]", "radial:#F00,#00F" or "image:PATH" into a fill"""
+        kind, separator, args = spec.partition(":")
+        kind = kind.strip().lower()
+        if not separator or kind not in FILL_KINDS:
+            raise ValueError(
+                f"Invalid fill: {spec} (use linear:COLOR,COLOR[,ANGLE], radial:COLOR,COLOR or image:PATH)"
+            )
+        
+        if kind == 'image':
+            path = args.strip()
+            if not path:
+                raise ValueError(f"Image fill needs a path: {spec}")
+            return cls(kind, path=path)
+        
+        parts = [part.strip() for part in args.split(",") if part.strip()]
+        angle = 0.0
+        if kind == 'linear' and parts:
+            try:
+                angle = float(parts[-1])
+                parts.pop()
+            except ValueError:
+                pass
+        if not 2 <= len(parts) <= 3:
+            raise ValueError(f"A gradient takes two or three colours: {spec}")
+        for color in parts:
+            ImageColor.getrgb(color)
+        return cls(kind, tuple(parts), angle)
+    
+    def stamp(self) -> Optional[Tuple[int, int]]:
+        """Texture file stamp for image fills, None for gradients, which depend on the spec alone"""
+        return textureStamp(self.path) if self.kind == 'image' else None
+    
+    def _ramp(self, size: int, top: int, bottom: int) -> Image.Image:
+        """Greyscale gradient position (0 = first colour) for rows top..bottom of a size x size code"""
+        centre = size / 2
+        if self.kind == 'linear':
+            # Angle 0 runs left to right and 90 top to bottom; the ramp spans the code's projection
+            dx, dy = math.cos(math.radians(self.angle)), math.sin(math.radians(self.angle))
+            half = centre * (abs(dx) + abs(dy))
+            scale = 255 / (2 * half)
+            data = (0, 0, 128, dx * scale, dy * scale, (half - centre * (dx + dy) + dy * top) * scale)
+            return _LINEAR_RAMP.transform((size, bottom - top), Image.Transform.AFFINE, data, Image.Resampling.BILINEAR)
+        
+        # Pillow's radial ramp reaches 255 at its own corners, 181 px out; map the code's corners just inside them
+        scale = 179 / (centre * math.sqrt(2))
+        data = (scale, 0, 128 - centre * scale, 0, scale, 128 + (top - centre) * scale)
+        return _RADIAL_RAMP.transform((size, bottom - top), Image.Transform.AFFINE, data, Image.Resampling.BILINEAR)
+    
+    def _texture(self, size: int, top: int, bottom: int) -> Image.Image:
+        """Rows top..bottom of the texture scaled to cover the code and centred, as ImageOps.fit"""
+        texture = _loadTexture(self.path, textureStamp(self.path))
+        scale = min(texture.size) / size
+        left = (texture.width - size * scale) / 2
+        upper = (texture.height - size * scale) / 2
+        # Clamped because float error can put the box a hair outside the texture, which Pillow rejects
+        box = (
+            max(0.0, left),
+            max(0.0, upper + top * scale),
+            min(float(texture.width), left + size * scale),
+            min(float(texture.height), upper + bottom * scale)
+        )
+        return texture.resize((size, bottom - top), Image.Resampling.LANCZOS, box=box)
+    
+    def render(self, size: int, top: int = 0, bottom: Optional[int] = None) -> Image.Image:
+        """RGB fill for pixel rows top..bottom of a size x size code"""
+        bottom = size if bottom is None else bottom
+        if self.kind == 'image':
+            return self._texture(size, top, bottom)
+        
+        colors = [ImageColor.getrgb(color)[:3] for color in self.colors]
+        return ImageOps.colorize(
+            self._ramp(size, top, bottom), colors[0], colors[-1], mid=colors[1] if len(colors) == 3 else None
+        )
+
+
+@lru_cache(maxsize=64)
+def fillFor(spec: str) -> Optional[Fill]:
+    """Parsed fill for a spec string, or None for a flat foreground colour"""
+    return Fill.parse(spec) if spec and spec.strip() else None
+
+
+def fillImage(fill: Fill, size: int) -> Image.Image:
+    """Whole-code fill, shared by every code of the same size; callers must not modify it"""
+    return _fillImage(fill, size, fill.stamp())
+
+
+@lru_cache(maxsize=8)
+def _fillImage(fill: Fill, size: int, stamp: Optional[Tuple[int, int]]) -> Image.Image:
+    return fill.render(size)
@@ -0,0 +1,180 @@
+import atexit
+import heapq
+import itertools
+import logging
+import os
+import signal
+import sys
+import threading
+import tracemalloc
+from typing import Any, Dict, List
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+def _maxRss() -> int:
+    """Process high-water resident set size in bytes, or 0 where unavailable"""
+    if resource is None:
+        return 0
+    maxRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return maxRss if sys.platform == 'darwin' else maxRss * 1024
+
+
+class _NullProfile:
+    """Shared no-op context returned while profiling is disabled"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, excType, excValue, traceback):
+        return False
+
+
+_NULL_PROFILE = _NullProfile()
+
+
+class _Profile:
+    """Measures peak and retained allocations of one call"""
+    
+    def __init__(self, profiler: 'MemoryProfiler', operation: str, config: Dict[str, Any]):
+        self.profiler = profiler
+        self.operation = operation
+        self.config = config
+        self.before = 0
+        self.rssBefore = 0
+    
+    def __enter__(self):
+        tracemalloc.reset_peak()
+        self.before = tracemalloc.get_traced_memory()[0]
+        self.rssBefore = _maxRss()
+        return self
+    
+    def __exit__(self, excType, excValue, traceback):
+        current, peak = tracemalloc.get_traced_memory()
+        self.profiler.record(
+            self.operation, self.config, peak - self.before, current - self.before, _maxRss() - self.rssBefore
+        )
+        return False
+
+
+class MemoryProfiler:
+    """Opt-in tracemalloc profiling that keeps the worst calls by peak allocation.
+    
+    tracemalloc counters are process-wide, so calls running concurrently on
+    other threads are attributed to whichever call is being measured; profile
+    single-threaded runs for exact per-call numbers. Growth of the process
+    high-water RSS is recorded alongside, since image buffers are not traced.
+    """
+    
+    def __init__(self, maxRecords: int = 20):
+        self.enabled = False
+        self.maxRecords = maxRecords
+        self.callCount = 0
+        self.highestPeak = 0
+        self._worst: List = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._atexitRegistered = False
+        
+        if os.getenv('QRGEN_MEMPROFILE', '') not in ('', '0'):
+            self.enable()
+    
+    def enable(self) -> None:
+        """Start tracing allocations and report at shutdown"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.enabled = True
+        if not self._atexitRegistered:
+            atexit.register(self.logReport)
+            self._atexitRegistered = True
+        logger.info("Memory profiling enabled")
+    
+    def disable(self) -> None:
+        """Stop tracing allocations"""
+        self.enabled = False
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+    
+    def profile(self, operation: str, **config):
+        """Context manager measuring one call; a no-op when disabled"""
+        if not self.enabled:
+            return _NULL_PROFILE
+        return _Profile(self, operation, config)
+    
+    def record(
+        self,
+        operation: str,
+        config: Dict[str, Any],
+        peakBytes: int,
+        retainedBytes: int,
+        rssGrowthBytes: int = 0
+    ) -> None:
+        """Store a measurement, keeping only the worst offenders"""
+        entry = {
+            'operation': operation,
+            'peakBytes': peakBytes,
+            'retainedBytes': retainedBytes,
+            'rssGrowthBytes': rssGrowthBytes,
+            'config': config
+        }
+        # Pillow allocates pixel buffers outside the Python heap, where only RSS growth sees them
+        score = max(peakBytes, rssGrowthBytes)
+        with self._lock:
+            self.callCount += 1
+            newHigh = score > self.highestPeak
+            self.highestPeak = max(self.highestPeak, score)
+            item = (score, next(self._sequence), entry)
+            if len(self._worst) < self.maxRecords:
+                heapq.heappush(self._worst, item)
+            elif score > self._worst[0][0]:
+                heapq.heapreplace(self._worst, item)
+        
+        if newHigh:
+            # Logged immediately so the culprit is on record even if the process is OOM-killed
+            logger.info("New memory peak in %s: %s", operation, self._formatEntry(entry))
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Memory %s: %s", operation, self._formatEntry(entry))
+    
+    @staticmethod
+    def _formatEntry(entry: Dict[str, Any]) -> str:
+        config = ", ".join(f"{k}={v}" for k, v in entry['config'].items())
+        return (
+            f"peak {entry['peakBytes'] / 1048576:.2f} MiB, retained {entry['retainedBytes'] / 1048576:.2f} MiB, "
+            f"RSS +{entry['rssGrowthBytes'] / 1048576:.2f} MiB ({config})"
+        )
+    
+    def report(self) -> List[Dict[str, Any]]:
+        """Worst calls ordered by peak allocation"""
+        with self._lock:
+            return [entry for _, _, entry in sorted(self._worst, key=lambda item: item[0], reverse=True)]
+    
+    def logReport(self) -> None:
+        """Write the worst offenders to the log"""
+        worst = self.report()
+        if not worst:
+            return
+        logger.info("Memory profile: worst %s of %s profiled calls", len(worst), self.callCount)
+        for entry in worst:
+            logger.info("  %s: %s", entry['operation'], self._formatEntry(entry))
+    
+    def reset(self) -> None:
+        """Discard all measurements"""
+        with self._lock:
+            self._worst.clear()
+            self.callCount = 0
+            self.highestPeak = 0
+    
+    def installSignalHandler(self) -> None:
+        """Log the report on SIGUSR1 (POSIX only)"""
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.logReport())
+
+
+# Process-wide profiler used by the engine and file service
+memoryProfiler = MemoryProfiler()
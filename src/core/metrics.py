@@ -0,0 +1,271 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from sub-millisecond renders to slow saves
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _escapeLabel(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _formatLabels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escapeLabel(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _formatValue(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Shared label handling for all metric types"""
+    
+    kind = "untyped"
+    
+    def __init__(self, name: str, helpText: str, labelNames: Sequence[str], lock: threading.Lock):
+        self.name = name
+        self.helpText = helpText
+        self.labelNames = tuple(labelNames)
+        self._lock = lock
+    
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelNames):
+            raise ValueError(f"{self.name} expects labels {self.labelNames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelNames)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    
+    kind = "counter"
+    
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._values: Dict[Tuple[str, ...], float] = {}
+    
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        """Increase the counter for a label set"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def value(self, **labels) -> float:
+        """Current value for a label set"""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+    
+    def samples(self) -> Iterable[Tuple[str, Tuple[str, ...], str, float]]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, key, "", value
+    
+    def snapshot(self):
+        with self._lock:
+            return [{'labels': dict(zip(self.labelNames, k)), 'value': v} for k, v in self._values.items()]
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+    
+    kind = "gauge"
+    
+    def set(self, value: float, **labels) -> None:
+        """Set the gauge for a label set"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+    
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        """Decrease the gauge for a label set"""
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Cumulative bucketed distribution of observations"""
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, helpText: str, labelNames: Sequence[str], lock: threading.Lock, buckets: Sequence[float]):
+        super().__init__(name, helpText, labelNames, lock)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[Tuple[str, ...], list] = {}
+    
+    def observe(self, value: float, **labels) -> None:
+        """Record one observation"""
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [per-bucket counts..., sum, count]
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+    
+    def time(self, **labels):
+        """Context manager observing the elapsed seconds of a block"""
+        return _HistogramTimer(self, labels)
+    
+    def samples(self):
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._series.items()]
+        for key, series in items:
+            cumulative = 0
+            for i, bound in enumerate(self.buckets):
+                cumulative += series[i]
+                yield f"{self.name}_bucket", key, f'le="{_formatValue(bound)}"', cumulative
+            yield f"{self.name}_sum", key, "", series[-2]
+            yield f"{self.name}_count", key, "", series[-1]
+    
+    def snapshot(self):
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._series.items()]
+        result = []
+        for key, series in items:
+            result.append({
+                'labels': dict(zip(self.labelNames, key)),
+                'buckets': {_formatValue(b): c for b, c in zip(self.buckets, series)},
+                'sum': series[-2],
+                'count': series[-1]
+            })
+        return result
+
+
+class _HistogramTimer:
+    __slots__ = ('histogram', 'labels', 'started')
+    
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+        self.started = 0.0
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, excType, excValue, traceback):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    """Process-wide collection of counters, gauges and histograms"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+    
+    def _register(self, metricClass, name: str, helpText: str, labelNames: Sequence[str], *extra):
+        with self._lock:
+            existing = self._metrics.get(name)
+            if existing is not None:
+                if type(existing) is not metricClass:
+                    raise ValueError(f"Metric {name} already registered as {existing.kind}")
+                return existing
+            metric = metricClass(name, helpText, labelNames, threading.Lock(), *extra)
+            self._metrics[name] = metric
+            return metric
+    
+    def counter(self, name: str, helpText: str, labelNames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter"""
+        return self._register(Counter, name, helpText, labelNames)
+    
+    def gauge(self, name: str, helpText: str, labelNames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge"""
+        return self._register(Gauge, name, helpText, labelNames)
+    
+    def histogram(
+        self,
+        name: str,
+        helpText: str,
+        labelNames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Get or create a histogram"""
+        return self._register(Histogram, name, helpText, labelNames, buckets)
+    
+    def renderPrometheus(self) -> str:
+        """Serialise all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            registered = list(self._metrics.values())
+        
+        lines = []
+        for metric in registered:
+            lines.append(f"# HELP {metric.name} {metric.helpText}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sampleName, key, extra, value in metric.samples():
+                lines.append(f"{sampleName}{_formatLabels(metric.labelNames, key, extra)} {_formatValue(value)}")
+        return "\n".join(lines) + "\n"
+    
+    def snapshot(self) -> Dict:
+        """All metrics as a JSON-friendly dictionary"""
+        with self._lock:
+            registered = list(self._metrics.values())
+        return {
+            'timestamp': time.time(),
+            'metrics': {
+                metric.name: {'type': metric.kind, 'help': metric.helpText, 'series': metric.snapshot()}
+                for metric in registered
+            }
+        }
+    
+    def writeSnapshot(self, filePath: str) -> None:
+        """Atomically write a JSON snapshot"""
+        tmpPath = f"{filePath}.tmp"
+        with open(tmpPath, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmpPath, filePath)
+
+
+class SnapshotWriter:
+    """Background thread writing periodic JSON snapshots of a registry"""
+    
+    def __init__(self, registry: MetricsRegistry, filePath: str, interval: float = 15.0):
+        self.registry = registry
+        self.filePath = filePath
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> None:
+        """Begin writing snapshots"""
+        self._thread = threading.Thread(target=self._run, name="metrics-snapshot", daemon=True)
+        self._thread.start()
+        logger.info("Writing metrics snapshots to %s every %ss", self.filePath, self.interval)
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.registry.writeSnapshot(self.filePath)
+            except OSError as e:
+                logger.error("Failed to write metrics snapshot: %s", e)
+    
+    def stop(self) -> None:
+        """Stop the thread and write a final snapshot"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        try:
+            self.registry.writeSnapshot(self.filePath)
+        except OSError as e:
+            logger.error("Failed to write metrics snapshot: %s", e)
+
+
+# Process-wide registry used by the engine and services
+metrics = MetricsRegistry()
@@ -1,7 +1,53 @@
 from dataclasses import dataclass, asdict
 from enum import Enum
+import hashlib
+import json
 import qrcode
-from typing import Dict, Any
+from typing import Dict, Any, Union
+from urllib.parse import quote
+from PIL import ImageColor
+from core.fills import fillFor
+
+# Upper bounds for requested render sizes; a version 40 code at the maximum is about 9000 px square
+MAX_BOX_SIZE = 40
+MAX_BORDER = 20
+
+# Backslash escapes for the WIFI: payload (ZXing convention)
+WIFI_ESCAPES = str.maketrans({c: '\\' + c for c in '\\;,:"'})
+
+# vCard 3.0 text value escapes (RFC 2426); CR is dropped so CRLF becomes one escaped newline
+VCARD_ESCAPES = str.maketrans({'\\': '\\\\', ';': '\\;', ',': '\\,', '\n': '\\n', '\r': None})
+
+
+# Values of a boolean field such as WiFi "hidden" that mean true; anything else (including blank) is false
+TRUE_VALUES = frozenset(('1', 'true', 'yes', 'y', 'on', 'x'))
+
+
+def parseBool(value: Any) -> bool:
+    """Boolean field value from a checkbox, JSON or a CSV/query string; every entry point shares this rule"""
+    if isinstance(value, bool):
+        return value
+    if value is None:
+        return False
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def escapeWifi(value: str) -> str:
+    """Escape a WiFi payload field; line breaks have no escape in the WIFI: format and are rejected"""
+    text = str(value)
+    if '\n' in text or '\r' in text:
+        raise ValueError("WiFi fields cannot contain line breaks")
+    return text.translate(WIFI_ESCAPES)
+
+
+def escapeVcard(value: str) -> str:
+    """Escape a vCard text value"""
+    return str(value).translate(VCARD_ESCAPES)
+
+
+def encodeMailto(value: str, safe: str = '') -> str:
+    """Percent-encode a mailto address or header value"""
+    return quote(str(value), safe=safe)
 
 
 class QRType(Enum):
@@ -48,12 +94,100 @@ class QRConfig:
         return asdict(self)
 
 
+@dataclass(frozen=True)
+class RenderOptions:
+    """Render settings shared by the non-GUI entry points"""
+    errorCorrection: ErrorCorrection = ErrorCorrection.HIGH
+    boxSize: int = 10
+    border: int = 4
+    fgColor: str = "#000000"
+    bgColor: str = "#FFFFFF"
+    # A QRStyle, or the name of a style registered by a plugin
+    style: Union[QRStyle, str] = QRStyle.SQUARE
+    # Gradient or image fill spec replacing fgColor, e.g. "linear:#FF0000,#0000FF"
+    fill: str = ""
+    # Antialias quality of curved module shapes: none, fast or high
+    quality: str = "high"
+    
+    FIELDS = ('errorCorrection', 'boxSize', 'border', 'fgColor', 'bgColor', 'style', 'fill', 'quality')
+    
+    @classmethod
+    def fromDict(cls, data: Dict[str, Any]) -> 'RenderOptions':
+        """Build options from loosely typed values (query strings, JSON, CLI)"""
+        values: Dict[str, Any] = {}
+        try:
+            if 'errorCorrection' in data:
+                values['errorCorrection'] = ErrorCorrection[str(data['errorCorrection']).upper()]
+            if 'style' in data:
+                # Imported here because the style registry is built on these models
+                from core.styles import resolveStyle
+                values['style'] = resolveStyle(str(data['style']))
+            if data.get('quality'):
+                from core.styles import resolveQuality
+                values['quality'] = resolveQuality(data['quality'])
+            if data.get('fill'):
+                # Parsed only to reject bad specs early; the options keep the string
+                fillFor(str(data['fill']))
+                values['fill'] = str(data['fill'])
+            for key in ('boxSize', 'border'):
+                if key in data:
+                    values[key] = int(data[key])
+            for key in ('fgColor', 'bgColor'):
+                if key in data:
+                    values[key] = str(data[key])
+                    ImageColor.getrgb(values[key])
+        except (KeyError, ValueError, TypeError) as e:
+            raise ValueError(f"Invalid render option: {e}") from e
+        
+        if not 1 <= values.get('boxSize', 1) <= MAX_BOX_SIZE:
+            raise ValueError(f"boxSize must be between 1 and {MAX_BOX_SIZE}")
+        if not 0 <= values.get('border', 0) <= MAX_BORDER:
+            raise ValueError(f"border must be between 0 and {MAX_BORDER}")
+        return cls(**values)
+    
+    def toDict(self) -> Dict[str, Any]:
+        """Convert to a JSON-friendly dictionary"""
+        data = {
+            'errorCorrection': self.errorCorrection.name,
+            'boxSize': self.boxSize,
+            'border': self.border,
+            'fgColor': self.fgColor,
+            'bgColor': self.bgColor,
+            'style': self.style.value if isinstance(self.style, QRStyle) else self.style
+        }
+        # Only present when set, so cache keys of default renders are unchanged
+        if self.fill:
+            data['fill'] = self.fill
+        if self.quality != "high":
+            data['quality'] = self.quality
+        return data
+    
+    def toKwargs(self) -> Dict[str, Any]:
+        """Keyword arguments for QRGenerator.generate"""
+        return {key: getattr(self, key) for key in self.FIELDS}
+    
+    def cacheKey(self, content: str, fileFormat: str = "PNG") -> str:
+        """Stable hash identifying one rendered output"""
+        options = self.toDict()
+        paint = fillFor(self.fill)
+        stamp = paint.stamp() if paint is not None else None
+        if stamp is not None:
+            # An image fill's pixels come from a file the spec string alone does not pin down
+            options['fillStamp'] = list(stamp)
+        key = json.dumps(
+            {'content': content, 'format': fileFormat.upper(), 'options': options},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
 class QRGeneratorModel:
     """Core QR generation logic and data management"""
     
     def __init__(self):
         self.currentQrImage = None
-        
+    
     def formatContent(self, qrType: QRType, data: Dict[str, str]) -> str:
         """Format content based on QR type"""
         if qrType == QRType.TEXT:
@@ -66,29 +200,29 @@ class QRGeneratorModel:
             return url
         
         elif qrType == QRType.EMAIL:
-            email = data.get('email', '')
-            subject = data.get('subject', '')
-            body = data.get('body', '')
+            email = encodeMailto(data.get('email', ''), safe='@,+')
+            subject = encodeMailto(data.get('subject', ''))
+            body = encodeMailto(data.get('body', ''))
             return f"mailto:{email}?subject={subject}&body={body}"
         
         elif qrType == QRType.PHONE:
             return f"tel:{data.get('phone', '')}"
         
         elif qrType == QRType.WIFI:
-            ssid = data.get('ssid', '')
-            password = data.get('password', '')
-            security = data.get('security', 'WPA')
-            hidden = 'true' if data.get('hidden', False) else 'false'
+            ssid = escapeWifi(data.get('ssid', ''))
+            password = escapeWifi(data.get('password', ''))
+            security = escapeWifi(data.get('security', 'WPA'))
+            hidden = 'true' if parseBool(data.get('hidden', False)) else 'false'
             return f"WIFI:T:{security};S:{ssid};P:{password};H:{hidden};;"
         
         elif qrType == QRType.VCARD:
             return (
                 f"BEGIN:VCARD\n"
                 f"VERSION:3.0\n"
-                f"FN:{data.get('name', '')}\n"
-                f"TEL:{data.get('phone', '')}\n"
-                f"EMAIL:{data.get('email', '')}\n"
-                f"ORG:{data.get('organization', '')}\n"
+                f"FN:{escapeVcard(data.get('name', ''))}\n"
+                f"TEL:{escapeVcard(data.get('phone', ''))}\n"
+                f"EMAIL:{escapeVcard(data.get('email', ''))}\n"
+                f"ORG:{escapeVcard(data.get('organization', ''))}\n"
                 f"END:VCARD"
             )
         
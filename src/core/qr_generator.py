@@ -1,16 +1,28 @@
+import html
 import logging
-from PIL import Image
+import time
+from typing import List
+from PIL import Image, ImageColor
 import qrcode
-from qrcode.image.styledpil import StyledPilImage
-from qrcode.image.styles.moduledrawers import (
-    RoundedModuleDrawer,
-    CircleModuleDrawer,
-    GappedSquareModuleDrawer
-)
-from core.models import ErrorCorrection, QRStyle
+from qrcode import util
+from core.models import ErrorCorrection
+from core.metrics import metrics
+from core.timing import stageTimer
+from core.memory_profiler import memoryProfiler
+from core.qr_layout import layoutFor, makeQr
+from core.fills import fillFor, fillImage
+from core.styles import SUPERSAMPLING, StyleRef, getDrawer, resolveQuality, styleName
 
 logger = logging.getLogger(__name__)
 
+CODES_GENERATED = metrics.counter(
+    "qr_codes_generated_total", "QR codes generated", ("style", "error_correction")
+)
+GENERATE_SECONDS = metrics.histogram(
+    "qr_generate_seconds", "Time to encode and render one QR code", ("style",)
+)
+GENERATE_FAILURES = metrics.counter("qr_generate_failures_total", "QR generations that raised")
+
 
 class QRGenerator:
     """QR code generation engine"""
@@ -23,11 +35,75 @@ class QRGenerator:
         border: int,
         fgColor: str,
         bgColor: str,
-        style: QRStyle
+        style: StyleRef,
+        fill: str = "",
+        quality: str = 'high'
+    ) -> Image.Image:
+        """Generate QR code image with specified parameters; a fill spec replaces fgColor"""
+        started = time.perf_counter()
+        try:
+            with memoryProfiler.profile(
+                "generate",
+                style=styleName(style),
+                errorCorrection=errorCorrection.name,
+                boxSize=boxSize,
+                border=border,
+                contentLength=len(content)
+            ):
+                # Library specific keyword arguments (error_correction, box_size) must remain snake_case
+                qr = qrcode.QRCode(
+                    version=1,
+                    error_correction=errorCorrection.value[0],
+                    box_size=boxSize,
+                    border=border,
+                )
+                # Equivalent to qr.make(fit=True) on the cached version tables, split so each stage can be timed
+                with stageTimer.span("encode"):
+                    qr.add_data(content)
+                    qr.best_fit(start=qr.version)
+                    qr.data_cache = util.create_data(qr.version, qr.error_correction, qr.data_list)
+                
+                with stageTimer.span("mask"):
+                    qr.modules, qr.mask_pattern = layoutFor(qr.version).place(qr.data_cache, qr.error_correction)
+                    qr.modules_count = len(qr.modules)
+                
+                with stageTimer.span("render"):
+                    img = QRGenerator.renderQr(qr, fgColor, bgColor, style, fill, quality)
+                
+                GENERATE_SECONDS.observe(time.perf_counter() - started, style=styleName(style))
+                CODES_GENERATED.inc(style=styleName(style), error_correction=errorCorrection.name)
+                logger.info("QR code generated: %s chars", len(content))
+                return img
+                
+        except Exception as e:
+            GENERATE_FAILURES.inc()
+            logger.error("QR generation failed: %s", e)
+            raise
+    
+    @staticmethod
+    def renderQr(
+        qr: qrcode.QRCode,
+        fgColor: str,
+        bgColor: str,
+        style: StyleRef,
+        fill: str = "",
+        quality: str = 'high'
     ) -> Image.Image:
-        """Generate QR code image with specified parameters"""
+        """Draw an already encoded QRCode in the given colours with the style's registered drawer"""
+        mask = getDrawer(style).renderMask(qr.get_matrix(), qr.box_size, qr.border, quality=quality)
+        image = Image.new('RGB', mask.size, ImageColor.getrgb(bgColor)[:3])
+        # One masked paste colours every module, including antialiased edges
+        paint = fillFor(fill)
+        if paint is not None:
+            image.paste(fillImage(paint, mask.width), (0, 0), mask)
+        else:
+            image.paste(ImageColor.getrgb(fgColor)[:3], (0, 0, *mask.size), mask)
+        return image
+    
+    @staticmethod
+    def encode(content: str, errorCorrection: ErrorCorrection, boxSize: int = 10, border: int = 0) -> qrcode.QRCode:
+        """Encode content into a QRCode ready for renderQr or get_matrix"""
         try:
-            # Library specific keyword arguments (error_correction, box_size) must remain snake_case
             qr = qrcode.QRCode(
                 version=1,
                 error_correction=errorCorrection.value[0],
@@ -35,61 +111,93 @@ class QRGenerator:
                 border=border,
             )
             qr.add_data(content)
-            qr.make(fit=True)
-            
-            # Apply style
-            moduleDrawer = None
-            if style == QRStyle.ROUNDED:
-                moduleDrawer = RoundedModuleDrawer()
-            elif style == QRStyle.CIRCLE:
-                moduleDrawer = CircleModuleDrawer()
-            elif style == QRStyle.GAPPED:
-                moduleDrawer = GappedSquareModuleDrawer()
-            
-            if moduleDrawer:
-                img = qr.make_image(
-                    image_factory=StyledPilImage,
-                    fill_color=fgColor,
-                    back_color=bgColor,
-                    module_drawer=moduleDrawer
-                )
-            else:
-                img = qr.make_image(fill_color=fgColor, back_color=bgColor)
-            
-            logger.info(f"QR code generated: {len(content)} chars")
-            return img
+            makeQr(qr)
+            return qr
             
         except Exception as e:
-            logger.error(f"QR generation failed: {e}")
+            logger.error("QR encoding failed: %s", e)
             raise
     
     @staticmethod
-    def addLogo(qrImage: Image.Image, logoPath: str, logoSizeRatio: float = 0.3) -> Image.Image:
+    def getMatrix(content: str, errorCorrection: ErrorCorrection, border: int = 0) -> List[List[bool]]:
+        """Encode content and return the module matrix, including the border"""
+        return QRGenerator.encode(content, errorCorrection, border=border).get_matrix()
+    
+    @staticmethod
+    def generateSvg(
+        content: str,
+        errorCorrection: ErrorCorrection,
+        boxSize: int,
+        border: int,
+        fgColor: str,
+        bgColor: str
+    ) -> str:
+        """Generate QR code as an SVG document with square modules"""
+        matrix = QRGenerator.getMatrix(content, errorCorrection, border)
+        return QRGenerator.svgFromMatrix(matrix, boxSize, fgColor, bgColor)
+    
+    @staticmethod
+    def svgFromMatrix(matrix: List[List[bool]], boxSize: int, fgColor: str, bgColor: str, size: int = 0) -> str:
+        """SVG document for a module matrix; size overrides the boxSize-derived pixel size"""
+        count = len(matrix)
+        
+        # One path segment per horizontal run of dark modules
+        segments = []
+        for y, row in enumerate(matrix):
+            x = 0
+            while x < count:
+                if not row[x]:
+                    x += 1
+                    continue
+                start = x
+                while x < count and row[x]:
+                    x += 1
+                segments.append(f"M{start},{y}h{x - start}v1h-{x - start}z")
+        
+        size = size or count * boxSize
+        fill, background = html.escape(fgColor), html.escape(bgColor)
+        return (
+            f'<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" '
+            f'viewBox="0 0 {count} {count}" shape-rendering="crispEdges">'
+            f'<rect width="{count}" height="{count}" fill="{background}"/>'
+            f'<path fill="{fill}" d="{"".join(segments)}"/>'
+            f'</svg>\n'
+        )
+    
+    @staticmethod
+    def addLogo(
+        qrImage: Image.Image,
+        logoPath: str,
+        logoSizeRatio: float = 0.3,
+        quality: str = 'high'
+    ) -> Image.Image:
         """Add logo to center of QR code"""
         try:
-            qrImg = qrImage.copy()
-            logo = Image.open(logoPath)
-            
-            # Calculate logo size
-            qrWidth, qrHeight = qrImg.size
-            logoSize = int(min(qrWidth, qrHeight) * logoSizeRatio)
-            
-            # Resize logo
-            logo.thumbnail((logoSize, logoSize), Image.Resampling.LANCZOS)
-            
-            # Add white background
-            logoBg = Image.new('RGB', logo.size, 'white')
-            logoBg.paste(logo, (0, 0), logo if logo.mode == 'RGBA' else None)
-            
-            # Calculate position
-            logoPos = ((qrWidth - logoSize) // 2, (qrHeight - logoSize) // 2)
-            
-            # Paste logo
-            qrImg.paste(logoBg, logoPos)
-            
-            logger.info(f"Logo added: {logoPath}")
-            return qrImg
-            
+            with memoryProfiler.profile("addLogo", imageSize=qrImage.size, logoSizeRatio=logoSizeRatio, quality=quality):
+                qrImg = qrImage.copy()
+                logo = Image.open(logoPath)
+                
+                # Calculate logo size
+                qrWidth, qrHeight = qrImg.size
+                logoSize = int(min(qrWidth, qrHeight) * logoSizeRatio)
+                
+                # Resize logo with the module drawers' filter for this quality, so logo and modules match
+                logo.thumbnail((logoSize, logoSize), SUPERSAMPLING[resolveQuality(quality)][1])
+                
+                # Add white background
+                logoBg = Image.new('RGB', logo.size, 'white')
+                logoBg.paste(logo, (0, 0), logo if logo.mode == 'RGBA' else None)
+                
+                # Calculate position
+                logoPos = ((qrWidth - logoSize) // 2, (qrHeight - logoSize) // 2)
+                
+                # Paste logo
+                qrImg.paste(logoBg, logoPos)
+                
+                logger.info("Logo added: %s", logoPath)
+                return qrImg
+                
         except Exception as e:
-            logger.error(f"Failed to add logo: {e}")
+            logger.error("Failed to add logo: %s", e)
             raise
\ No newline at end of file
@@ -0,0 +1,215 @@
+import logging
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import qrcode
+from qrcode import util
+
+logger = logging.getLogger(__name__)
+
+# The eight module values (one byte each, 0 or 1) of every codeword value, most significant bit first
+_CODEWORD_MODULES = tuple(bytes((value >> shift) & 1 for shift in range(7, -1, -1)) for value in range(256))
+
+# Dark-light-dark-dark-dark-light-dark core of the 1:1:3:1:1 finder-like penalty pattern
+_FINDER_CORE = b'\x01\x00\x01\x01\x01\x00\x01'
+_FOUR_LIGHT = b'\x00\x00\x00\x00'
+
+# int.bit_count needs Python 3.10
+_popcount = getattr(int, 'bit_count', None) or (lambda value: bin(value).count('1'))
+
+
+@lru_cache(maxsize=None)
+def _lineMasks(size: int) -> Tuple[int, int]:
+    """Per-size masks excluding the first column and the first row"""
+    notFirstColumn = int.from_bytes((b'\x00' + b'\x01' * (size - 1)) * size, 'big')
+    notFirstRow = int.from_bytes(b'\x01' * (size * (size - 1)), 'big')
+    return notFirstColumn, notFirstRow
+
+
+def _finderCount(lines: bytes) -> int:
+    count = 0
+    index = lines.find(_FINDER_CORE)
+    while index != -1:
+        if lines[index + 7:index + 11] == _FOUR_LIGHT:
+            count += 1
+        if index >= 4 and lines[index - 4:index] == _FOUR_LIGHT:
+            count += 1
+        index = lines.find(_FINDER_CORE, index + 1)
+    return count
+
+
+def _runPenalty(same: int, step: int) -> int:
+    # windows[j]: modules j-4..j are equal; each run of length n >= 5 has n - 4 of them
+    windows = same & (same >> step) & (same >> 2 * step) & (same >> 3 * step)
+    runStarts = windows & ~(same >> 4 * step)
+    return _popcount(windows) + 2 * _popcount(runStarts)
+
+
+def lostPoint(flat: bytes, size: int) -> int:
+    """Mask penalty score of a flat row-major matrix, equal to qrcode.util.lost_point.
+    
+    The matrix is treated as one big integer with a byte per module, so runs
+    and 2x2 blocks are counted with shifts and popcounts over every row and
+    column at once; finder-like patterns are located with bytes.find.
+    """
+    notFirstColumn, notFirstRow = _lineMasks(size)
+    rowStep, columnStep = 8, 8 * size
+    matrix = int.from_bytes(flat, 'big')
+    # Bit set at module j when it equals its left neighbour / the module above
+    sameLeft = ~(matrix ^ (matrix >> rowStep)) & notFirstColumn
+    sameAbove = ~(matrix ^ (matrix >> columnStep)) & notFirstRow
+    
+    score = _runPenalty(sameLeft, rowStep) + _runPenalty(sameAbove, columnStep)
+    score += 3 * _popcount(sameLeft & (sameLeft >> columnStep) & sameAbove)
+    
+    rows = b'\x02'.join([flat[i:i + size] for i in range(0, size * size, size)])
+    columns = b'\x02'.join([flat[c::size] for c in range(size)])
+    score += 40 * (_finderCount(rows) + _finderCount(columns))
+    
+    score += int(abs(flat.count(1) * 100 / (size * size) - 50) / 5) * 10
+    return score
+
+
+class VersionLayout:
+    """Static tables for one QR version, built once and shared by every encode.
+    
+    Matrices are flat row-major bytes with one 0/1 byte per module:
+    template holds the function patterns and version information, reserved
+    marks every non-data module, and placement lists the data modules in the
+    zig-zag order of QRCode.map_data.
+    """
+    
+    def __init__(self, version: int):
+        util.check_version(version)
+        self.version = version
+        self.size = size = version * 4 + 17
+        
+        # Let qrcode draw the function patterns so the tables match the library exactly
+        builder = qrcode.QRCode(version=version)
+        builder.modules_count = size
+        builder.modules = [[None] * size for _ in range(size)]
+        builder.setup_position_probe_pattern(0, 0)
+        builder.setup_position_probe_pattern(size - 7, 0)
+        builder.setup_position_probe_pattern(0, size - 7)
+        builder.setup_position_adjust_pattern()
+        builder.setup_timing_pattern()
+        functionLayer = [list(row) for row in builder.modules]
+        
+        # Format information positions, found by letting qrcode write them
+        builder.setup_type_info(True, 0)
+        self.formatIndices = tuple(
+            r * size + c for r in range(size) for c in range(size)
+            if functionLayer[r][c] is None and builder.modules[r][c] is not None
+        )
+        
+        # Mask scoring runs with blank format and version areas, as in QRCode.best_mask_pattern
+        if version >= 7:
+            builder.setup_type_number(True)
+        scoringLayer = [module for row in builder.modules for module in row]
+        self.scoringTemplate = bytes(bool(module) for module in scoringLayer)
+        self.reserved = bytes(module is not None for module in scoringLayer)
+        
+        if version >= 7:
+            builder.setup_type_number(False)
+        self.template = bytes(bool(module) for row in builder.modules for module in row)
+        
+        self.placement = self._placementOrder()
+        self.dataModules = len(self.placement)
+        
+        # Gather table: matrix module j reads data bit rank[j], or template byte j after the data bits
+        rank = {index: position for position, index in enumerate(self.placement)}
+        self._gather = array('I', (rank.get(j, self.dataModules + j) for j in range(size * size)))
+        
+        self._maskBits = [
+            int.from_bytes(bytes(maskFunc(index // size, index % size) for index in self.placement), 'big')
+            for maskFunc in map(util.mask_func, range(8))
+        ]
+        self._formatValues: Dict[Tuple[int, int], bytes] = {}
+        logger.debug("Version %s layout built: %s data modules", version, self.dataModules)
+    
+    def _placementOrder(self) -> Tuple[int, ...]:
+        """Flat indices of data modules in the order QRCode.map_data fills them"""
+        size = self.size
+        order = []
+        row, inc = size - 1, -1
+        for col in range(size - 1, 0, -2):
+            if col <= 6:
+                col -= 1
+            while True:
+                for c in (col, col - 1):
+                    if not self.reserved[row * size + c]:
+                        order.append(row * size + c)
+                row += inc
+                if row < 0 or row >= size:
+                    row -= inc
+                    inc = -inc
+                    break
+        return tuple(order)
+    
+    def formatValues(self, errorCorrection: int, mask: int) -> bytes:
+        """Format information modules for an error correction level and mask, in formatIndices order"""
+        key = (errorCorrection, mask)
+        values = self._formatValues.get(key)
+        if values is None:
+            builder = qrcode.QRCode(version=self.version, error_correction=errorCorrection)
+            builder.modules_count = self.size
+            builder.modules = [[None] * self.size for _ in range(self.size)]
+            builder.setup_type_info(False, mask)
+            values = bytes(bool(builder.modules[i // self.size][i % self.size]) for i in self.formatIndices)
+            self._formatValues[key] = values
+        return values
+    
+    def _compose(self, dataBits: int, mask: int, template: bytes) -> bytes:
+        # One C-level gather places every masked data bit and copies the template around it
+        source = (dataBits ^ self._maskBits[mask]).to_bytes(self.dataModules, 'big') + template
+        return bytes(map(source.__getitem__, self._gather))
+    
+    def place(
+        self,
+        codewords: List[int],
+        errorCorrection: int,
+        mask: Optional[int] = None
+    ) -> Tuple[List[List[bool]], int]:
+        """Module matrix (no border) for encoded codewords, choosing the best mask unless given"""
+        bits = b''.join(map(_CODEWORD_MODULES.__getitem__, codewords))
+        # Remainder modules beyond the last codeword are light before masking
+        dataBits = int.from_bytes(bits.ljust(self.dataModules, b'\x00'), 'big')
+        
+        if mask is None:
+            scores = [lostPoint(self._compose(dataBits, m, self.scoringTemplate), self.size) for m in range(8)]
+            mask = scores.index(min(scores))
+        
+        flat = bytearray(self._compose(dataBits, mask, self.template))
+        list(map(flat.__setitem__, self.formatIndices, self.formatValues(errorCorrection, mask)))
+        
+        size = self.size
+        return [list(map(bool, flat[i:i + size])) for i in range(0, size * size, size)], mask
+
+
+@lru_cache(maxsize=None)
+def layoutFor(version: int) -> VersionLayout:
+    """Shared layout for a version, built on first use"""
+    return VersionLayout(version)
+
+
+def makeQr(qr: qrcode.QRCode) -> None:
+    """Equivalent of qr.make(fit=True) using the cached version tables"""
+    qr.best_fit(start=qr.version)
+    qr.data_cache = util.create_data(qr.version, qr.error_correction, qr.data_list)
+    qr.modules, qr.mask_pattern = layoutFor(qr.version).place(qr.data_cache, qr.error_correction)
+    qr.modules_count = len(qr.modules)
+
+
+def withBorder(modules: List[List[bool]], border: int) -> List[List[bool]]:
+    """Surround a module matrix with a quiet zone of light modules"""
+    if not border:
+        return modules
+    width = len(modules) + border * 2
+    blank = [False] * width
+    edge = [False] * border
+    return (
+        [blank[:] for _ in range(border)]
+        + [edge + row + edge for row in modules]
+        + [blank[:] for _ in range(border)]
+    )
@@ -0,0 +1,90 @@
+import logging
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import qrcode
+from qrcode import util
+from qrcode.exceptions import DataOverflowError
+from PIL import Image
+
+from core.models import ErrorCorrection, RenderOptions
+from core.qr_generator import QRGenerator, CODES_GENERATED
+from core.qr_layout import layoutFor, withBorder
+from core.styles import styleName
+
+logger = logging.getLogger(__name__)
+
+
+def serialPayloads(prefix: str, start: int, count: int, width: int = 0, suffix: str = "") -> Iterator[str]:
+    """Yield prefix + zero-padded serial + suffix for count consecutive serials"""
+    for serial in range(start, start + count):
+        yield f"{prefix}{serial:0{width}d}{suffix}"
+
+
+class SerialTemplate:
+    """Encodes many payloads that share one version and error correction level.
+    
+    The version is fixed up front, so each payload skips the best-fit search
+    and goes straight from codewords to the cached version layout; only the
+    codewords, mask choice and rendering are computed per payload.
+    """
+    
+    def __init__(self, errorCorrection: ErrorCorrection, version: int):
+        self.errorCorrection = errorCorrection
+        self.version = version
+        self.layout = layoutFor(version)
+        self.size = self.layout.size
+    
+    @classmethod
+    def forPayloads(cls, payloads: Sequence[str], errorCorrection: ErrorCorrection) -> 'SerialTemplate':
+        """Template sized for the largest of the given payloads"""
+        version = 1
+        for payload in payloads:
+            qr = qrcode.QRCode(version=version, error_correction=errorCorrection.value[0])
+            qr.add_data(payload)
+            version = qr.best_fit(start=version)
+        return cls(errorCorrection, version)
+    
+    def _codewords(self, payload: str) -> List[int]:
+        try:
+            return util.create_data(
+                self.version, self.errorCorrection.value[0], util.optimal_data_chunks(payload, minimum=20)
+            )
+        except DataOverflowError as e:
+            raise ValueError(f"Payload does not fit version {self.version}: {payload!r}") from e
+    
+    def encode(self, payload: str) -> Tuple[List[List[bool]], List[int]]:
+        """Module matrix (no border) and codewords for one payload"""
+        codewords = self._codewords(payload)
+        modules, _ = self.layout.place(codewords, self.errorCorrection.value[0])
+        return modules, codewords
+    
+    def getMatrix(self, payload: str, border: int = 0) -> List[List[bool]]:
+        """Module matrix including the border, as QRGenerator.getMatrix"""
+        modules, _ = self.encode(payload)
+        return withBorder(modules, border)
+    
+    def generate(self, payload: str, options: Optional[RenderOptions] = None) -> Image.Image:
+        """Render one payload with the given options"""
+        options = options or RenderOptions(errorCorrection=self.errorCorrection)
+        modules, codewords = self.encode(payload)
+        qr = qrcode.QRCode(
+            version=self.version,
+            error_correction=self.errorCorrection.value[0],
+            box_size=options.boxSize,
+            border=options.border
+        )
+        qr.modules = modules
+        qr.modules_count = self.size
+        qr.data_cache = codewords
+        image = QRGenerator.renderQr(qr, options.fgColor, options.bgColor, options.style, options.fill, options.quality)
+        CODES_GENERATED.inc(style=styleName(options.style), error_correction=self.errorCorrection.name)
+        return image
+    
+    def generateSeries(
+        self,
+        payloads: Sequence[str],
+        options: Optional[RenderOptions] = None
+    ) -> Iterator[Tuple[str, Image.Image]]:
+        """Lazily render (payload, image) pairs"""
+        for payload in payloads:
+            yield payload, self.generate(payload, options)
@@ -0,0 +1,227 @@
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import reduce
+from operator import xor
+from typing import List, Optional, Sequence, Tuple
+
+import qrcode
+from qrcode import base, util
+from PIL import Image
+
+from core.models import ErrorCorrection, RenderOptions
+from core.qr_generator import QRGenerator, CODES_GENERATED
+from core.qr_layout import layoutFor, withBorder
+from core.styles import styleName
+
+logger = logging.getLogger(__name__)
+
+# ISO/IEC 18004 allows at most 16 symbols in one Structured Append set
+MAX_SYMBOLS = 16
+
+# Mode indicator 0011, then 4-bit position, 4-bit count - 1 and the 8-bit parity
+MODE_STRUCTURED_APPEND = 0b0011
+HEADER_BITS = 20
+
+
+def structuredAppendParity(content: str) -> int:
+    """XOR of every byte of the whole message, shared by all symbols of a set"""
+    return reduce(xor, content.encode('utf-8'), 0)
+
+
+def splitContent(content: str, count: int) -> List[str]:
+    """Split content into count parts of about equal UTF-8 size, never inside a character"""
+    total = len(content.encode('utf-8'))
+    parts = []
+    start = 0
+    size = 0
+    for index, char in enumerate(content):
+        width = len(char.encode('utf-8'))
+        # Cut before the character that would take this part past its share
+        if len(parts) < count - 1 and index > start and size + width > total * (len(parts) + 1) / count:
+            parts.append(content[start:index])
+            start = index
+        size += width
+    parts.append(content[start:])
+    return parts
+
+
+def _bitLimit(version: int, errorCorrection: int) -> int:
+    return sum(block.data_count * 8 for block in base.rs_blocks(version, errorCorrection))
+
+
+def _segmentBuffer(
+    dataList: Sequence[util.QRData],
+    version: int,
+    header: Optional[Tuple[int, int, int]]
+) -> util.BitBuffer:
+    buffer = util.BitBuffer()
+    if header is not None:
+        position, total, parity = header
+        buffer.put(MODE_STRUCTURED_APPEND, 4)
+        buffer.put(position, 4)
+        buffer.put(total - 1, 4)
+        buffer.put(parity, 8)
+    for data in dataList:
+        buffer.put(data.mode, 4)
+        buffer.put(len(data), util.length_in_bits(data.mode, version))
+        data.write(buffer)
+    return buffer
+
+
+def _dataBits(dataList: Sequence[util.QRData], version: int, header: Optional[Tuple[int, int, int]]) -> int:
+    # Length of _segmentBuffer's output, computed without writing any bits
+    bits = HEADER_BITS if header is not None else 0
+    for data in dataList:
+        length = len(data)
+        if data.mode == util.MODE_NUMBER:
+            payload = 10 * (length // 3) + (0, 4, 7)[length % 3]
+        elif data.mode == util.MODE_ALPHA_NUM:
+            payload = 11 * (length // 2) + 6 * (length % 2)
+        elif data.mode == util.MODE_KANJI:
+            payload = 13 * (length // 2)
+        else:
+            payload = 8 * length
+        bits += 4 + util.length_in_bits(data.mode, version) + payload
+    return bits
+
+
+def symbolCodewords(
+    part: str,
+    version: int,
+    errorCorrection: int,
+    header: Optional[Tuple[int, int, int]] = None
+) -> List[int]:
+    """Codewords for one symbol, as util.create_data with an optional (position, total, parity) header"""
+    buffer = _segmentBuffer(util.optimal_data_chunks(part, minimum=20), version, header)
+    bitLimit = _bitLimit(version, errorCorrection)
+    if len(buffer) > bitLimit:
+        raise ValueError(f"Symbol data ({len(buffer)} bits) exceeds version {version} capacity ({bitLimit} bits)")
+    
+    # Terminator, byte alignment and alternating pad codewords, exactly as create_data
+    for _ in range(min(bitLimit - len(buffer), 4)):
+        buffer.put_bit(False)
+    if len(buffer) % 8:
+        for _ in range(8 - len(buffer) % 8):
+            buffer.put_bit(False)
+    for i in range((bitLimit - len(buffer)) // 8):
+        buffer.put(util.PAD1 if i % 2 else util.PAD0, 8)
+    
+    return util.create_bytes(buffer, base.rs_blocks(version, errorCorrection))
+
+
+@dataclass(frozen=True)
+class SymbolSpec:
+    """One symbol of a Structured Append set"""
+    part: str
+    position: int
+    total: int
+    parity: int
+    version: int
+    
+    @property
+    def header(self) -> Optional[Tuple[int, int, int]]:
+        """Structured Append header fields, or None for a lone symbol"""
+        return (self.position, self.total, self.parity) if self.total > 1 else None
+
+
+def renderSymbol(spec: SymbolSpec, options: RenderOptions) -> Image.Image:
+    """Encode and draw one symbol; module level so process pools can run it"""
+    errorCorrection = options.errorCorrection.value[0]
+    codewords = symbolCodewords(spec.part, spec.version, errorCorrection, spec.header)
+    qr = qrcode.QRCode(
+        version=spec.version,
+        error_correction=errorCorrection,
+        box_size=options.boxSize,
+        border=options.border
+    )
+    qr.modules, qr.mask_pattern = layoutFor(spec.version).place(codewords, errorCorrection)
+    qr.modules_count = len(qr.modules)
+    qr.data_cache = codewords
+    return QRGenerator.renderQr(qr, options.fgColor, options.bgColor, options.style, options.fill, options.quality)
+
+
+def _renderJob(job: Tuple[SymbolSpec, RenderOptions]) -> Image.Image:
+    return renderSymbol(*job)
+
+
+class StructuredAppend:
+    """Splits a payload too large for one small symbol across up to 16 linked symbols.
+    
+    Every symbol carries a Structured Append header (position, set size and
+    the parity of the whole message), so readers that support the mode
+    reassemble the payload whatever order the symbols are scanned in. All
+    symbols of a set share the smallest version that fits every part.
+    """
+    
+    def __init__(self, errorCorrection: ErrorCorrection = ErrorCorrection.MEDIUM, maxVersion: int = 10):
+        util.check_version(maxVersion)
+        self.errorCorrection = errorCorrection
+        self.maxVersion = maxVersion
+    
+    def _fitVersion(self, part: str, header: Optional[Tuple[int, int, int]]) -> Optional[int]:
+        dataList = list(util.optimal_data_chunks(part, minimum=20))
+        errorCorrection = self.errorCorrection.value[0]
+        for version in range(1, self.maxVersion + 1):
+            if _dataBits(dataList, version, header) <= _bitLimit(version, errorCorrection):
+                return version
+        return None
+    
+    def plan(self, content: str) -> List[SymbolSpec]:
+        """Choose the fewest symbols that keep every part within maxVersion"""
+        if not content:
+            raise ValueError("Payload is empty")
+        parity = structuredAppendParity(content)
+        
+        for count in range(1, MAX_SYMBOLS + 1):
+            parts = splitContent(content, count)
+            if len(parts) < count:
+                break
+            header = (0, count, parity) if count > 1 else None
+            versions = [self._fitVersion(part, header) for part in parts]
+            if None not in versions:
+                version = max(versions)
+                logger.info("Structured Append plan: %s symbols at version %s", count, version)
+                return [SymbolSpec(part, position, count, parity, version) for position, part in enumerate(parts)]
+        
+        raise ValueError(
+            f"Payload of {len(content.encode('utf-8'))} bytes does not fit {MAX_SYMBOLS} symbols at version {self.maxVersion}"
+        )
+    
+    def getMatrices(self, content: str, border: int = 0) -> List[List[List[bool]]]:
+        """Module matrices of every symbol in set order, including the border"""
+        errorCorrection = self.errorCorrection.value[0]
+        matrices = []
+        for spec in self.plan(content):
+            codewords = symbolCodewords(spec.part, spec.version, errorCorrection, spec.header)
+            modules, _ = layoutFor(spec.version).place(codewords, errorCorrection)
+            matrices.append(withBorder(modules, border))
+        return matrices
+    
+    def generate(
+        self,
+        content: str,
+        options: Optional[RenderOptions] = None,
+        executor: Optional[Executor] = None
+    ) -> List[Tuple[SymbolSpec, Image.Image]]:
+        """Render every symbol of the set in parallel, returned in set order.
+        
+        Without an executor a process pool sized to the set is used for the call.
+        """
+        options = options or RenderOptions(errorCorrection=self.errorCorrection)
+        if options.errorCorrection != self.errorCorrection:
+            raise ValueError("Render options must use the error correction level the set was planned for")
+        specs = self.plan(content)
+        jobs = [(spec, options) for spec in specs]
+        
+        if executor is not None:
+            images = list(executor.map(_renderJob, jobs))
+        elif len(jobs) == 1:
+            images = [_renderJob(jobs[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as pool:
+                images = list(pool.map(_renderJob, jobs))
+        
+        CODES_GENERATED.inc(len(images), style=styleName(options.style), error_correction=self.errorCorrection.name)
+        return list(zip(specs, images))
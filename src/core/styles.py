@@ -0,0 +1,332 @@
+import importlib
+import inspect
+import logging
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+from PIL import Image, ImageChops, ImageDraw
+
+from core.models import QRStyle
+
+logger = logging.getLogger(__name__)
+
+QUALITY_LEVELS = ('none', 'fast', 'high')
+
+# Supersampling factor and downscaling filter per antialias quality; "high" matches qrcode's styled drawers
+SUPERSAMPLING = {
+    'none': (1, Image.Resampling.NEAREST),
+    'fast': (2, Image.Resampling.BILINEAR),
+    'high': (4, Image.Resampling.LANCZOS)
+}
+
+StyleRef = Union[QRStyle, str]
+
+
+def resolveQuality(quality: str) -> str:
+    """Normalised antialias quality level"""
+    level = str(quality).strip().lower()
+    if level not in SUPERSAMPLING:
+        raise ValueError(f"Unknown antialias quality: {quality} (use {', '.join(QUALITY_LEVELS)})")
+    return level
+
+
+@lru_cache(maxsize=None)
+def _takesQuality(function) -> bool:
+    # Drawers written before quality levels existed take only the module arguments
+    try:
+        parameters = inspect.signature(function).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(
+        (p.name == 'quality' and p.kind != p.POSITIONAL_ONLY) or p.kind == p.VAR_KEYWORD for p in parameters
+    )
+
+
+def callWithQuality(method, *args, quality: str = 'high'):
+    """Call a drawer method, passing quality by keyword only when its signature has a quality parameter"""
+    if _takesQuality(getattr(method, '__func__', method)):
+        return method(*args, quality=quality)
+    return method(*args)
+
+
+def moduleImage(matrix: Sequence[Sequence[bool]], top: int = 0, bottom: Optional[int] = None) -> Image.Image:
+    """One greyscale pixel per module (255 = dark) for rows top..bottom of a matrix"""
+    rows = matrix[top:bottom]
+    width = len(matrix[0]) if matrix else 0
+    return Image.frombytes('L', (width, len(rows)), bytes(255 if module else 0 for row in rows for module in row))
+
+
+def upscale(modules: Image.Image, modulePx: int) -> Image.Image:
+    """Blow a one-pixel-per-module image up to modulePx pixels per module"""
+    return modules.resize((modules.width * modulePx, modules.height * modulePx), Image.Resampling.NEAREST)
+
+
+def tile(stamp: Image.Image, columns: int, rows: int) -> Image.Image:
+    """Repeat a stamp across a grid with one paste per column and one per row"""
+    strip = Image.new(stamp.mode, (stamp.width * columns, stamp.height))
+    for column in range(columns):
+        strip.paste(stamp, (column * stamp.width, 0))
+    tiled = Image.new(stamp.mode, (strip.width, stamp.height * rows))
+    for row in range(rows):
+        tiled.paste(strip, (0, row * stamp.height))
+    return tiled
+
+
+def stampModules(modules: Image.Image, stamp: Image.Image) -> Image.Image:
+    """Coverage mask with the stamp on every dark module, in whole-image operations"""
+    return ImageChops.multiply(upscale(modules, stamp.width), tile(stamp, modules.width, modules.height))
+
+
+class ModuleDrawer:
+    """Base class for style plugins.
+    
+    A drawer paints a whole module matrix at once: paint() receives one
+    pixel per module and returns a greyscale coverage mask at modulePx
+    pixels per module, so subclasses should work with whole-image Pillow
+    operations (masks, tiled stamps, ImageChops) rather than per module.
+    Finder patterns are drawn square afterwards, as in qrcode's styled
+    images, so paint() can draw every module the same way. Shapes with
+    curved or diagonal edges should honour the antialias quality through
+    SUPERSAMPLING; "none" gives hard 1-bit edges for thermal printers.
+    Drawers whose paint() or stamp() take no quality argument still work,
+    and draw the same at every level.
+    """
+    
+    # Module rows of context paint() needs on each side, for drawers that look at neighbours
+    CONTEXT_ROWS = 0
+    
+    def paint(self, modules: Image.Image, modulePx: int, quality: str = 'high') -> Image.Image:
+        """Coverage mask ('L', 255 = foreground) for a one-pixel-per-module image"""
+        raise NotImplementedError
+    
+    def renderMask(
+        self,
+        matrix: Sequence[Sequence[bool]],
+        modulePx: int,
+        border: int,
+        top: int = 0,
+        bottom: Optional[int] = None,
+        quality: str = 'high'
+    ) -> Image.Image:
+        """Coverage mask for module rows top..bottom of a bordered matrix, finder patterns drawn square"""
+        count = len(matrix)
+        bottom = count if bottom is None else bottom
+        # Paint a few extra rows so neighbour-aware shapes match across band edges, then crop them off
+        first, last = max(0, top - self.CONTEXT_ROWS), min(count, bottom + self.CONTEXT_ROWS)
+        modules = moduleImage(matrix, first, last)
+        mask = callWithQuality(self.paint, modules, modulePx, quality=quality)
+        if (first, last) != (top, bottom):
+            mask = mask.crop((0, (top - first) * modulePx, mask.width, (bottom - first) * modulePx))
+        
+        size = count - 2 * border
+        for row, column in ((0, 0), (0, size - 7), (size - 7, 0)):
+            eyeTop, eyeBottom = max(border + row, top), min(border + row + 7, bottom)
+            if eyeTop >= eyeBottom:
+                continue
+            left = border + column
+            eye = modules.crop((left, eyeTop - first, left + 7, eyeBottom - first))
+            mask.paste(upscale(eye, modulePx), (left * modulePx, (eyeTop - top) * modulePx))
+        return mask
+
+
+class SquareDrawer(ModuleDrawer):
+    """Plain square modules"""
+    
+    def paint(self, modules: Image.Image, modulePx: int, quality: str = 'high') -> Image.Image:
+        """Coverage mask ('L', 255 = foreground) for a one-pixel-per-module image"""
+        return upscale(modules, modulePx)
+
+
+class StampDrawer(ModuleDrawer):
+    """Draws the same greyscale stamp on every dark module"""
+    
+    def stamp(self, modulePx: int, quality: str = 'high') -> Image.Image:
+        """Coverage of one dark module"""
+        raise NotImplementedError
+    
+    def paint(self, modules: Image.Image, modulePx: int, quality: str = 'high') -> Image.Image:
+        """Coverage mask ('L', 255 = foreground) for a one-pixel-per-module image"""
+        return stampModules(modules, callWithQuality(self.stamp, modulePx, quality=quality))
+
+
+class CircleDrawer(StampDrawer):
+    """Antialiased circles, as qrcode's CircleModuleDrawer"""
+    
+    @lru_cache(maxsize=32)
+    def stamp(self, modulePx: int, quality: str = 'high') -> Image.Image:
+        """Coverage of one dark module"""
+        factor, resample = SUPERSAMPLING[quality]
+        fake = modulePx * factor
+        # Drawn dark on light and inverted, so LANCZOS rounds the same way as qrcode's black-on-white circle
+        circle = Image.new('L', (fake, fake), 255)
+        ImageDraw.Draw(circle).ellipse((0, 0, fake, fake), fill=0)
+        return ImageChops.invert(circle.resize((modulePx, modulePx), resample))
+
+
+class GappedDrawer(StampDrawer):
+    """Squares shrunk to leave a gap, as qrcode's GappedSquareModuleDrawer"""
+    
+    SIZE_RATIO = 0.8
+    
+    @lru_cache(maxsize=32)
+    def stamp(self, modulePx: int, quality: str = 'high') -> Image.Image:
+        """Coverage of one dark module"""
+        # Rounded so float noise cannot shift the gap; qrcode's own gaps drift with the module position
+        delta = round((1 - self.SIZE_RATIO) * modulePx / 2, 6)
+        gapped = Image.new('L', (modulePx, modulePx), 0)
+        ImageDraw.Draw(gapped).rectangle((delta, delta, modulePx - 1 - delta, modulePx - 1 - delta), fill=255)
+        return gapped
+
+
+class RoundedDrawer(ModuleDrawer):
+    """Modules whose outside corners are rounded, as qrcode's RoundedModuleDrawer.
+    
+    Each quadrant of a module is rounded when both neighbours it touches are
+    light. Quadrants are solid by default, and the rounded-off corners are
+    cut away in bulk: one neighbour test per quadrant over the module image,
+    then a tiled cut stamp subtracted where the test holds.
+    """
+    
+    CONTEXT_ROWS = 1
+    
+    @lru_cache(maxsize=32)
+    def stamps(self, modulePx: int, quality: str = 'high'):
+        """Solid module stamp, and per quadrant the cut stamp with the sides it depends on"""
+        factor, resample = SUPERSAMPLING[quality]
+        corner = modulePx // 2
+        fake = corner * factor
+        base = Image.new('L', (fake, fake), 0)
+        draw = ImageDraw.Draw(base)
+        draw.ellipse((0, 0, fake * 2, fake * 2), fill=255)
+        draw.rectangle((fake, 0, fake, fake), fill=255)
+        draw.rectangle((0, fake, fake, fake), fill=255)
+        # Quadrants are corner pixels wide; with an odd module size the last row and column stay light
+        northWest = ImageChops.invert(base.resize((corner, corner), resample))
+        solid = Image.new('L', (modulePx, modulePx), 0)
+        solid.paste(255, (0, 0, corner * 2, corner * 2))
+        
+        cuts = []
+        for sides, quadrant, position in (
+            (('north', 'west'), northWest, (0, 0)),
+            (('north', 'east'), northWest.transpose(Image.Transpose.FLIP_LEFT_RIGHT), (corner, 0)),
+            (('south', 'east'), northWest.transpose(Image.Transpose.ROTATE_180), (corner, corner)),
+            (('south', 'west'), northWest.transpose(Image.Transpose.FLIP_TOP_BOTTOM), (0, corner))
+        ):
+            cut = Image.new('L', (modulePx, modulePx), 0)
+            cut.paste(quadrant, position)
+            cuts.append((sides, cut))
+        return solid, cuts
+    
+    @staticmethod
+    def _shifted(modules: Image.Image, dx: int, dy: int) -> Image.Image:
+        # Pixel (x, y) of the result is the module at (x - dx, y - dy); modules off the edge are light
+        shifted = Image.new('L', modules.size, 0)
+        shifted.paste(modules, (dx, dy))
+        return shifted
+    
+    def paint(self, modules: Image.Image, modulePx: int, quality: str = 'high') -> Image.Image:
+        """Coverage mask ('L', 255 = foreground) for a one-pixel-per-module image"""
+        solid, cuts = self.stamps(modulePx, quality)
+        mask = stampModules(modules, solid)
+        neighbours = {
+            'north': self._shifted(modules, 0, 1),
+            'south': self._shifted(modules, 0, -1),
+            'west': self._shifted(modules, 1, 0),
+            'east': self._shifted(modules, -1, 0)
+        }
+        for (first, second), cut in cuts:
+            # Dark modules whose two neighbours on this corner are both light
+            rounded = ImageChops.subtract(modules, ImageChops.lighter(neighbours[first], neighbours[second]))
+            mask = ImageChops.subtract(mask, stampModules(rounded, cut))
+        return mask
+
+
+_registry: Dict[str, ModuleDrawer] = {
+    QRStyle.SQUARE.value: SquareDrawer(),
+    QRStyle.ROUNDED.value: RoundedDrawer(),
+    QRStyle.CIRCLE.value: CircleDrawer(),
+    QRStyle.GAPPED.value: GappedDrawer()
+}
+_registryLock = threading.Lock()
+_pluginsLoaded = False
+
+
+def registerStyle(name: str, drawer: ModuleDrawer, replace: bool = False) -> None:
+    """Make a drawer available under a style name for generate, the CLI, the servers and the GUI"""
+    if not isinstance(drawer, ModuleDrawer):
+        raise TypeError(f"Style {name!r} must be a ModuleDrawer, got {type(drawer).__name__}")
+    with _registryLock:
+        existing = _findName(name)
+        if existing and not replace:
+            raise ValueError(f"Style already registered: {existing}")
+        _registry[existing or name] = drawer
+    logger.info("Style registered: %s (%s)", name, type(drawer).__name__)
+
+
+def _findName(name: str) -> Optional[str]:
+    lowered = name.strip().lower()
+    for registered in _registry:
+        if registered.lower() == lowered:
+            return registered
+    # Built-ins are also accepted by their enum name, e.g. GAPPED
+    member = QRStyle.__members__.get(name.strip().upper())
+    return member.value if member else None
+
+
+def loadStylePlugins(modules: Optional[Iterable[str]] = None) -> None:
+    """Import plugin modules, which call registerStyle when imported.
+    
+    Without arguments, modules come from the "style_plugins" setting and the
+    QRGEN_STYLE_PLUGINS environment variable (comma separated), once per
+    process, so worker processes pick up the same styles as their parent.
+    """
+    global _pluginsLoaded
+    if modules is None:
+        if _pluginsLoaded:
+            return
+        _pluginsLoaded = True
+        # Imported here because services depend on core, not the other way round
+        from services.settings_service import SettingsService
+        modules = list(SettingsService().get("style_plugins", []))
+        modules += [name.strip() for name in os.getenv('QRGEN_STYLE_PLUGINS', '').split(",") if name.strip()]
+    
+    for moduleName in modules:
+        try:
+            importlib.import_module(moduleName)
+        except Exception as e:
+            # A broken plugin must not take the built-in styles down with it
+            logger.error("Style plugin %s failed to load: %s", moduleName, e)
+
+
+def resolveStyle(name: StyleRef) -> StyleRef:
+    """The QRStyle for a built-in style name, or the registered name of a plugin style"""
+    if isinstance(name, QRStyle):
+        return name
+    registered = _findName(str(name))
+    if registered is None:
+        loadStylePlugins()
+        registered = _findName(str(name))
+    if registered is None:
+        raise ValueError(f"Unknown style: {name} (available: {', '.join(styleNames())})")
+    try:
+        return QRStyle(registered)
+    except ValueError:
+        return registered
+
+
+def styleName(style: StyleRef) -> str:
+    """Display and registry name of a style"""
+    return style.value if isinstance(style, QRStyle) else str(style)
+
+
+def styleNames() -> List[str]:
+    """Every available style name, built-ins first"""
+    loadStylePlugins()
+    return list(_registry)
+
+
+def getDrawer(style: StyleRef) -> ModuleDrawer:
+    """Drawer registered for a style"""
+    return _registry[styleName(resolveStyle(style))]
@@ -0,0 +1,105 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+
+class _NullSpan:
+    """Shared no-op span returned while timing is disabled"""
+    
+    elapsed = 0.0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, excType, excValue, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Times one stage and reports it to the owning timer"""
+    
+    __slots__ = ('timer', 'stage', 'started', 'elapsed')
+    
+    def __init__(self, timer: 'StageTimer', stage: str):
+        self.timer = timer
+        self.stage = stage
+        self.started = 0.0
+        self.elapsed = 0.0
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, excType, excValue, traceback):
+        self.elapsed = time.perf_counter() - self.started
+        self.timer.record(self.stage, self.elapsed)
+        return False
+
+
+class StageTimer:
+    """In-process aggregator of per-stage durations"""
+    
+    def __init__(self, maxSamples: int = 1000):
+        self.enabled = os.getenv('QRGEN_TIMING', '') not in ('', '0')
+        self.maxSamples = maxSamples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+    
+    def span(self, stage: str):
+        """Context manager timing one stage; near-free when disabled"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, stage)
+    
+    def record(self, stage: str, seconds: float) -> None:
+        """Add one sample for a stage"""
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.maxSamples)
+            samples.append(seconds)
+        logger.debug("Stage %s: %.3f ms", stage, seconds * 1000)
+    
+    def percentiles(self, stage: str, points: Iterable[int] = (50, 90, 99)) -> Dict[str, float]:
+        """Nearest-rank percentiles for a stage, in milliseconds"""
+        with self._lock:
+            samples: List[float] = sorted(self._samples.get(stage, ()))
+        if not samples:
+            return {}
+        
+        result = {'count': len(samples)}
+        for point in points:
+            rank = max(0, min(len(samples) - 1, -(-point * len(samples) // 100) - 1))
+            result[f"p{point}"] = samples[rank] * 1000
+        return result
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Percentiles for every recorded stage"""
+        with self._lock:
+            stages = list(self._samples)
+        return {stage: self.percentiles(stage) for stage in stages}
+    
+    def logSummary(self) -> None:
+        """Write the percentile table to the log"""
+        for stage, stats in self.summary().items():
+            logger.info(
+                "Stage %s: n=%s p50=%.2f ms p90=%.2f ms p99=%.2f ms",
+                stage, stats['count'], stats['p50'], stats['p90'], stats['p99']
+            )
+    
+    def reset(self) -> None:
+        """Discard all samples"""
+        with self._lock:
+            self._samples.clear()
+
+
+# Process-wide timer used by the controller and the engine
+stageTimer = StageTimer()
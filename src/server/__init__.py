@@ -0,0 +1,23 @@
+__all__ = [
+    'QRHttpServer',
+    'QRDaemon',
+    'DaemonClient',
+    'HotFolderWatcher'
+]
+
+
+def __getattr__(name):
+    # Resolve lazily so the thin daemon client never imports the engine
+    if name == 'QRHttpServer':
+        from .http_server import QRHttpServer
+        return QRHttpServer
+    if name == 'QRDaemon':
+        from .daemon import QRDaemon
+        return QRDaemon
+    if name == 'DaemonClient':
+        from .daemon_client import DaemonClient
+        return DaemonClient
+    if name == 'HotFolderWatcher':
+        from .watcher import HotFolderWatcher
+        return HotFolderWatcher
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,162 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import stat
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from core.memory_profiler import memoryProfiler
+from core.models import RenderOptions
+from core.styles import styleNames
+from server.http_server import (
+    MetricsHttpServer,
+    addCacheArguments,
+    addMetricsArguments,
+    openDiskCache,
+    renderInPool,
+    startSnapshotWriter
+)
+from server.protocol import DEFAULT_SOCKET_PATH, ProtocolError, encodeFrame, encodeJson, readFrame
+from services.disk_cache import DiskCache
+from services.render_service import RenderService
+
+logger = logging.getLogger(__name__)
+
+
+def warmUp() -> None:
+    """Render one code per style so every request only pays for the render itself"""
+    for style in styleNames():
+        RenderService.renderBytes("warm-up", RenderOptions(style=style), 'PNG')
+
+
+class QRDaemon:
+    """Long-lived generator serving length-prefixed requests on a Unix socket"""
+    
+    def __init__(
+        self,
+        socketPath: str = DEFAULT_SOCKET_PATH,
+        executor: Optional[Executor] = None,
+        metricsServer: Optional[MetricsHttpServer] = None,
+        cache: Optional[DiskCache] = None
+    ):
+        self.socketPath = socketPath
+        self.executor = executor or ThreadPoolExecutor()
+        self.metricsServer = metricsServer
+        self.cache = cache
+        self.requestCount = 0
+    
+    async def serveForever(self) -> None:
+        """Bind the socket and serve until cancelled"""
+        self._removeStaleSocket()
+        os.makedirs(os.path.dirname(self.socketPath) or ".", exist_ok=True)
+        
+        if self.metricsServer:
+            await self.metricsServer.start()
+        
+        server = await asyncio.start_unix_server(self._handleConnection, path=self.socketPath)
+        os.chmod(self.socketPath, 0o600)
+        logger.info("Generator daemon listening on %s", self.socketPath)
+        
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if os.path.exists(self.socketPath):
+                os.unlink(self.socketPath)
+    
+    def _removeStaleSocket(self) -> None:
+        """Unlink a socket left by a daemon that is gone; refuse to take over one that still answers"""
+        try:
+            mode = os.lstat(self.socketPath).st_mode
+        except FileNotFoundError:
+            return
+        # Connecting to a regular file is refused too, so a mistyped path must not reach the unlink
+        if not stat.S_ISSOCK(mode):
+            raise FileExistsError(f"{self.socketPath} exists and is not a socket")
+        
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socketPath)
+        except FileNotFoundError:
+            return
+        except ConnectionRefusedError:
+            # Nobody is listening, so the socket is stale from an earlier run
+            os.unlink(self.socketPath)
+            return
+        finally:
+            probe.close()
+        raise FileExistsError(f"Another daemon is already listening on {self.socketPath}")
+    
+    async def _handleConnection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one connection until the client disconnects"""
+        try:
+            while True:
+                try:
+                    frame = await readFrame(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                
+                try:
+                    params = RenderService.paramsFromDocument(json.loads(frame))
+                    qrType, data, options = RenderService.splitParams(params)
+                    fileFormat = RenderService.normalizeFormat(str(params.get('format', 'PNG')))
+                    content = RenderService.buildContent(qrType, data)
+                    payload = await renderInPool(self.executor, "daemon", content, options, fileFormat, self.cache)
+                    status = {'ok': True, 'format': fileFormat, 'mediaType': RenderService.MEDIA_TYPES[fileFormat]}
+                except (ValueError, TypeError) as e:
+                    status, payload = {'ok': False, 'error': str(e)}, b""
+                except Exception as e:
+                    logger.error("Daemon request failed: %s", e, exc_info=True)
+                    status, payload = {'ok': False, 'error': "Internal error"}, b""
+                
+                self.requestCount += 1
+                writer.write(encodeJson(status) + encodeFrame(payload))
+                await writer.drain()
+        except (ConnectionError, ProtocolError) as e:
+            logger.warning("Daemon connection dropped: %s", e)
+        finally:
+            writer.close()
+
+
+def main(argv=None) -> int:
+    """Entry point for the daemon command"""
+    parser = argparse.ArgumentParser(prog="main.py daemon", description="Run a persistent generator on a Unix socket")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="socket path")
+    parser.add_argument("--workers", type=int, default=None, help="render worker count")
+    parser.add_argument("--processes", action="store_true", help="render in worker processes instead of threads")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this local port")
+    addMetricsArguments(parser)
+    addCacheArguments(parser)
+    args = parser.parse_args(argv)
+    
+    if not hasattr(asyncio, 'start_unix_server'):
+        logger.error("Unix domain sockets are not supported on this platform")
+        return 1
+    
+    warmUp()
+    if args.processes:
+        executor = ProcessPoolExecutor(max_workers=args.workers, initializer=warmUp)
+    else:
+        executor = ThreadPoolExecutor(max_workers=args.workers)
+    
+    metricsServer = MetricsHttpServer("127.0.0.1", args.metrics_port) if args.metrics_port else None
+    snapshotWriter = startSnapshotWriter(args)
+    if memoryProfiler.enabled:
+        memoryProfiler.installSignalHandler()
+    
+    with executor:
+        daemon = QRDaemon(args.socket, executor, metricsServer, openDiskCache(args))
+        try:
+            asyncio.run(daemon.serveForever())
+        except KeyboardInterrupt:
+            logger.info("Generator daemon stopped after %s requests", daemon.requestCount)
+        except OSError as e:
+            logger.error("%s", e)
+            return 1
+        finally:
+            if snapshotWriter:
+                snapshotWriter.stop()
+    return 0
\ No newline at end of file
@@ -0,0 +1,63 @@
+import json
+import socket
+from typing import Any, Dict, Optional
+
+from server.protocol import DEFAULT_SOCKET_PATH, ProtocolError, encodeJson, recvFrame
+
+
+class DaemonError(RuntimeError):
+    """Raised when the daemon rejects a request"""
+
+
+class DaemonClient:
+    """Thin blocking client for the generator daemon; imports nothing from the engine"""
+    
+    def __init__(self, socketPath: str = DEFAULT_SOCKET_PATH, timeout: Optional[float] = 30.0):
+        self.socketPath = socketPath
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+    
+    def connect(self) -> None:
+        """Open the connection (done automatically on first request)"""
+        if self._sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socketPath)
+            self._sock = sock
+    
+    def close(self) -> None:
+        """Close the connection"""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+    
+    def __enter__(self):
+        self.connect()
+        return self
+    
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+        return False
+    
+    def generate(
+        self,
+        qrType: str = "Text",
+        data: Optional[Dict[str, Any]] = None,
+        options: Optional[Dict[str, Any]] = None,
+        fileFormat: str = "PNG"
+    ) -> bytes:
+        """Render one code and return the encoded bytes"""
+        self.connect()
+        request = {'type': qrType, 'data': data or {}, 'options': options or {}, 'format': fileFormat}
+        try:
+            self._sock.sendall(encodeJson(request))
+            status = json.loads(recvFrame(self._sock))
+            payload = recvFrame(self._sock)
+        except (OSError, ValueError, ProtocolError):
+            # A half-read response leaves the stream unusable
+            self.close()
+            raise
+        
+        if not status.get('ok'):
+            raise DaemonError(status.get('error', "Unknown daemon error"))
+        return payload
\ No newline at end of file
@@ -0,0 +1,310 @@
+import argparse
+import asyncio
+import json
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from core.fills import fillFor
+from core.memory_profiler import memoryProfiler
+from core.metrics import SnapshotWriter, metrics
+from core.models import RenderOptions
+from services.disk_cache import DiskCache
+from services.render_service import RenderService
+from services.settings_service import SettingsService
+
+logger = logging.getLogger(__name__)
+
+HTTP_REQUESTS = metrics.counter("qr_http_requests_total", "HTTP requests served", ("method", "status"))
+CACHE_REQUESTS = metrics.counter("qr_cache_requests_total", "Cache lookups by outcome", ("cache", "result"))
+QUEUE_DEPTH = metrics.gauge("qr_render_queue_depth", "Renders queued or running on the worker pool", ("server",))
+RENDER_SECONDS = metrics.histogram(
+    "qr_render_seconds", "Render latency including worker pool wait", ("server", "format")
+)
+
+
+async def renderInPool(
+    executor: Executor,
+    serverName: str,
+    content: str,
+    options: RenderOptions,
+    fileFormat: str,
+    cache: Optional[DiskCache] = None
+) -> bytes:
+    """Run a render on the worker pool, tracking queue depth and latency"""
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    QUEUE_DEPTH.inc(server=serverName)
+    try:
+        return await loop.run_in_executor(executor, RenderService.renderCached, content, options, fileFormat, cache)
+    finally:
+        QUEUE_DEPTH.dec(server=serverName)
+        RENDER_SECONDS.observe(time.perf_counter() - started, server=serverName, format=fileFormat)
+
+
+class HttpError(Exception):
+    """Error that maps directly to an HTTP status response"""
+    
+    def __init__(self, status: HTTPStatus, message: str = ""):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+class QRHttpServer:
+    """Asyncio HTTP front end for the generation engine"""
+    
+    MAX_HEADER_BYTES = 16 * 1024
+    MAX_BODY_BYTES = 64 * 1024
+    TEXT_HEADERS = {'Content-Type': 'text/plain; charset=utf-8'}
+    
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        executor: Optional[Executor] = None,
+        maxAge: int = 86400,
+        cache: Optional[DiskCache] = None
+    ):
+        self.host = host
+        self.port = port
+        self.executor = executor or ThreadPoolExecutor()
+        self.maxAge = maxAge
+        self.cache = cache
+        self._server: Optional[asyncio.AbstractServer] = None
+    
+    async def start(self) -> None:
+        """Bind the listening socket"""
+        self._server = await asyncio.start_server(
+            self._handleConnection, self.host, self.port, limit=self.MAX_HEADER_BYTES
+        )
+        logger.info("HTTP server listening on http://%s:%s", self.host, self.port)
+    
+    async def serveForever(self) -> None:
+        """Start and serve until cancelled"""
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+    
+    async def _readRequest(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        """Parse one request; returns None when the client closed the connection"""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if not e.partial.strip():
+                return None
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Truncated request")
+        except asyncio.LimitOverrunError:
+            raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+        
+        lines = head.decode('latin-1').split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+        
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        
+        body = b""
+        try:
+            length = int(headers.get('content-length', 0) or 0)
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > self.MAX_BODY_BYTES:
+            raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        if length:
+            body = await reader.readexactly(length)
+        
+        return method.upper(), target, headers, body
+    
+    async def _handleConnection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one keep-alive connection"""
+        try:
+            while True:
+                method, keepAlive = None, False
+                try:
+                    request = await self._readRequest(reader)
+                    if request is None:
+                        break
+                    method, target, headers, body = request
+                    keepAlive = headers.get('connection', '').lower() != 'close'
+                    status, responseHeaders, payload = await self._dispatch(method, target, headers, body)
+                except HttpError as e:
+                    status, responseHeaders, payload = e.status, self.TEXT_HEADERS, str(e).encode('utf-8')
+                except Exception as e:
+                    logger.error("Request failed: %s", e, exc_info=True)
+                    status, responseHeaders, payload = HTTPStatus.INTERNAL_SERVER_ERROR, self.TEXT_HEADERS, b"Internal error"
+                
+                HTTP_REQUESTS.inc(method=method or "-", status=str(status.value))
+                self._writeResponse(writer, status, responseHeaders, payload, keepAlive, method != 'HEAD')
+                await writer.drain()
+                if not keepAlive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    def _writeResponse(
+        self,
+        writer: asyncio.StreamWriter,
+        status: HTTPStatus,
+        headers: Dict[str, str],
+        payload: bytes,
+        keepAlive: bool,
+        includeBody: bool
+    ) -> None:
+        """Serialise a response onto the stream"""
+        headers = dict(headers)
+        headers['Content-Length'] = str(len(payload))
+        headers['Connection'] = 'keep-alive' if keepAlive else 'close'
+        headLines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+        headLines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(headLines) + "\r\n\r\n").encode('latin-1'))
+        if includeBody and status != HTTPStatus.NOT_MODIFIED:
+            writer.write(payload)
+    
+    async def _dispatch(self, method: str, target: str, headers: Dict[str, str], body: bytes):
+        """Route a parsed request"""
+        url = urlsplit(target)
+        
+        if url.path == "/health":
+            return HTTPStatus.OK, self.TEXT_HEADERS, b"ok"
+        
+        if url.path == "/metrics":
+            body = metrics.renderPrometheus().encode('utf-8')
+            return HTTPStatus.OK, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}, body
+        
+        if url.path != "/qr":
+            raise HttpError(HTTPStatus.NOT_FOUND)
+        
+        if method in ("GET", "HEAD"):
+            params = dict(parse_qsl(url.query, keep_blank_values=True))
+        elif method == "POST":
+            params = self._parseJsonBody(body)
+        else:
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED)
+        
+        return await self._handleGenerate(params, headers)
+    
+    @staticmethod
+    def _parseJsonBody(body: bytes) -> Dict:
+        """Decode a JSON request body into flat parameters"""
+        try:
+            return RenderService.paramsFromDocument(json.loads(body or b"{}"))
+        except (ValueError, TypeError) as e:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"Invalid JSON body: {e}")
+    
+    async def _handleGenerate(self, params: Dict, headers: Dict[str, str]):
+        """Render a code, answering conditional requests without rendering"""
+        try:
+            qrType, data, options = RenderService.splitParams(params)
+            # Image fills name a server-side file, which HTTP clients must not be able to read
+            if options.fill and fillFor(options.fill).kind == 'image':
+                raise ValueError("Image fills are not available over HTTP")
+            fileFormat = RenderService.normalizeFormat(str(params.get('format', 'PNG')))
+            content = RenderService.buildContent(qrType, data)
+        except (ValueError, TypeError) as e:
+            raise HttpError(HTTPStatus.BAD_REQUEST, str(e))
+        
+        etag = f'"{options.cacheKey(content, fileFormat)[:32]}"'
+        responseHeaders = {
+            'ETag': etag,
+            'Cache-Control': f"public, max-age={self.maxAge}"
+        }
+        
+        if self._etagMatches(headers.get('if-none-match', ''), etag):
+            CACHE_REQUESTS.inc(cache="etag", result="hit")
+            return HTTPStatus.NOT_MODIFIED, responseHeaders, b""
+        CACHE_REQUESTS.inc(cache="etag", result="miss")
+        
+        try:
+            payload = await renderInPool(self.executor, "http", content, options, fileFormat, self.cache)
+        except (ValueError, TypeError) as e:
+            # Bad input that only shows while rendering, such as a payload too long for version 40
+            raise HttpError(HTTPStatus.BAD_REQUEST, str(e))
+        
+        responseHeaders['Content-Type'] = RenderService.MEDIA_TYPES[fileFormat]
+        return HTTPStatus.OK, responseHeaders, payload
+    
+    @staticmethod
+    def _etagMatches(ifNoneMatch: str, etag: str) -> bool:
+        """Weak comparison as required for If-None-Match"""
+        if not ifNoneMatch:
+            return False
+        if ifNoneMatch.strip() == "*":
+            return True
+        candidates = [tag.strip() for tag in ifNoneMatch.split(",")]
+        return any(tag[2:] == etag if tag.startswith("W/") else tag == etag for tag in candidates)
+
+
+class MetricsHttpServer(QRHttpServer):
+    """HTTP endpoint exposing only /metrics and /health"""
+    
+    async def _dispatch(self, method: str, target: str, headers: Dict[str, str], body: bytes):
+        """Refuse everything except the read-only endpoints"""
+        if urlsplit(target).path not in ("/metrics", "/health"):
+            raise HttpError(HTTPStatus.NOT_FOUND)
+        return await super()._dispatch(method, target, headers, body)
+
+
+def addMetricsArguments(parser: argparse.ArgumentParser) -> None:
+    """Options for periodic JSON metrics snapshots"""
+    parser.add_argument("--metrics-snapshot", help="write a JSON metrics snapshot to this file periodically")
+    parser.add_argument("--metrics-interval", type=float, default=15.0, help="seconds between snapshots")
+
+
+def addCacheArguments(parser: argparse.ArgumentParser) -> None:
+    """Options for the persistent disk render cache"""
+    parser.add_argument("--disk-cache", action="store_true", help="keep rendered outputs in the persistent disk cache")
+    parser.add_argument("--disk-cache-mb", type=int, default=256, help="disk cache size budget in MiB")
+
+
+def openDiskCache(args) -> Optional[DiskCache]:
+    """Disk render cache from --disk-cache, or from settings when the flag is absent"""
+    if args.disk_cache:
+        return DiskCache(maxBytes=args.disk_cache_mb * 1024 * 1024)
+    return DiskCache.fromSettings(SettingsService())
+
+
+def startSnapshotWriter(args) -> Optional[SnapshotWriter]:
+    """Start the snapshot thread if requested on the command line"""
+    if not args.metrics_snapshot:
+        return None
+    writer = SnapshotWriter(metrics, args.metrics_snapshot, args.metrics_interval)
+    writer.start()
+    return writer
+
+
+def main(argv=None) -> int:
+    """Entry point for the serve command"""
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Serve QR codes over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None, help="render worker count")
+    parser.add_argument("--processes", action="store_true", help="render in worker processes instead of threads")
+    parser.add_argument("--max-age", type=int, default=86400, help="Cache-Control max-age in seconds")
+    addMetricsArguments(parser)
+    addCacheArguments(parser)
+    args = parser.parse_args(argv)
+    
+    snapshotWriter = startSnapshotWriter(args)
+    if memoryProfiler.enabled:
+        memoryProfiler.installSignalHandler()
+    poolClass = ProcessPoolExecutor if args.processes else ThreadPoolExecutor
+    with poolClass(max_workers=args.workers) as executor:
+        server = QRHttpServer(args.host, args.port, executor, args.max_age, openDiskCache(args))
+        try:
+            asyncio.run(server.serveForever())
+        except KeyboardInterrupt:
+            logger.info("HTTP server stopped")
+        finally:
+            if snapshotWriter:
+                snapshotWriter.stop()
+    return 0
@@ -0,0 +1,60 @@
+"""
+Length-prefixed framing shared by the generator daemon and its client.
+Every frame is a 4-byte big-endian length followed by that many bytes.
+A request is one JSON frame; a response is a JSON status frame followed
+by a payload frame (empty on error).
+"""
+import asyncio
+import json
+import os
+import socket
+import struct
+from typing import Any, Dict
+
+HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+DEFAULT_SOCKET_PATH = os.path.join(os.path.expanduser("~/.config"), "QRGeneratorPro", "qr_daemon.sock")
+
+
+class ProtocolError(Exception):
+    """Raised on malformed or oversized frames"""
+
+
+def encodeFrame(data: bytes) -> bytes:
+    """Prefix data with its length"""
+    if len(data) > MAX_FRAME_BYTES:
+        raise ProtocolError(f"Frame too large: {len(data)} bytes")
+    return HEADER.pack(len(data)) + data
+
+
+def encodeJson(document: Dict[str, Any]) -> bytes:
+    """Encode a JSON document as one frame"""
+    return encodeFrame(json.dumps(document, ensure_ascii=False).encode('utf-8'))
+
+
+async def readFrame(reader: asyncio.StreamReader) -> bytes:
+    """Read one frame from an asyncio stream"""
+    (length,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if length > MAX_FRAME_BYTES:
+        raise ProtocolError(f"Frame too large: {length} bytes")
+    return await reader.readexactly(length)
+
+
+def _recvExactly(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1024 * 1024))
+        if not chunk:
+            raise ConnectionError("Connection closed mid-frame")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def recvFrame(sock: socket.socket) -> bytes:
+    """Read one frame from a blocking socket"""
+    (length,) = HEADER.unpack(_recvExactly(sock, HEADER.size))
+    if length > MAX_FRAME_BYTES:
+        raise ProtocolError(f"Frame too large: {length} bytes")
+    return _recvExactly(sock, length)
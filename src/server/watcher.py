@@ -0,0 +1,427 @@
+import argparse
+import csv
+import ctypes
+import ctypes.util
+import json
+import logging
+import os
+import select
+import shutil
+import struct
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from core.memory_profiler import memoryProfiler
+from core.metrics import metrics
+from server.http_server import addCacheArguments, addMetricsArguments, openDiskCache, startSnapshotWriter
+from services.disk_cache import DiskCache
+from services.export_service import DirectoryExportSink
+from services.file_service import FileService, writeAtomically
+from services.render_service import RenderService
+
+logger = logging.getLogger(__name__)
+
+HOTFOLDER_JOBS = metrics.counter("qr_hotfolder_jobs_total", "Hot-folder job files processed", ("result",))
+HOTFOLDER_CODES = metrics.counter("qr_hotfolder_codes_total", "Codes rendered from hot-folder jobs", ("result",))
+
+JOB_EXTENSIONS = ('.csv', '.jsonl')
+
+# Row errors kept in a status file; the count is always complete
+MAX_STATUS_ERRORS = 100
+
+
+@dataclass
+class JobStatus:
+    """Progress and outcome of one job file, written next to its outputs"""
+    job: str
+    state: str = "running"
+    total: int = 0
+    written: int = 0
+    failed: int = 0
+    output: str = ""
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    started: str = field(default_factory=lambda: datetime.now().isoformat(timespec='seconds'))
+    finished: str = ""
+    seconds: float = 0.0
+    
+    def addError(self, row: int, message: str) -> None:
+        """Count a failed row, keeping the first MAX_STATUS_ERRORS messages"""
+        self.failed += 1
+        if len(self.errors) < MAX_STATUS_ERRORS:
+            self.errors.append({'row': row, 'error': message})
+
+
+def _candidatePaths(directory: str, name: str) -> Iterator[str]:
+    yield os.path.join(directory, name)
+    stem, ext = os.path.splitext(name)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    for attempt in range(1000):
+        suffix = f"-{stamp}" + (f"-{attempt}" if attempt else "")
+        yield os.path.join(directory, f"{stem}{suffix}{ext}")
+
+
+def uniquePath(directory: str, name: str) -> str:
+    """Path for name in directory, timestamped when the name is already taken"""
+    for path in _candidatePaths(directory, name):
+        if not os.path.exists(path):
+            return path
+    raise FileExistsError(f"No free name for {name} in {directory}")
+
+
+def reserveDirectory(directory: str, name: str) -> str:
+    """Create an empty directory for name, timestamped when taken; mkdir makes the claim atomic between jobs"""
+    for path in _candidatePaths(directory, name):
+        try:
+            os.mkdir(path)
+            return path
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"No free name for {name} in {directory}")
+
+
+def readJobRows(jobPath: str) -> Iterator[Dict[str, Any]]:
+    """Flat request parameters for every row of a CSV or JSONL job file.
+    
+    CSV columns are parameter names (type, format, payload fields and render
+    options) and blank cells are left out. JSONL lines are request documents
+    as accepted by the HTTP service and the daemon.
+    """
+    if jobPath.lower().endswith('.csv'):
+        with open(jobPath, encoding='utf-8-sig', newline='') as f:
+            for row in csv.DictReader(f):
+                yield {key: value for key, value in row.items() if key and value not in (None, '')}
+        return
+    
+    with open(jobPath, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                try:
+                    document = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield {'_error': f"invalid JSON: {e}"}
+                    continue
+                try:
+                    yield RenderService.paramsFromDocument(document)
+                except (ValueError, TypeError) as e:
+                    # Valid JSON that is not a request object, such as a list or a string for "data"
+                    yield {'_error': f"invalid request: {e}"}
+
+
+class InotifyEvents:
+    """Names of files finished in a directory, from Linux inotify"""
+    
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_NONBLOCK = 0o4000
+    EVENT_HEADER = struct.Struct("iIII")
+    
+    def __init__(self, directory: str):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        self._fd = libc.inotify_init1(self.IN_NONBLOCK)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # Only completed writes and renames into the folder; a file being copied in is not reported early
+        watch = libc.inotify_add_watch(self._fd, os.fsencode(directory), self.IN_CLOSE_WRITE | self.IN_MOVED_TO)
+        if watch < 0:
+            os.close(self._fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+    
+    def wait(self, timeout: float) -> List[str]:
+        """Block up to timeout seconds and return the names reported"""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        
+        names = []
+        offset = 0
+        while offset < len(data):
+            _, _, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+    
+    def close(self) -> None:
+        """Release the inotify descriptor"""
+        os.close(self._fd)
+
+
+class PollingEvents:
+    """Names of files in a directory whose size and mtime held still for one poll interval"""
+    
+    def __init__(self, directory: str, interval: float = 1.0):
+        self.directory = directory
+        self.interval = interval
+        self._seen: Dict[str, Tuple[int, int]] = {}
+    
+    def wait(self, timeout: float) -> List[str]:
+        """Sleep one poll interval (at most timeout) and return files that stopped changing"""
+        time.sleep(min(self.interval, timeout))
+        current = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    current[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        # One stat per file per interval; a file still being copied keeps changing and is skipped
+        stable = [name for name, signature in current.items() if self._seen.get(name) == signature]
+        self._seen = current
+        return stable
+    
+    def close(self) -> None:
+        """Nothing to release"""
+
+
+class HotFolderWatcher:
+    """Processes job files dropped into an inbox folder.
+    
+    Every CSV or JSONL job is rendered on a shared worker pool into a
+    temporary directory that is renamed into the output folder once
+    complete, with a JSON status file updated atomically as it runs. The
+    job file then moves to done/ or, if it could not be read or any row
+    failed, to failed/. Up to `jobs` job files are processed at once.
+    """
+    
+    # Status files are rewritten at most this often while a job runs, in seconds
+    STATUS_INTERVAL = 1.0
+    
+    def __init__(
+        self,
+        inbox: str,
+        outputDir: Optional[str] = None,
+        executor: Optional[Executor] = None,
+        jobs: int = 1,
+        pollInterval: float = 1.0,
+        usePolling: bool = False,
+        defaultFormat: str = 'PNG',
+        cache: Optional[DiskCache] = None,
+        workers: Optional[int] = None
+    ):
+        self.inbox = os.path.abspath(inbox)
+        self.outputDir = os.path.abspath(outputDir or os.path.join(inbox, "output"))
+        self.doneDir = os.path.join(self.inbox, "done")
+        self.failedDir = os.path.join(self.inbox, "failed")
+        self.executor = executor or ProcessPoolExecutor(max_workers=workers)
+        # Worker count of the executor, which sizes each job's window of renders in flight
+        self.workers = workers or os.cpu_count() or 1
+        self.jobs = max(1, jobs)
+        self.pollInterval = pollInterval
+        self.usePolling = usePolling
+        self.defaultFormat = RenderService.normalizeFormat(defaultFormat)
+        self.cache = cache
+        self._stop = threading.Event()
+        self._active: Set[str] = set()
+        self._lock = threading.Lock()
+        
+        for directory in (self.inbox, self.outputDir, self.doneDir, self.failedDir):
+            os.makedirs(directory, exist_ok=True)
+    
+    @staticmethod
+    def isJobFile(name: str) -> bool:
+        """Whether a file name looks like a finished job rather than a partial upload"""
+        return not name.startswith(('.', '~')) and name.lower().endswith(JOB_EXTENSIONS)
+    
+    def _openEvents(self):
+        if not self.usePolling:
+            try:
+                events = InotifyEvents(self.inbox)
+                logger.info("Watching %s with inotify", self.inbox)
+                return events
+            except (OSError, AttributeError) as e:
+                # Not Linux, or the folder is a network share inotify cannot see
+                logger.info("inotify unavailable (%s), polling instead", e)
+        logger.info("Polling %s every %.1fs", self.inbox, self.pollInterval)
+        return PollingEvents(self.inbox, self.pollInterval)
+    
+    def stop(self) -> None:
+        """Ask run() to return after the jobs in progress"""
+        self._stop.set()
+    
+    def run(self) -> None:
+        """Watch the inbox until stop() is called"""
+        events = self._openEvents()
+        # Jobs dropped while the watcher was down are picked up first
+        pending = deque(sorted(name for name in os.listdir(self.inbox) if self.isJobFile(name)))
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="hotfolder-job") as jobPool:
+                while not self._stop.is_set():
+                    while pending:
+                        name = pending.popleft()
+                        path = os.path.join(self.inbox, name)
+                        with self._lock:
+                            if name in self._active or not os.path.isfile(path):
+                                continue
+                            self._active.add(name)
+                        jobPool.submit(self._runJob, name)
+                    pending.extend(name for name in events.wait(self.pollInterval) if self.isJobFile(name))
+        finally:
+            events.close()
+    
+    def _runJob(self, name: str) -> None:
+        try:
+            self.processJob(os.path.join(self.inbox, name))
+        except Exception as e:
+            logger.error("Hot-folder job %s crashed: %s", name, e, exc_info=True)
+        finally:
+            with self._lock:
+                self._active.discard(name)
+    
+    def _writeStatus(self, statusPath: str, status: JobStatus) -> None:
+        writeAtomically(statusPath, json.dumps(asdict(status), indent=2).encode('utf-8'))
+    
+    def processJob(self, jobPath: str) -> JobStatus:
+        """Render one job file, publish its outputs and file the job under done/ or failed/"""
+        started = time.perf_counter()
+        jobName = os.path.basename(jobPath)
+        stem = os.path.splitext(jobName)[0]
+        # Claimed up front, so concurrent jobs with the same stem never share an output or status file
+        finalDir = reserveDirectory(self.outputDir, stem)
+        statusPath = finalDir + ".status.json"
+        status = JobStatus(jobName, output=finalDir)
+        workDir = None
+        try:
+            self._writeStatus(statusPath, status)
+            logger.info("Hot-folder job started: %s", jobName)
+            
+            # Outputs appear under their final name only once the whole job is written
+            workDir = tempfile.mkdtemp(dir=self.outputDir, prefix=f".{stem}-")
+            with DirectoryExportSink(workDir, self.defaultFormat) as sink:
+                self._renderRows(jobPath, sink, status, statusPath, started)
+            # Renaming onto the empty reserved directory is atomic on POSIX
+            os.replace(workDir, finalDir)
+            status.state = "failed" if status.failed else "done"
+        except Exception as e:
+            if workDir:
+                shutil.rmtree(workDir, ignore_errors=True)
+            try:
+                os.rmdir(finalDir)
+            except OSError:
+                pass
+            status.state = "failed"
+            status.output = ""
+            if isinstance(e, (OSError, UnicodeDecodeError, csv.Error)):
+                status.errors.append({'row': None, 'error': f"job unreadable: {e}"})
+                logger.warning("Hot-folder job %s unreadable: %s", jobName, e)
+            else:
+                # Anything else is a bug, but the job must still leave the inbox rather than retry forever
+                status.errors.append({'row': None, 'error': f"job failed: {e}"})
+                logger.error("Hot-folder job %s failed: %s", jobName, e, exc_info=True)
+        
+        status.seconds = round(time.perf_counter() - started, 3)
+        status.finished = datetime.now().isoformat(timespec='seconds')
+        self._writeStatus(statusPath, status)
+        
+        target = self.failedDir if status.state == "failed" else self.doneDir
+        os.replace(jobPath, uniquePath(target, jobName))
+        HOTFOLDER_JOBS.inc(result=status.state)
+        logger.info(
+            "Hot-folder job %s %s: %s written, %s failed in %.2fs",
+            jobName, status.state, status.written, status.failed, status.seconds
+        )
+        return status
+    
+    def _renderRows(
+        self,
+        jobPath: str,
+        sink: DirectoryExportSink,
+        status: JobStatus,
+        statusPath: str,
+        started: float
+    ) -> None:
+        # A bounded window of in-flight renders keeps memory flat on large jobs; outputs keep row order
+        window = 4 * self.workers
+        pending = deque()
+        lastStatus = time.perf_counter()
+        
+        def drainOne() -> None:
+            row, content, extension, future = pending.popleft()
+            try:
+                data = future.result()
+            except Exception as e:
+                # One unrenderable row (say, a payload too long for any version) must not sink the job
+                status.addError(row, str(e) or type(e).__name__)
+                HOTFOLDER_CODES.inc(result="failed")
+                return
+            sink.addEncoded(data, content, f"{row:06d}{extension}")
+            status.written += 1
+            HOTFOLDER_CODES.inc(result="ok")
+        
+        for row, params in enumerate(readJobRows(jobPath)):
+            status.total += 1
+            try:
+                if '_error' in params:
+                    raise ValueError(params['_error'])
+                qrType, data, options = RenderService.splitParams(params)
+                fileFormat = RenderService.normalizeFormat(str(params.get('format', self.defaultFormat)))
+                content = RenderService.buildContent(qrType, data)
+            except (ValueError, TypeError) as e:
+                status.addError(row, str(e))
+                HOTFOLDER_CODES.inc(result="failed")
+                continue
+            
+            extension = FileService.EXTENSION_MAP.get(fileFormat, f".{fileFormat.lower()}")
+            future = self.executor.submit(RenderService.renderCached, content, options, fileFormat, self.cache)
+            pending.append((row, content, extension, future))
+            while len(pending) > window:
+                drainOne()
+            
+            if time.perf_counter() - lastStatus >= self.STATUS_INTERVAL:
+                lastStatus = time.perf_counter()
+                status.seconds = round(lastStatus - started, 3)
+                self._writeStatus(statusPath, status)
+        
+        while pending:
+            drainOne()
+
+
+def main(argv=None) -> int:
+    """Entry point for the watch command"""
+    parser = argparse.ArgumentParser(
+        prog="main.py watch",
+        description="Render CSV or JSONL job files dropped into a folder"
+    )
+    parser.add_argument("inbox", help="folder to watch for job files")
+    parser.add_argument("-o", "--output", help="folder for outputs and status files (default: INBOX/output)")
+    parser.add_argument("--workers", type=int, default=None, help="render worker processes (default: CPU count)")
+    parser.add_argument("--jobs", type=int, default=1, help="job files processed at the same time")
+    parser.add_argument("--format", default="PNG", help="output format for rows without a format column")
+    parser.add_argument("--poll", action="store_true", help="poll instead of using inotify (network shares)")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="seconds between polls")
+    addMetricsArguments(parser)
+    addCacheArguments(parser)
+    args = parser.parse_args(argv)
+    
+    snapshotWriter = startSnapshotWriter(args)
+    if memoryProfiler.enabled:
+        memoryProfiler.installSignalHandler()
+    
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            watcher = HotFolderWatcher(
+                args.inbox, args.output, executor, args.jobs, args.poll_interval, args.poll,
+                args.format, openDiskCache(args), args.workers
+            )
+            try:
+                watcher.run()
+            except KeyboardInterrupt:
+                logger.info("Hot-folder watcher stopped")
+    except ValueError as e:
+        logger.error("%s", e)
+        return 2
+    finally:
+        if snapshotWriter:
+            snapshotWriter.stop()
+    return 0
@@ -1,9 +1,39 @@
 from .file_service import FileService
 from .history_service import HistoryService
 from .settings_service import SettingsService
+from .export_service import ExportSink, ZipExportSink, DirectoryExportSink
+from .clipboard_service import ClipboardService, ClipboardBackend, StubClipboardBackend
+from .sheet_service import SheetSpec, LabelSheetExporter, SHEET_PRESETS
+from .logging_service import LoggingService
+from .verify_service import CodeVerifier, VerifyReport, VerifyResult
+from .batch_service import BatchRunner, BatchStats, BatchJob
+from .disk_cache import DiskCache
+from .print_service import PrintRenderer, PrintSpec
+from .fanout_service import ExportTarget, FanOutExporter
 
 __all__ = [
     'FileService',
     'HistoryService',
-    'SettingsService'
-]
\ No newline at end of file
+    'SettingsService',
+    'ExportSink',
+    'ZipExportSink',
+    'DirectoryExportSink',
+    'ClipboardService',
+    'ClipboardBackend',
+    'StubClipboardBackend',
+    'SheetSpec',
+    'LabelSheetExporter',
+    'SHEET_PRESETS',
+    'LoggingService',
+    'CodeVerifier',
+    'VerifyReport',
+    'VerifyResult',
+    'BatchRunner',
+    'BatchStats',
+    'BatchJob',
+    'DiskCache',
+    'PrintRenderer',
+    'PrintSpec',
+    'ExportTarget',
+    'FanOutExporter'
+]
@@ -0,0 +1,237 @@
+import io
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Iterable, Optional
+
+from core.metrics import metrics
+from core.models import RenderOptions
+from core.qr_generator import QRGenerator
+from services.export_service import ExportSink
+from services.file_service import FileService
+
+logger = logging.getLogger(__name__)
+
+BATCH_DUPLICATES = metrics.counter("qr_batch_duplicates_total", "Batch payloads served from an earlier render")
+
+
+@dataclass
+class BatchStats:
+    """Counts and timing of one batch run"""
+    total: int = 0
+    rendered: int = 0
+    duplicates: int = 0
+    seconds: float = 0.0
+    expected: Optional[int] = None
+    cancelled: bool = False
+    
+    @property
+    def duplicateRatio(self) -> float:
+        """Share of payloads that reused an earlier render"""
+        return self.duplicates / self.total if self.total else 0.0
+    
+    @property
+    def codesPerSecond(self) -> float:
+        """Codes written per second so far"""
+        return self.total / self.seconds if self.seconds else 0.0
+    
+    @property
+    def etaSeconds(self) -> Optional[float]:
+        """Estimated seconds left, when the batch size and a rate are known"""
+        if self.expected is None or not self.codesPerSecond:
+            return None
+        return max(self.expected - self.total, 0) / self.codesPerSecond
+    
+    def summary(self) -> str:
+        """One-line summary for logs and the CLI"""
+        return (
+            f"{self.total} codes written, {self.rendered} rendered, {self.duplicates} duplicates "
+            f"({self.duplicateRatio:.0%}) in {self.seconds:.2f}s" + (" (cancelled)" if self.cancelled else "")
+        )
+
+
+def renderEncoded(payload: str, options: RenderOptions, fileFormat: str) -> bytes:
+    """Render and encode one payload; module level so process pools can run it"""
+    buffer = io.BytesIO()
+    FileService.encodeImage(QRGenerator.generate(payload, **options.toKwargs()), buffer, fileFormat)
+    return buffer.getvalue()
+
+
+class BatchRunner:
+    """Renders a stream of payloads into an export sink, rendering each distinct output once.
+    
+    Payloads are keyed by RenderOptions.cacheKey, so a repeat of the same
+    payload with the same render config becomes a reference to the first
+    entry in the sink instead of a second encode and render. With an
+    executor, renders run on its workers while entries are still written to
+    the sink in input order.
+    """
+    
+    # Progress callbacks fire at most this often, in seconds
+    PROGRESS_INTERVAL = 0.1
+    
+    def __init__(self, options: RenderOptions, fileFormat: str = "PNG", deduplicate: bool = True):
+        self.options = options
+        self.fileFormat = fileFormat.upper()
+        self.deduplicate = deduplicate
+    
+    def run(
+        self,
+        payloads: Iterable[str],
+        sink: ExportSink,
+        executor: Optional[Executor] = None,
+        progress: Optional[Callable[[BatchStats], None]] = None,
+        cancelEvent: Optional[threading.Event] = None,
+        expected: Optional[int] = None,
+        workers: Optional[int] = None
+    ) -> BatchStats:
+        """Write every payload to the sink and return the run's stats.
+        
+        progress receives a snapshot of the stats periodically and at the end;
+        setting cancelEvent stops the run after the entries already in flight.
+        workers is the executor's worker count (default: CPU count), which
+        sizes the window of renders kept in flight.
+        """
+        started = time.perf_counter()
+        stats = BatchStats(expected=expected)
+        entries: Dict[str, str] = {}
+        pending = deque()
+        # A bounded window of in-flight renders keeps memory flat on large batches
+        window = 4 * (workers or os.cpu_count() or 1) if executor else 0
+        lastReport = 0.0
+        
+        def drainOne() -> None:
+            nonlocal lastReport
+            kind, payload, key, result = pending.popleft()
+            if kind == 'ref':
+                sink.addReference(payload, entries[key])
+                stats.duplicates += 1
+            else:
+                if executor is not None:
+                    entryName = sink.addEncoded(result.result(), payload)
+                else:
+                    entryName = sink.add(result, payload)
+                stats.rendered += 1
+                if key:
+                    entries[key] = entryName
+            stats.total += 1
+            stats.seconds = time.perf_counter() - started
+            if progress and stats.seconds - lastReport >= self.PROGRESS_INTERVAL:
+                lastReport = stats.seconds
+                progress(replace(stats))
+        
+        # Keys already queued for rendering, so repeats inside the window also become references
+        queued = set()
+        for payload in payloads:
+            if cancelEvent is not None and cancelEvent.is_set():
+                stats.cancelled = True
+                break
+            
+            key = self.options.cacheKey(payload, self.fileFormat) if self.deduplicate else None
+            if key and key in queued:
+                pending.append(('ref', payload, key, None))
+            else:
+                if key:
+                    queued.add(key)
+                if executor is not None:
+                    # Workers encode too, so only finished file bytes cross the process boundary
+                    result = executor.submit(renderEncoded, payload, self.options, self.fileFormat)
+                else:
+                    result = QRGenerator.generate(payload, **self.options.toKwargs())
+                pending.append(('render', payload, key, result))
+            
+            while len(pending) > window:
+                drainOne()
+        
+        if stats.cancelled and executor is not None:
+            # Renders already running are still written; references are kept only when their original is
+            kept, written = deque(), set(entries)
+            for item in pending:
+                kind, _, key, result = item
+                if kind == 'render' and not result.cancel():
+                    kept.append(item)
+                    written.add(key)
+                elif kind == 'ref' and key in written:
+                    kept.append(item)
+            pending = kept
+        while pending:
+            drainOne()
+        
+        if stats.duplicates:
+            BATCH_DUPLICATES.inc(stats.duplicates)
+        stats.seconds = time.perf_counter() - started
+        if progress:
+            progress(replace(stats))
+        logger.info("Batch finished: %s", stats.summary())
+        return stats
+
+
+class BatchJob:
+    """Runs a BatchRunner on a background thread for interactive callers.
+    
+    The caller polls latest for progress, cancel() requests a stop, and
+    done/error/stats describe the outcome once the thread ends.
+    """
+    
+    def __init__(
+        self,
+        runner: BatchRunner,
+        payloads: Iterable[str],
+        sink: ExportSink,
+        executor: Optional[Executor] = None,
+        expected: Optional[int] = None,
+        workers: Optional[int] = None
+    ):
+        self.runner = runner
+        self.payloads = payloads
+        self.sink = sink
+        self.executor = executor
+        self.expected = expected
+        self.workers = workers
+        self.latest = BatchStats(expected=expected)
+        self.stats: Optional[BatchStats] = None
+        self.error: Optional[BaseException] = None
+        self._cancelEvent = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="batch-job", daemon=True)
+    
+    def _update(self, stats: BatchStats) -> None:
+        # Replacing the reference is atomic, so readers never see a half-updated snapshot
+        self.latest = stats
+    
+    def _run(self) -> None:
+        try:
+            # The sink finalises on success and aborts on an exception, deleting the partial output
+            with self.sink:
+                self.stats = self.runner.run(
+                    self.payloads, self.sink, self.executor, self._update, self._cancelEvent, self.expected,
+                    self.workers
+                )
+        except BaseException as e:
+            logger.error("Batch job failed: %s", e, exc_info=True)
+            self.error = e
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+    
+    def start(self) -> 'BatchJob':
+        """Start the background thread"""
+        self._thread.start()
+        return self
+    
+    def cancel(self) -> None:
+        """Ask the run to stop after the entries in flight"""
+        self._cancelEvent.set()
+    
+    @property
+    def cancelRequested(self) -> bool:
+        """Whether cancel() has been called"""
+        return self._cancelEvent.is_set()
+    
+    @property
+    def done(self) -> bool:
+        """Whether the background thread has finished"""
+        return not self._thread.is_alive()
@@ -0,0 +1,184 @@
+import io
+import logging
+import os
+import platform
+import shutil
+import subprocess
+from typing import List, Optional
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+class ClipboardBackend:
+    """Base class for platform clipboard implementations"""
+    
+    name = "base"
+    
+    def copyImage(self, image: Image.Image) -> None:
+        """Place an image on the clipboard"""
+        raise NotImplementedError
+    
+    @staticmethod
+    def encode(image: Image.Image, fileFormat: str = 'PNG') -> bytes:
+        """Encode image in memory"""
+        buffer = io.BytesIO()
+        image.save(buffer, format=fileFormat)
+        return buffer.getvalue()
+
+
+class StubClipboardBackend(ClipboardBackend):
+    """In-memory backend that records copies, for tests and headless runs"""
+    
+    name = "stub"
+    
+    def __init__(self):
+        self.data: Optional[bytes] = None
+        self.copies = 0
+    
+    def copyImage(self, image: Image.Image) -> None:
+        """Store PNG bytes instead of touching the system clipboard"""
+        self.data = self.encode(image)
+        self.copies += 1
+
+
+class WindowsClipboardBackend(ClipboardBackend):
+    """Writes DIB and PNG data through the Win32 clipboard API, in process"""
+    
+    name = "win32"
+    
+    CF_DIB = 8
+    GMEM_MOVEABLE = 0x0002
+    BMP_FILE_HEADER_SIZE = 14
+    
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+        
+        self._ctypes = ctypes
+        self._user32 = ctypes.WinDLL('user32', use_last_error=True)
+        self._kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        
+        self._kernel32.GlobalAlloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+        self._kernel32.GlobalAlloc.restype = wintypes.HGLOBAL
+        self._kernel32.GlobalLock.argtypes = [wintypes.HGLOBAL]
+        self._kernel32.GlobalLock.restype = ctypes.c_void_p
+        self._kernel32.GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+        self._kernel32.GlobalFree.argtypes = [wintypes.HGLOBAL]
+        self._user32.OpenClipboard.argtypes = [wintypes.HWND]
+        self._user32.OpenClipboard.restype = wintypes.BOOL
+        self._user32.SetClipboardData.argtypes = [wintypes.UINT, wintypes.HANDLE]
+        self._user32.SetClipboardData.restype = wintypes.HANDLE
+        self._user32.RegisterClipboardFormatW.argtypes = [wintypes.LPCWSTR]
+        self._user32.RegisterClipboardFormatW.restype = wintypes.UINT
+        
+        self.pngFormat = self._user32.RegisterClipboardFormatW("PNG")
+    
+    def _setData(self, clipFormat: int, data: bytes) -> None:
+        """Copy bytes into a movable global block and hand it to the clipboard"""
+        handle = self._kernel32.GlobalAlloc(self.GMEM_MOVEABLE, len(data))
+        if not handle:
+            raise OSError("GlobalAlloc failed")
+        
+        pointer = self._kernel32.GlobalLock(handle)
+        self._ctypes.memmove(pointer, data, len(data))
+        self._kernel32.GlobalUnlock(handle)
+        
+        # On success the clipboard owns the block; otherwise it is ours to free
+        if not self._user32.SetClipboardData(clipFormat, handle):
+            self._kernel32.GlobalFree(handle)
+            raise OSError("SetClipboardData failed")
+    
+    def copyImage(self, image: Image.Image) -> None:
+        """Place DIB (and PNG for transparency-aware apps) on the clipboard"""
+        dib = self.encode(image.convert('RGB'), 'BMP')[self.BMP_FILE_HEADER_SIZE:]
+        png = self.encode(image)
+        
+        if not self._user32.OpenClipboard(None):
+            raise OSError("Clipboard is in use by another application")
+        try:
+            self._user32.EmptyClipboard()
+            self._setData(self.CF_DIB, dib)
+            if self.pngFormat:
+                self._setData(self.pngFormat, png)
+        finally:
+            self._user32.CloseClipboard()
+
+
+class CommandClipboardBackend(ClipboardBackend):
+    """Pipes PNG bytes to a selection helper such as xclip or wl-copy"""
+    
+    # Both helpers fork a background process that keeps serving the selection,
+    # so the call only waits for the hand-off, not for the selection owner
+    TIMEOUT = 5
+    
+    def __init__(self, name: str, command: List[str]):
+        self.name = name
+        self.command = command
+    
+    def copyImage(self, image: Image.Image) -> None:
+        """Stream PNG bytes to the helper's stdin"""
+        process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        try:
+            # Output pipes stay unconnected: the forked owner would hold them open
+            process.communicate(self.encode(image), timeout=self.TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            raise RuntimeError(f"{self.name} did not accept clipboard data")
+        
+        if process.returncode != 0:
+            raise RuntimeError(f"{self.name} exited with status {process.returncode}")
+
+
+class ClipboardService:
+    """Service for copying images to the system clipboard"""
+    
+    def __init__(self, backend: Optional[ClipboardBackend] = None):
+        self._backend = backend
+    
+    @staticmethod
+    def detectBackend() -> Optional[ClipboardBackend]:
+        """Pick the best available backend for this platform"""
+        system = platform.system()
+        
+        if system == "Windows":
+            return WindowsClipboardBackend()
+        
+        if system == "Linux":
+            if os.getenv('WAYLAND_DISPLAY') and shutil.which('wl-copy'):
+                return CommandClipboardBackend('wl-copy', ['wl-copy', '--type', 'image/png'])
+            if os.getenv('DISPLAY') and shutil.which('xclip'):
+                return CommandClipboardBackend(
+                    'xclip', ['xclip', '-selection', 'clipboard', '-t', 'image/png', '-i']
+                )
+        
+        return None
+    
+    @property
+    def backend(self) -> Optional[ClipboardBackend]:
+        """Active backend, detected on first use"""
+        if self._backend is None:
+            self._backend = self.detectBackend()
+            if self._backend:
+                logger.info("Clipboard backend: %s", self._backend.name)
+        return self._backend
+    
+    def copyImage(self, image: Image.Image) -> None:
+        """Copy an image to the clipboard from memory"""
+        backend = self.backend
+        if backend is None:
+            raise RuntimeError(
+                "No clipboard backend available (install wl-clipboard or xclip on Linux)"
+            )
+        
+        try:
+            backend.copyImage(image)
+            logger.info("Image copied to clipboard via %s", backend.name)
+        except Exception as e:
+            logger.error("Failed to copy image to clipboard: %s", e)
+            raise
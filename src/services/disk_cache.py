@@ -0,0 +1,277 @@
+import logging
+import os
+import platform
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS = metrics.counter("qr_cache_requests_total", "Cache lookups by outcome", ("cache", "result"))
+CACHE_EVICTIONS = metrics.counter("qr_disk_cache_evictions_total", "Entries evicted from the disk render cache")
+
+
+def defaultCacheDir() -> str:
+    """Render cache directory inside the QRGeneratorPro app dir"""
+    if platform.system() == "Windows":
+        baseDir = os.getenv('APPDATA')
+    else:
+        baseDir = os.path.expanduser("~/.config")
+    return os.path.join(baseDir, "QRGeneratorPro", "render_cache")
+
+
+class DiskCache:
+    """Persistent cache of encoded renders, bounded to a byte budget with LRU eviction.
+    
+    Entries live in two-character shard directories named after their key.
+    A SQLite index in WAL mode records each entry's size and last access, so
+    several processes can read, write and evict concurrently: files are
+    written to a temp name and renamed into place, and evictions run inside
+    an immediate transaction so only one process evicts at a time. Triggers
+    keep the total size in a one-row stats table, so a write never has to
+    sum the whole index.
+    """
+    
+    INDEX_NAME = "index.sqlite"
+    
+    # Oldest entries fetched per query while evicting
+    EVICT_BATCH = 64
+    
+    # Shard files without an index row are swept at most this often, in seconds
+    SWEEP_INTERVAL = 3600
+    
+    # Files younger than this are left alone by the sweep; a put may not have recorded them yet
+    SWEEP_GRACE = 300
+    
+    def __init__(self, directory: Optional[str] = None, maxBytes: int = 256 * 1024 * 1024):
+        self.directory = directory or defaultCacheDir()
+        self.maxBytes = maxBytes
+        self._local = threading.local()
+        os.makedirs(self.directory, exist_ok=True)
+        self._createSchema()
+        self._sweepIfDue()
+    
+    def _createSchema(self) -> None:
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS stats ("
+                "id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL, swept REAL NOT NULL)"
+            )
+            # Seeded once from the entries already there, before the triggers take over
+            db.execute(
+                "INSERT OR IGNORE INTO stats (id, bytes, swept) "
+                "SELECT 0, COALESCE(SUM(size), 0), 0 FROM entries"
+            )
+            db.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_added AFTER INSERT ON entries "
+                "BEGIN UPDATE stats SET bytes = bytes + NEW.size; END"
+            )
+            db.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_removed AFTER DELETE ON entries "
+                "BEGIN UPDATE stats SET bytes = bytes - OLD.size; END"
+            )
+            db.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_resized AFTER UPDATE OF size ON entries "
+                "BEGIN UPDATE stats SET bytes = bytes + NEW.size - OLD.size; END"
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+    
+    @classmethod
+    def fromSettings(cls, settings) -> Optional['DiskCache']:
+        """Cache configured by the render_cache_* settings, or None when disabled"""
+        if not settings.get("render_cache_enabled", False):
+            return None
+        return cls(
+            settings.get("render_cache_dir") or None,
+            int(settings.get("render_cache_max_mb", 256)) * 1024 * 1024
+        )
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Connections stay behind when the cache is sent to a worker process
+        return {'directory': self.directory, 'maxBytes': self.maxBytes}
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._local = threading.local()
+    
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and process; sqlite3 connections must not cross either
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(os.path.join(self.directory, self.INDEX_NAME), timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached bytes for a key, refreshing its access time"""
+        try:
+            with open(self._path(key), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            self._connection().execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error as e:
+            # A stale access time only makes the entry an earlier eviction candidate
+            logger.debug("Disk cache access update failed: %s", e)
+        return data
+    
+    def put(self, key: str, data: bytes) -> None:
+        """Store bytes under a key, then evict least recently used entries past the budget"""
+        if len(data) > self.maxBytes:
+            return
+        shard = os.path.dirname(self._path(key))
+        os.makedirs(shard, exist_ok=True)
+        fd, tempPath = tempfile.mkstemp(dir=shard, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            # Readers see either the old file or the complete new one
+            os.replace(tempPath, self._path(key))
+        except BaseException:
+            if os.path.exists(tempPath):
+                os.unlink(tempPath)
+            raise
+        
+        # An upsert rather than INSERT OR REPLACE, whose implicit delete would bypass the size triggers
+        self._connection().execute(
+            "INSERT INTO entries (key, size, accessed) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET size = excluded.size, accessed = excluded.accessed",
+            (key, len(data), time.time())
+        )
+        self._evict()
+    
+    def _totalBytes(self) -> int:
+        return self._connection().execute("SELECT bytes FROM stats").fetchone()[0]
+    
+    def _unlink(self, path: str) -> None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # Say, a reader holding the file open on Windows; the sweep removes it later
+            logger.warning("Disk cache could not remove %s: %s", path, e)
+    
+    def _evict(self) -> None:
+        if self._totalBytes() <= self.maxBytes:
+            return
+        
+        db = self._connection()
+        removed = []
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            # Recheck under the write lock in case another process already evicted
+            total = self._totalBytes()
+            while total > self.maxBytes:
+                oldest = db.execute(
+                    "SELECT key, size FROM entries ORDER BY accessed LIMIT ?", (self.EVICT_BATCH,)
+                ).fetchall()
+                if not oldest:
+                    break
+                batch = []
+                for key, size in oldest:
+                    if total <= self.maxBytes:
+                        break
+                    batch.append(key)
+                    total -= size
+                db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in batch])
+                removed.extend(batch)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        
+        for key in removed:
+            self._unlink(self._path(key))
+        if removed:
+            CACHE_EVICTIONS.inc(len(removed))
+            logger.debug("Disk cache evicted %s entries", len(removed))
+    
+    def getOrRender(self, key: str, render: Callable[[], bytes]) -> bytes:
+        """Cached bytes for a key, rendering and storing them on a miss"""
+        data = self.get(key)
+        if data is not None:
+            CACHE_REQUESTS.inc(cache="disk", result="hit")
+            return data
+        CACHE_REQUESTS.inc(cache="disk", result="miss")
+        
+        data = render()
+        try:
+            self.put(key, data)
+        except (OSError, sqlite3.Error) as e:
+            # A cache that cannot be written must never fail the render itself
+            logger.warning("Disk cache write failed: %s", e)
+        return data
+    
+    def _sweepIfDue(self) -> None:
+        db = self._connection()
+        now = time.time()
+        # Claiming the sweep in one statement means only one process of many runs it
+        claimed = db.execute("UPDATE stats SET swept = ? WHERE swept <= ?", (now, now - self.SWEEP_INTERVAL)).rowcount
+        if claimed:
+            try:
+                self.sweep()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("Disk cache sweep failed: %s", e)
+    
+    def sweep(self) -> int:
+        """Remove shard files the index does not account for and return how many were removed.
+        
+        These are left by a crash between writing a file and recording it, or
+        by an eviction that could not delete its file.
+        """
+        db = self._connection()
+        cutoff = time.time() - self.SWEEP_GRACE
+        removed = 0
+        with os.scandir(self.directory) as shards:
+            for shard in shards:
+                if not shard.is_dir() or len(shard.name) != 2:
+                    continue
+                with os.scandir(shard.path) as files:
+                    for entry in files:
+                        if not entry.is_file() or entry.stat().st_mtime > cutoff:
+                            continue
+                        if not entry.name.startswith(".tmp-"):
+                            known = db.execute("SELECT 1 FROM entries WHERE key = ?", (entry.name,)).fetchone()
+                            if known:
+                                continue
+                        self._unlink(entry.path)
+                        removed += 1
+        if removed:
+            logger.info("Disk cache sweep removed %s orphaned files", removed)
+        return removed
+    
+    def stats(self) -> Dict[str, int]:
+        """Entry count and total bytes recorded in the index"""
+        count = self._connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {'entries': count, 'bytes': self._totalBytes()}
+    
+    def clear(self) -> None:
+        """Remove every entry"""
+        db = self._connection()
+        keys = [row[0] for row in db.execute("SELECT key FROM entries").fetchall()]
+        db.execute("DELETE FROM entries")
+        for key in keys:
+            self._unlink(self._path(key))
+        logger.info("Disk cache cleared: %s entries", len(keys))
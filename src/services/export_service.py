@@ -0,0 +1,276 @@
+import csv
+import json
+import logging
+import os
+import shutil
+import tempfile
+import zipfile
+from typing import List, Optional
+from PIL import Image
+
+from services.file_service import FileService
+
+logger = logging.getLogger(__name__)
+
+
+class ManifestWriter:
+    """Streams manifest rows mapping output entries to payloads"""
+    
+    FIELDS = ['index', 'entry', 'payload', 'bytes']
+    
+    # Rows stay in memory until this size, then spill to a single temp file
+    SPOOL_SIZE = 1024 * 1024
+    
+    def __init__(self, manifestFormat: str = "csv"):
+        if manifestFormat not in ("csv", "json"):
+            raise ValueError(f"Unsupported manifest format: {manifestFormat}")
+        
+        self.manifestFormat = manifestFormat
+        self.count = 0
+        self._buffer = tempfile.SpooledTemporaryFile(
+            max_size=self.SPOOL_SIZE, mode='w+', encoding='utf-8', newline=''
+        )
+        
+        if manifestFormat == "csv":
+            self._csvWriter = csv.writer(self._buffer)
+            self._csvWriter.writerow(self.FIELDS)
+        else:
+            self._buffer.write("[")
+    
+    @property
+    def fileName(self) -> str:
+        """Name of the manifest entry"""
+        return f"manifest.{self.manifestFormat}"
+    
+    def addRow(self, entry: str, payload: str, size: int) -> None:
+        """Append a manifest row"""
+        if self.manifestFormat == "csv":
+            self._csvWriter.writerow([self.count, entry, payload, size])
+        else:
+            row = {'index': self.count, 'entry': entry, 'payload': payload, 'bytes': size}
+            self._buffer.write(("," if self.count else "") + "\n  " + json.dumps(row, ensure_ascii=False))
+        self.count += 1
+    
+    def copyTo(self, fileObj) -> None:
+        """Finish the manifest and copy it into a binary stream"""
+        if self.manifestFormat == "json":
+            self._buffer.write("\n]\n")
+        
+        self._buffer.seek(0)
+        while True:
+            chunk = self._buffer.read(64 * 1024)
+            if not chunk:
+                break
+            fileObj.write(chunk.encode('utf-8'))
+    
+    def close(self) -> None:
+        """Release the row buffer"""
+        self._buffer.close()
+
+
+class ExportSink:
+    """Base class for batch output destinations"""
+    
+    def add(self, image: Image.Image, payload: str, name: Optional[str] = None) -> str:
+        """Write one encoded image and return its entry name"""
+        raise NotImplementedError
+    
+    def addEncoded(self, data: bytes, payload: str, name: Optional[str] = None) -> str:
+        """Write one already encoded image file and return its entry name"""
+        raise NotImplementedError
+    
+    def addReference(self, payload: str, entryName: str, name: Optional[str] = None) -> str:
+        """Record payload as another use of an already written entry and return the name it is listed under"""
+        raise NotImplementedError
+    
+    def close(self) -> None:
+        """Flush and finalise the output"""
+    
+    def abort(self) -> None:
+        """Discard the output of a run that failed part way"""
+        self.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, excType, excValue, traceback):
+        # A failed run must not leave output that looks complete
+        if excType is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class ZipExportSink(ExportSink):
+    """Streams encoded images straight into a ZIP archive with a manifest"""
+    
+    COMPRESSION = {
+        "stored": zipfile.ZIP_STORED,
+        "deflate": zipfile.ZIP_DEFLATED
+    }
+    
+    def __init__(
+        self,
+        archivePath: str,
+        imageFormat: str = "PNG",
+        compression: str = "stored",
+        manifestFormat: str = "csv"
+    ):
+        if compression not in self.COMPRESSION:
+            raise ValueError(f"Unsupported compression: {compression}")
+        
+        self.archivePath = archivePath
+        self.imageFormat = imageFormat.upper()
+        self.extension = FileService.EXTENSION_MAP.get(self.imageFormat, '.png')
+        self.manifest = ManifestWriter(manifestFormat)
+        self._closed = False
+        
+        # allowZip64 keeps archives past 65535 entries / 4 GiB valid
+        self._zip = zipfile.ZipFile(
+            archivePath, 'w', compression=self.COMPRESSION[compression], allowZip64=True
+        )
+        logger.info("ZIP export started: %s (%s)", archivePath, compression)
+    
+    def add(self, image: Image.Image, payload: str, name: Optional[str] = None) -> str:
+        """Encode an image directly into the archive"""
+        entryName = name or f"{self.manifest.count:06d}{self.extension}"
+        
+        # Encoded bytes go straight into the archive stream, no temp file per entry
+        with self._zip.open(entryName, 'w', force_zip64=True) as entry:
+            FileService.encodeImage(image, entry, self.imageFormat)
+        
+        self.manifest.addRow(entryName, payload, self._zip.getinfo(entryName).file_size)
+        return entryName
+    
+    def addEncoded(self, data: bytes, payload: str, name: Optional[str] = None) -> str:
+        """Store bytes encoded elsewhere, such as in a worker process"""
+        entryName = name or f"{self.manifest.count:06d}{self.extension}"
+        with self._zip.open(entryName, 'w', force_zip64=True) as entry:
+            entry.write(data)
+        
+        self.manifest.addRow(entryName, payload, len(data))
+        return entryName
+    
+    def addReference(self, payload: str, entryName: str, name: Optional[str] = None) -> str:
+        """List a duplicate payload against an existing entry without storing the image again"""
+        self.manifest.addRow(entryName, payload, self._zip.getinfo(entryName).file_size)
+        return entryName
+    
+    def close(self) -> None:
+        """Write the manifest and central directory"""
+        if self._closed:
+            return
+        self._closed = True
+        
+        try:
+            with self._zip.open(self.manifest.fileName, 'w') as entry:
+                self.manifest.copyTo(entry)
+            self._zip.close()
+            logger.info("ZIP export finished: %s entries in %s", self.manifest.count, self.archivePath)
+        finally:
+            self.manifest.close()
+    
+    def abort(self) -> None:
+        """Close and delete the partial archive"""
+        if self._closed:
+            return
+        self._closed = True
+        
+        try:
+            self._zip.close()
+        except (OSError, ValueError) as e:
+            # An open entry or a failed write leaves the archive unfinishable; it is deleted either way
+            logger.debug("Partial archive did not close cleanly: %s", e)
+        finally:
+            self.manifest.close()
+        try:
+            os.unlink(self.archivePath)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # Raising here would hide the error that caused the abort
+            logger.warning("Partial archive could not be removed: %s", e)
+            return
+        logger.warning("ZIP export aborted, partial archive removed: %s", self.archivePath)
+
+
+class DirectoryExportSink(ExportSink):
+    """Writes encoded images as files in a directory, with the manifest alongside"""
+    
+    def __init__(self, directory: str, imageFormat: str = "PNG", manifestFormat: str = "csv"):
+        self.directory = directory
+        self.imageFormat = imageFormat.upper()
+        self.extension = FileService.EXTENSION_MAP.get(self.imageFormat, '.png')
+        self.manifest = ManifestWriter(manifestFormat)
+        self._closed = False
+        # Files this sink created, so an abort removes them and nothing else in the directory
+        self._written: List[str] = []
+        
+        os.makedirs(directory, exist_ok=True)
+        logger.info("Directory export started: %s", directory)
+    
+    def add(self, image: Image.Image, payload: str, name: Optional[str] = None) -> str:
+        """Encode an image into its own file"""
+        entryName = name or f"{self.manifest.count:06d}{self.extension}"
+        path = os.path.join(self.directory, entryName)
+        self._written.append(path)
+        with open(path, 'wb') as f:
+            FileService.encodeImage(image, f, self.imageFormat)
+        
+        self.manifest.addRow(entryName, payload, os.path.getsize(path))
+        return entryName
+    
+    def addEncoded(self, data: bytes, payload: str, name: Optional[str] = None) -> str:
+        """Write bytes encoded elsewhere into their own file"""
+        entryName = name or f"{self.manifest.count:06d}{self.extension}"
+        path = os.path.join(self.directory, entryName)
+        self._written.append(path)
+        with open(path, 'wb') as f:
+            f.write(data)
+        
+        self.manifest.addRow(entryName, payload, len(data))
+        return entryName
+    
+    def addReference(self, payload: str, entryName: str, name: Optional[str] = None) -> str:
+        """Hard-link a duplicate payload's file to an existing one, copying where links are unsupported"""
+        linkName = name or f"{self.manifest.count:06d}{self.extension}"
+        source = os.path.join(self.directory, entryName)
+        target = os.path.join(self.directory, linkName)
+        self._written.append(target)
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
+        
+        self.manifest.addRow(linkName, payload, os.path.getsize(target))
+        return linkName
+    
+    def close(self) -> None:
+        """Write the manifest file"""
+        if self._closed:
+            return
+        self._closed = True
+        
+        try:
+            with open(os.path.join(self.directory, self.manifest.fileName), 'wb') as f:
+                self.manifest.copyTo(f)
+            logger.info("Directory export finished: %s entries in %s", self.manifest.count, self.directory)
+        finally:
+            self.manifest.close()
+    
+    def abort(self) -> None:
+        """Delete the images written so far and skip the manifest"""
+        if self._closed:
+            return
+        self._closed = True
+        
+        self.manifest.close()
+        for path in self._written:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning("Partial file could not be removed: %s", e)
+        logger.warning("Directory export aborted, %s partial files removed from %s", len(self._written), self.directory)
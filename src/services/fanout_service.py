@@ -0,0 +1,162 @@
+import io
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from core.memory_profiler import memoryProfiler
+from core.models import QRStyle, RenderOptions
+from core.qr_generator import QRGenerator
+from core.styles import styleName
+from services.file_service import FileService
+from services.render_service import RenderService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ExportTarget:
+    """One output of a fan-out export: a format and an optional edge length in pixels"""
+    fileFormat: str
+    size: Optional[int] = None
+    
+    @classmethod
+    def parse(cls, spec: str) -> 'ExportTarget':
+        """Parse "png", "jpg@512" or "svg@1024" into a target"""
+        match = re.fullmatch(r"\s*\.?([A-Za-z]+)\s*(?:@\s*([0-9]+)\s*(?:px)?)?\s*", spec)
+        if not match:
+            raise ValueError(f"Invalid export target: {spec} (use FORMAT or FORMAT@SIZE)")
+        size = int(match.group(2)) if match.group(2) else None
+        if size is not None and size < 1:
+            raise ValueError(f"Export size must be positive: {spec}")
+        return cls(RenderService.normalizeFormat(match.group(1)), size)
+    
+    @property
+    def extension(self) -> str:
+        """File extension including the dot"""
+        return FileService.EXTENSION_MAP.get(self.fileFormat, f".{self.fileFormat.lower()}")
+    
+    def fileName(self, stem: str) -> str:
+        """Output file name for this target, with the size in the name when one is set"""
+        return f"{stem}-{self.size}px{self.extension}" if self.size else f"{stem}{self.extension}"
+
+
+class FanOutExporter:
+    """Writes one code in several formats and sizes from a single encode and render.
+    
+    The payload is encoded once; vector targets are written from the module
+    matrix and raster targets are derived from one base raster. Each
+    distinct size is resized and each JPEG flatten done only once, then all
+    targets are encoded concurrently (Pillow's encoders release the GIL).
+    """
+    
+    def __init__(self, options: RenderOptions, workers: Optional[int] = None):
+        self.options = options
+        self.workers = workers
+    
+    def _resample(self) -> Image.Resampling:
+        # Square modules and unantialiased renders stay hard-edged; styled drawers are already antialiased
+        if self.options.style == QRStyle.SQUARE or self.options.quality == 'none':
+            return Image.Resampling.NEAREST
+        return Image.Resampling.LANCZOS
+    
+    def _rasters(
+        self,
+        base: Image.Image,
+        targets: Sequence[ExportTarget]
+    ) -> Dict[Tuple[Optional[int], bool], Image.Image]:
+        """The raster each target encodes from, keyed by (size, flattened)"""
+        sized: Dict[Optional[int], Image.Image] = {None: base}
+        rasters = {}
+        for target in targets:
+            if target.fileFormat == 'SVG':
+                continue
+            if target.size not in sized:
+                sized[target.size] = base.resize((target.size, target.size), self._resample())
+            image = sized[target.size]
+            
+            # JPEG has no alpha, so flatten onto white once per size rather than once per save
+            flatten = target.fileFormat == 'JPEG' and image.mode == 'RGBA'
+            key = (target.size, flatten)
+            if key not in rasters:
+                if flatten:
+                    flat = Image.new('RGB', image.size, (255, 255, 255))
+                    flat.paste(image, mask=image.getchannel('A'))
+                    image = flat
+                rasters[key] = image
+        return rasters
+    
+    @staticmethod
+    def _encode(image: Image.Image, fileFormat: str) -> bytes:
+        buffer = io.BytesIO()
+        FileService.encodeImage(image, buffer, fileFormat)
+        return buffer.getvalue()
+    
+    def render(
+        self,
+        content: str,
+        targets: Sequence[ExportTarget],
+        baseImage: Optional[Image.Image] = None
+    ) -> Dict[ExportTarget, bytes]:
+        """Encoded bytes for every target, in target order.
+        
+        baseImage replaces the rendered raster, for example a code that
+        already has a logo composited onto it.
+        """
+        if not targets:
+            raise ValueError("No export targets given")
+        if self.options.fill and any(target.fileFormat == 'SVG' for target in targets):
+            raise ValueError("Fills are supported for raster formats only")
+        started = time.perf_counter()
+        options = self.options
+        
+        with memoryProfiler.profile("fanOut", targets=len(targets), style=styleName(options.style)):
+            qr = QRGenerator.encode(content, options.errorCorrection, options.boxSize, options.border)
+            if baseImage is None and any(target.fileFormat != 'SVG' for target in targets):
+                baseImage = QRGenerator.renderQr(qr, options.fgColor, options.bgColor, options.style, options.fill, options.quality)
+            rasters = self._rasters(baseImage, targets) if baseImage is not None else {}
+            
+            with ThreadPoolExecutor(max_workers=self.workers or len(targets)) as executor:
+                futures = {}
+                for target in targets:
+                    if target in futures:
+                        continue
+                    if target.fileFormat == 'SVG':
+                        svg = QRGenerator.svgFromMatrix(
+                            qr.get_matrix(), options.boxSize, options.fgColor, options.bgColor, target.size or 0
+                        )
+                        futures[target] = executor.submit(str.encode, svg, 'utf-8')
+                    else:
+                        flatten = target.fileFormat == 'JPEG' and (target.size, True) in rasters
+                        futures[target] = executor.submit(
+                            self._encode, rasters[(target.size, flatten)], target.fileFormat
+                        )
+                results = {target: future.result() for target, future in futures.items()}
+        
+        logger.info(
+            "Fan-out export: %s targets in %.1f ms", len(results), (time.perf_counter() - started) * 1000
+        )
+        return results
+    
+    def save(
+        self,
+        content: str,
+        targets: Sequence[ExportTarget],
+        basePath: str,
+        baseImage: Optional[Image.Image] = None
+    ) -> List[str]:
+        """Write every target next to basePath (its extension is dropped) and return the paths"""
+        stem = os.path.splitext(basePath)[0]
+        paths = []
+        for target, data in self.render(content, targets, baseImage).items():
+            path = target.fileName(stem)
+            with open(path, 'wb') as f:
+                f.write(data)
+            paths.append(path)
+        logger.info("Fan-out export written: %s", ", ".join(paths))
+        return paths
@@ -1,40 +1,98 @@
 import logging
 import os
+import secrets
+import time
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
 from PIL import Image
 
+from core.metrics import metrics
+from core.memory_profiler import memoryProfiler
+
 logger = logging.getLogger(__name__)
 
+SAVE_SECONDS = metrics.histogram("qr_save_seconds", "Time to encode and write an image file", ("format",))
+IMAGES_SAVED = metrics.counter("qr_images_saved_total", "Image files written", ("format",))
+
+
+@contextmanager
+def atomicFile(path: str) -> Iterator[BinaryIO]:
+    """Binary file that replaces path only when the block completes, so readers never see it half written.
+    
+    The temp file sits in the same directory, so the rename never crosses a
+    filesystem, and is opened like any new file, so it gets the usual umask
+    permissions rather than mkstemp's owner-only mode.
+    """
+    tempPath = os.path.join(os.path.dirname(path) or ".", f".tmp-{secrets.token_hex(8)}-{os.path.basename(path)}")
+    try:
+        with open(tempPath, 'xb') as f:
+            yield f
+        os.replace(tempPath, path)
+    except BaseException:
+        if os.path.exists(tempPath):
+            os.unlink(tempPath)
+        raise
+
+
+def writeAtomically(path: str, data: bytes) -> None:
+    """Write a whole file through atomicFile"""
+    with atomicFile(path) as f:
+        f.write(data)
+
 
 class FileService:
     """Service for file operations"""
     
+    FORMAT_MAP = {
+        '.png': 'PNG',
+        '.jpg': 'JPEG',
+        '.jpeg': 'JPEG',
+        '.bmp': 'BMP',
+        '.gif': 'GIF'
+    }
+    
+    EXTENSION_MAP = {
+        'PNG': '.png',
+        'JPEG': '.jpg',
+        'BMP': '.bmp',
+        'GIF': '.gif'
+    }
+    
+    @staticmethod
+    def getFormat(filePath: str) -> str:
+        """Determine image format from file extension"""
+        ext = os.path.splitext(filePath)[1].lower()
+        return FileService.FORMAT_MAP.get(ext, 'PNG')
+    
+    @staticmethod
+    def encodeImage(image: Image.Image, fileObj: BinaryIO, fileFormat: str) -> None:
+        """Encode image into an open binary stream"""
+        # Convert RGBA to RGB for JPEG
+        if fileFormat == 'JPEG' and image.mode == 'RGBA':
+            rgbImage = Image.new('RGB', image.size, (255, 255, 255))
+            rgbImage.paste(image, mask=image.split()[3])
+            rgbImage.save(fileObj, format=fileFormat, quality=95)
+        else:
+            image.save(fileObj, format=fileFormat)
+    
     @staticmethod
     def saveImage(image: Image.Image, filePath: str) -> None:
-        """Save image to file"""
+        """Save image to file; an existing file stays intact if encoding fails"""
         try:
-            # Determine format from extension
-            ext = os.path.splitext(filePath)[1].lower()
-            formatMap = {
-                '.png': 'PNG',
-                '.jpg': 'JPEG',
-                '.jpeg': 'JPEG',
-                '.bmp': 'BMP',
-                '.gif': 'GIF'
-            }
-            fileFormat = formatMap.get(ext, 'PNG')
+            started = time.perf_counter()
+            fileFormat = FileService.getFormat(filePath)
+            
+            with memoryProfiler.profile("saveImage", format=fileFormat, imageSize=image.size):
+                with atomicFile(filePath) as f:
+                    FileService.encodeImage(image, f, fileFormat)
             
-            # Convert RGBA to RGB for JPEG
-            if fileFormat == 'JPEG' and image.mode == 'RGBA':
-                rgbImage = Image.new('RGB', image.size, (255, 255, 255))
-                rgbImage.paste(image, mask=image.split()[3])
-                rgbImage.save(filePath, format=fileFormat, quality=95)
-            else:
-                image.save(filePath, format=fileFormat)
+            SAVE_SECONDS.observe(time.perf_counter() - started, format=fileFormat)
+            IMAGES_SAVED.inc(format=fileFormat)
             
-            logger.info(f"Image saved: {filePath}")
+            logger.info("Image saved: %s", filePath)
             
         except Exception as e:
-            logger.error(f"Failed to save image: {e}")
+            logger.error("Failed to save image: %s", e)
             raise
     
     @staticmethod
@@ -42,10 +100,10 @@ class FileService:
         """Load image from file"""
         try:
             image = Image.open(filePath)
-            logger.info(f"Image loaded: {filePath}")
+            logger.info("Image loaded: %s", filePath)
             return image
         except Exception as e:
-            logger.error(f"Failed to load image: {e}")
+            logger.error("Failed to load image: %s", e)
             raise
     
     @staticmethod
@@ -54,5 +112,5 @@ class FileService:
         try:
             os.makedirs(directory, exist_ok=True)
         except Exception as e:
-            logger.error(f"Failed to create directory: {e}")
-            raise
\ No newline at end of file
+            logger.error("Failed to create directory: %s", e)
+            raise
@@ -2,10 +2,14 @@ import json
 import logging
 import os, platform
 from typing import List, Dict
+from core.metrics import metrics
 from core.models import QRConfig
 
 logger = logging.getLogger(__name__)
 
+HISTORY_WRITE_SECONDS = metrics.histogram("qr_history_write_seconds", "Time to persist the history file")
+HISTORY_ENTRIES = metrics.gauge("qr_history_entries", "Entries currently held in history")
+
 
 class HistoryService:
     """Service for managing QR generation history"""
@@ -33,27 +37,28 @@ class HistoryService:
             if os.path.exists(self.historyFile):
                 with open(self.historyFile, 'r', encoding='utf-8') as f:
                     history = json.load(f)
-                    logger.info(f"Loaded {len(history)} history entries")
+                    logger.info("Loaded %s history entries", len(history))
                     return history
         except Exception as e:
-            logger.error(f"Failed to load history: {e}")
+            logger.error("Failed to load history: %s", e)
         return []
     
     def _save(self) -> None:
         """Save history to file"""
         try:
-            with open(self.historyFile, 'w', encoding='utf-8') as f:
+            with HISTORY_WRITE_SECONDS.time(), open(self.historyFile, 'w', encoding='utf-8') as f:
                 json.dump(self.history[-self.maxEntries:], f, indent=2, ensure_ascii=False)
-            logger.info(f"Saved {len(self.history)} history entries")
+            HISTORY_ENTRIES.set(min(len(self.history), self.maxEntries))
+            logger.info("Saved %s history entries", len(self.history))
         except Exception as e:
-            logger.error(f"Failed to save history: {e}")
+            logger.error("Failed to save history: %s", e)
     
     def add(self, config: QRConfig) -> None:
         """Add entry to history"""
         # Note: Using .toDict() and .qrType based on previous QRConfig conversion
         self.history.append(config.toDict())
         self._save()
-        logger.info(f"Added history entry: {config.qrType}")
+        logger.info("Added history entry: %s", config.qrType)
     
     def getAll(self) -> List[Dict]:
         """Get all history entries"""
@@ -74,4 +79,4 @@ class HistoryService:
         if 0 <= index < len(self.history):
             del self.history[index]
             self._save()
-            logger.info(f"Deleted history entry at index {index}")
\ No newline at end of file
+            logger.info("Deleted history entry at index %s", index)
\ No newline at end of file
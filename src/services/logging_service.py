@@ -0,0 +1,99 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class LoggingService:
+    """Queue-based logging: callers enqueue records, a background thread writes them"""
+    
+    def __init__(
+        self,
+        logFile: str,
+        consoleLevel: int = logging.INFO,
+        maxBytes: int = 5 * 1024 * 1024,
+        backupCount: int = 3
+    ):
+        self.logFile = logFile
+        self.consoleLevel = consoleLevel
+        self.maxBytes = maxBytes
+        self.backupCount = backupCount
+        self.queueHandler: Optional[logging.handlers.QueueHandler] = None
+        self.listener: Optional[logging.handlers.QueueListener] = None
+    
+    def _consoleHandler(self) -> logging.Handler:
+        handler = logging.StreamHandler()
+        handler.setLevel(self.consoleLevel)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        return handler
+    
+    def start(self) -> None:
+        """Route the root logger through the queue and start the writer thread"""
+        fileHandler = logging.handlers.RotatingFileHandler(
+            self.logFile, maxBytes=self.maxBytes, backupCount=self.backupCount, encoding='utf-8'
+        )
+        fileHandler.setFormatter(logging.Formatter(LOG_FORMAT))
+        
+        logQueue = queue.SimpleQueue()
+        self.queueHandler = logging.handlers.QueueHandler(logQueue)
+        self.listener = logging.handlers.QueueListener(
+            logQueue, fileHandler, self._consoleHandler(), respect_handler_level=True
+        )
+        
+        root = logging.getLogger()
+        root.setLevel(logging.INFO)
+        root.addHandler(self.queueHandler)
+        self.listener.start()
+        atexit.register(self.stop)
+        
+        # Forked worker processes have no writer thread, so they log directly
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._afterFork)
+    
+    def _afterFork(self) -> None:
+        root = logging.getLogger()
+        if self.queueHandler in root.handlers:
+            root.removeHandler(self.queueHandler)
+            # Plain append without rotation: only the parent may rotate the shared file
+            fileHandler = logging.FileHandler(self.logFile, encoding='utf-8', delay=True)
+            fileHandler.setFormatter(logging.Formatter(LOG_FORMAT))
+            root.addHandler(fileHandler)
+            root.addHandler(self._consoleHandler())
+        self.listener = None
+    
+    def stop(self) -> None:
+        """Flush queued records and stop the writer thread"""
+        if self.listener is not None:
+            self.listener.stop()
+            # Anything logged by later exit handlers goes straight to the handlers
+            root = logging.getLogger()
+            root.removeHandler(self.queueHandler)
+            for handler in self.listener.handlers:
+                root.addHandler(handler)
+            self.listener = None
+    
+    @staticmethod
+    def parseLevels(spec: str) -> Dict[str, str]:
+        """Parse "name=LEVEL,name=LEVEL" into a level mapping"""
+        levels = {}
+        for item in spec.split(','):
+            name, sep, level = item.partition('=')
+            if sep and name.strip():
+                levels[name.strip()] = level.strip()
+        return levels
+    
+    @staticmethod
+    def applyLevels(levels: Dict[str, str]) -> None:
+        """Set per-logger levels; "root" addresses the root logger"""
+        for name, level in levels.items():
+            levelValue = logging.getLevelName(str(level).upper())
+            if not isinstance(levelValue, int):
+                logger.warning("Ignoring unknown log level %s for %s", level, name)
+                continue
+            logging.getLogger(None if name == 'root' else name).setLevel(levelValue)
@@ -0,0 +1,168 @@
+import logging
+import re
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import BinaryIO, List, Tuple
+
+from PIL import Image, ImageColor
+
+from core.memory_profiler import memoryProfiler
+from core.models import RenderOptions
+from core.fills import fillFor
+from core.qr_generator import QRGenerator
+from core.styles import getDrawer, styleName
+
+logger = logging.getLogger(__name__)
+
+MM_PER_INCH = 25.4
+UNITS_MM = {'mm': 1.0, 'cm': 10.0, 'in': MM_PER_INCH}
+
+# Upper bound on the RGB tile held in memory at once
+TILE_BYTES = 8 * 1024 * 1024
+
+
+def parseLength(value: str) -> float:
+    """Parse a physical length such as "30cm", "120mm" or "4in" into millimetres"""
+    match = re.fullmatch(r"\s*([0-9]*\.?[0-9]+)\s*(mm|cm|in)?\s*", str(value).lower())
+    if not match:
+        raise ValueError(f"Invalid length: {value} (use mm, cm or in)")
+    return float(match.group(1)) * UNITS_MM[match.group(2) or 'mm']
+
+
+class PngStreamWriter:
+    """Minimal PNG writer that compresses RGB rows as they arrive"""
+    
+    SIGNATURE = b"\x89PNG\r\n\x1a\n"
+    
+    # Compressed data is flushed as an IDAT chunk once it reaches this size
+    CHUNK_SIZE = 256 * 1024
+    
+    def __init__(self, stream: BinaryIO, width: int, height: int, dpi: float):
+        self.stream = stream
+        self.width = width
+        self.height = height
+        self.rowsWritten = 0
+        self._compressor = zlib.compressobj(6)
+        self._pending: List[bytes] = []
+        self._pendingSize = 0
+        
+        stream.write(self.SIGNATURE)
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        pixelsPerMetre = round(dpi / MM_PER_INCH * 1000)
+        self._chunk(b"pHYs", struct.pack(">IIB", pixelsPerMetre, pixelsPerMetre, 1))
+    
+    def _chunk(self, kind: bytes, data: bytes) -> None:
+        self.stream.write(struct.pack(">I", len(data)) + kind + data)
+        self.stream.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind)) & 0xFFFFFFFF))
+    
+    def _emit(self, data: bytes) -> None:
+        if data:
+            self._pending.append(data)
+            self._pendingSize += len(data)
+        if self._pendingSize >= self.CHUNK_SIZE:
+            self._chunk(b"IDAT", b"".join(self._pending))
+            self._pending, self._pendingSize = [], 0
+    
+    def writeRows(self, pixels: bytes) -> None:
+        """Append whole rows of packed RGB pixels"""
+        stride = self.width * 3
+        view = memoryview(pixels)
+        for offset in range(0, len(pixels), stride):
+            # Filter type 0 (None) per scanline; flat-colour rows compress well without prediction
+            self._emit(self._compressor.compress(b"\x00"))
+            self._emit(self._compressor.compress(view[offset:offset + stride]))
+        self.rowsWritten += len(pixels) // stride
+    
+    def finish(self) -> None:
+        """Flush the compressor and close the image"""
+        if self.rowsWritten != self.height:
+            raise ValueError(f"PNG expects {self.height} rows, got {self.rowsWritten}")
+        self._emit(self._compressor.flush())
+        if self._pending:
+            self._chunk(b"IDAT", b"".join(self._pending))
+            self._pending, self._pendingSize = [], 0
+        self._chunk(b"IEND", b"")
+
+
+@dataclass(frozen=True)
+class PrintSpec:
+    """Physical output size; the code is fitted inside sizeMm at the given resolution"""
+    sizeMm: float
+    dpi: float = 300.0
+    
+    @property
+    def targetPixels(self) -> int:
+        """Requested edge length in pixels"""
+        return int(self.sizeMm / MM_PER_INCH * self.dpi)
+    
+    def modulePixels(self, modulesAcross: int) -> int:
+        """Largest whole number of pixels per module that fits the requested size"""
+        modulePx = self.targetPixels // modulesAcross
+        if modulePx < 1:
+            raise ValueError(
+                f"{self.sizeMm:g} mm at {self.dpi:g} DPI is too small for {modulesAcross} modules"
+            )
+        return modulePx
+
+
+class PrintRenderer:
+    """Renders a code at print resolution in horizontal tiles streamed to a PNG encoder.
+    
+    Module rows are drawn into a greyscale coverage mask a band at a time,
+    and the mask is coloured and encoded in RGB slices of at most TILE_BYTES.
+    Peak memory is about two TILE_BYTES however large the print; only when a
+    single module row is bigger than that does its mask exceed the budget.
+    Module edges fall on whole pixels, and finder patterns stay square as
+    with the styled drawers.
+    """
+    
+    def __init__(self, spec: PrintSpec, options: RenderOptions):
+        self.spec = spec
+        self.options = options
+    
+    def layout(self, content: str) -> Tuple[List[List[bool]], int]:
+        """Module matrix including the border, and the pixels per module"""
+        matrix = QRGenerator.getMatrix(content, self.options.errorCorrection, self.options.border)
+        return matrix, self.spec.modulePixels(len(matrix))
+    
+    def render(self, content: str, stream: BinaryIO) -> Tuple[int, float]:
+        """Write the PNG to a binary stream; returns the edge length in pixels and millimetres"""
+        matrix, modulePx = self.layout(content)
+        count = len(matrix)
+        width = count * modulePx
+        border = self.options.border
+        
+        with memoryProfiler.profile("renderPrint", dpi=self.spec.dpi, width=width, style=styleName(self.options.style)):
+            drawer = getDrawer(self.options.style)
+            # The mask is one byte per pixel; colouring happens in pixel-row slices of the RGB budget
+            rowsPerTile = max(1, TILE_BYTES // (width * modulePx))
+            sliceRows = max(1, TILE_BYTES // (width * 3))
+            fg = ImageColor.getrgb(self.options.fgColor)[:3]
+            paint = fillFor(self.options.fill)
+            bg = ImageColor.getrgb(self.options.bgColor)[:3]
+            
+            writer = PngStreamWriter(stream, width, width, self.spec.dpi)
+            for top in range(0, count, rowsPerTile):
+                # The drawer paints the whole band at once; neighbour context across band edges is its job
+                mask = drawer.renderMask(
+                    matrix, modulePx, border, top, min(top + rowsPerTile, count), self.options.quality
+                )
+                for y in range(0, mask.height, sliceRows):
+                    part = mask.crop((0, y, width, min(y + sliceRows, mask.height)))
+                    tile = Image.new('RGB', part.size, bg)
+                    if paint is not None:
+                        # Only this slice of the fill is rendered, so gradients stay within the tile budget
+                        first = top * modulePx + y
+                        tile.paste(paint.render(width, first, first + part.height), (0, 0), part)
+                    else:
+                        tile.paste(fg, (0, 0, *part.size), part)
+                    writer.writeRows(tile.tobytes())
+                    del part, tile
+            writer.finish()
+        
+        actualMm = width / self.spec.dpi * MM_PER_INCH
+        logger.info(
+            "Print render: %spx (%.1f mm at %g DPI), %s px per module", width, actualMm, self.spec.dpi, modulePx
+        )
+        return width, actualMm
@@ -0,0 +1,116 @@
+import io
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from qrcode.exceptions import DataOverflowError
+
+from core.models import QRGeneratorModel, QRType, RenderOptions
+from core.qr_generator import QRGenerator
+from services.disk_cache import DiskCache
+from services.file_service import FileService
+
+logger = logging.getLogger(__name__)
+
+
+class RenderService:
+    """Turns typed payload requests into encoded image bytes"""
+    
+    MEDIA_TYPES = {
+        'PNG': 'image/png',
+        'JPEG': 'image/jpeg',
+        'BMP': 'image/bmp',
+        'GIF': 'image/gif',
+        'SVG': 'image/svg+xml'
+    }
+    
+    @staticmethod
+    def normalizeFormat(fileFormat: str) -> str:
+        """Map a format name or extension to its canonical name"""
+        name = fileFormat.strip().lstrip('.').upper()
+        if name == 'JPG':
+            name = 'JPEG'
+        if name not in RenderService.MEDIA_TYPES:
+            raise ValueError(f"Unsupported output format: {fileFormat}")
+        return name
+    
+    @staticmethod
+    def resolveType(qrType: str) -> QRType:
+        """Map a type value or name, in any case, to its QRType"""
+        try:
+            return QRType(qrType)
+        except ValueError:
+            matches = [t for t in QRType if t.value.lower() == str(qrType).lower() or t.name == str(qrType).upper()]
+            if not matches:
+                raise ValueError(f"Unknown QR type: {qrType}")
+            return matches[0]
+    
+    @staticmethod
+    def buildContent(qrType: str, data: Dict[str, Any]) -> str:
+        """Format payload fields the same way the GUI does"""
+        resolvedType = RenderService.resolveType(qrType)
+        content = QRGeneratorModel().formatContent(resolvedType, dict(data))
+        if not content.strip():
+            raise ValueError("Payload is empty")
+        return content
+    
+    @staticmethod
+    def splitParams(params: Dict[str, Any]) -> Tuple[str, Dict[str, Any], RenderOptions]:
+        """Split a flat parameter map into type, payload fields and render options"""
+        qrType = params.get('type', QRType.TEXT.value)
+        options = RenderOptions.fromDict({k: v for k, v in params.items() if k in RenderOptions.FIELDS})
+        data = {
+            k: v for k, v in params.items()
+            if k not in RenderOptions.FIELDS and k not in ('type', 'format')
+        }
+        return qrType, data, options
+    
+    @staticmethod
+    def paramsFromDocument(document: Any) -> Dict[str, Any]:
+        """Flatten a request document of the form {type, format, data: {...}, options: {...}}"""
+        if not isinstance(document, dict):
+            raise ValueError("Request must be a JSON object")
+        
+        params = {k: v for k, v in document.items() if k not in ('data', 'options')}
+        params.update(document.get('data') or {})
+        params.update(document.get('options') or {})
+        return params
+    
+    @staticmethod
+    def renderBytes(content: str, options: RenderOptions, fileFormat: str = 'PNG') -> bytes:
+        """Render content and encode it in the requested format"""
+        try:
+            if fileFormat == 'SVG':
+                if options.fill:
+                    raise ValueError("Fills are supported for raster formats only")
+                svg = QRGenerator.generateSvg(
+                    content,
+                    options.errorCorrection,
+                    options.boxSize,
+                    options.border,
+                    options.fgColor,
+                    options.bgColor
+                )
+                return svg.encode('utf-8')
+            
+            image = QRGenerator.generate(content=content, **options.toKwargs())
+        except DataOverflowError as e:
+            # A request error like any other bad input, not a server fault
+            raise ValueError(f"Payload too long for a QR code: {e}") from e
+        buffer = io.BytesIO()
+        FileService.encodeImage(image, buffer, fileFormat)
+        return buffer.getvalue()
+    
+    @staticmethod
+    def renderCached(
+        content: str,
+        options: RenderOptions,
+        fileFormat: str = 'PNG',
+        cache: Optional[DiskCache] = None
+    ) -> bytes:
+        """renderBytes through the persistent disk cache when one is given"""
+        if cache is None:
+            return RenderService.renderBytes(content, options, fileFormat)
+        return cache.getOrRender(
+            options.cacheKey(content, fileFormat),
+            lambda: RenderService.renderBytes(content, options, fileFormat)
+        )
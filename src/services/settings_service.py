@@ -18,7 +18,17 @@ class SettingsService:
         "window_height": 700,
         "last_qr_type": "Text",
         "last_error_correction": "HIGH",
-        "last_style": "Square"
+        "last_style": "Square",
+        "timing_enabled": False,
+        "timing_in_status": False,
+        "memory_profiling_enabled": False,
+        "log_levels": {},
+        "render_cache_enabled": False,
+        "render_cache_dir": "",
+        "render_cache_max_mb": 256,
+        "batch_workers": 0,
+        "style_plugins": [],
+        "antialias_quality": "high"
     }
     
     def __init__(self, configFile: str = "qr_config.json"):
@@ -49,7 +59,7 @@ class SettingsService:
                     settings.update(loaded)
                     logger.info("Settings loaded successfully")
         except Exception as e:
-            logger.error(f"Failed to load settings: {e}")
+            logger.error("Failed to load settings: %s", e)
         return settings
     
     def _save(self) -> None:
@@ -59,7 +69,7 @@ class SettingsService:
                 json.dump(self.settings, f, indent=2)
             logger.info("Settings saved successfully")
         except Exception as e:
-            logger.error(f"Failed to save settings: {e}")
+            logger.error("Failed to save settings: %s", e)
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get setting value"""
@@ -69,13 +79,13 @@ class SettingsService:
         """Set setting value"""
         self.settings[key] = value
         self._save()
-        logger.debug(f"Setting updated: {key} = {value}")
+        logger.debug("Setting updated: %s = %s", key, value)
     
     def update(self, settingsDict: Dict[str, Any]) -> None:
         """Update multiple settings"""
         self.settings.update(settingsDict)
         self._save()
-        logger.info(f"Updated {len(settingsDict)} settings")
+        logger.info("Updated %s settings", len(settingsDict))
     
     def reset(self) -> None:
         """Reset to default settings"""
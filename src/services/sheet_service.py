@@ -0,0 +1,211 @@
+import logging
+import zlib
+from dataclasses import dataclass
+from typing import BinaryIO, Iterable, List, Tuple
+from PIL import ImageColor
+
+from core.models import ErrorCorrection
+from core.qr_generator import QRGenerator
+
+logger = logging.getLogger(__name__)
+
+# PDF user space is 1/72 inch
+POINTS_PER_MM = 72 / 25.4
+
+
+@dataclass
+class SheetSpec:
+    """Label sheet grid layout, all lengths in millimetres"""
+    pageWidth: float
+    pageHeight: float
+    columns: int
+    rows: int
+    labelWidth: float
+    labelHeight: float
+    marginLeft: float
+    marginTop: float
+    gapX: float = 0.0
+    gapY: float = 0.0
+    padding: float = 2.0
+    
+    @property
+    def labelsPerPage(self) -> int:
+        """Number of labels on one sheet"""
+        return self.columns * self.rows
+    
+    def cellOrigin(self, index: int) -> Tuple[float, float]:
+        """Top-left corner of a label cell, in millimetres from the page's top-left"""
+        row, col = divmod(index, self.columns)
+        x = self.marginLeft + col * (self.labelWidth + self.gapX)
+        y = self.marginTop + row * (self.labelHeight + self.gapY)
+        return x, y
+
+
+# Common Avery-style label sheets
+SHEET_PRESETS = {
+    "Avery L7160": SheetSpec(210.0, 297.0, 3, 7, 63.5, 38.1, 7.2, 15.15, gapX=2.54),
+    "Avery L7163": SheetSpec(210.0, 297.0, 2, 7, 99.1, 38.1, 4.65, 15.15, gapX=2.5),
+    "Avery L7651": SheetSpec(210.0, 297.0, 5, 13, 38.1, 21.2, 4.75, 10.7, gapX=2.5),
+    "Avery 5160": SheetSpec(215.9, 279.4, 3, 10, 66.675, 25.4, 4.7625, 12.7, gapX=3.175),
+}
+
+
+class PdfPageWriter:
+    """Minimal PDF writer that emits one page at a time"""
+    
+    CATALOG_ID = 1
+    PAGES_ID = 2
+    
+    def __init__(self, stream: BinaryIO, pageWidth: float, pageHeight: float):
+        self.stream = stream
+        self.pageWidth = pageWidth
+        self.pageHeight = pageHeight
+        self.offsets = {}
+        self.pageIds: List[int] = []
+        self.nextId = 3
+        self.position = 0
+        
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    
+    def _write(self, data: bytes) -> None:
+        self.stream.write(data)
+        self.position += len(data)
+    
+    def _writeObject(self, objId: int, body: bytes) -> None:
+        self.offsets[objId] = self.position
+        self._write(f"{objId} 0 obj\n".encode('ascii') + body + b"\nendobj\n")
+    
+    def addPage(self, content: bytes) -> None:
+        """Compress and write one page content stream"""
+        data = zlib.compress(content)
+        contentId, pageId = self.nextId, self.nextId + 1
+        self.nextId += 2
+        
+        self._writeObject(
+            contentId,
+            f"<< /Length {len(data)} /Filter /FlateDecode >>\nstream\n".encode('ascii') + data + b"\nendstream"
+        )
+        self._writeObject(
+            pageId,
+            (
+                f"<< /Type /Page /Parent {self.PAGES_ID} 0 R "
+                f"/MediaBox [0 0 {self.pageWidth:.2f} {self.pageHeight:.2f}] "
+                f"/Contents {contentId} 0 R /Resources << >> >>"
+            ).encode('ascii')
+        )
+        self.pageIds.append(pageId)
+    
+    def finish(self) -> None:
+        """Write page tree, catalog, cross-reference table and trailer"""
+        kids = " ".join(f"{pageId} 0 R" for pageId in self.pageIds)
+        self._writeObject(
+            self.PAGES_ID,
+            f"<< /Type /Pages /Kids [{kids}] /Count {len(self.pageIds)} >>".encode('ascii')
+        )
+        self._writeObject(self.CATALOG_ID, f"<< /Type /Catalog /Pages {self.PAGES_ID} 0 R >>".encode('ascii'))
+        
+        xrefPosition = self.position
+        lines = [f"xref\n0 {self.nextId}\n", "0000000000 65535 f \n"]
+        for objId in range(1, self.nextId):
+            lines.append(f"{self.offsets[objId]:010d} 00000 n \n")
+        lines.append(f"trailer\n<< /Size {self.nextId} /Root {self.CATALOG_ID} 0 R >>\n")
+        lines.append(f"startxref\n{xrefPosition}\n%%EOF\n")
+        self._write("".join(lines).encode('ascii'))
+
+
+class LabelSheetExporter:
+    """Lays QR codes out on label sheets as vector PDF pages"""
+    
+    def __init__(
+        self,
+        spec: SheetSpec,
+        errorCorrection: ErrorCorrection = ErrorCorrection.MEDIUM,
+        border: int = 1,
+        fgColor: str = "#000000",
+        bgColor: str = "#FFFFFF"
+    ):
+        self.spec = spec
+        self.errorCorrection = errorCorrection
+        self.border = border
+        self.fgColor = self._pdfColor(fgColor)
+        self.bgColor = self._pdfColor(bgColor)
+        self.drawBackground = ImageColor.getrgb(bgColor)[:3] != (255, 255, 255)
+    
+    @staticmethod
+    def _pdfColor(color: str) -> str:
+        """Convert a colour string to PDF RGB operands"""
+        r, g, b = ImageColor.getrgb(color)[:3]
+        return f"{r / 255:.3f} {g / 255:.3f} {b / 255:.3f}"
+    
+    def _drawCode(self, parts: List[str], matrix: List[List[bool]], index: int) -> None:
+        """Append drawing operators for one code centred in its label cell"""
+        spec = self.spec
+        count = len(matrix)
+        
+        # Largest square that fits the padded cell, in points
+        side = (min(spec.labelWidth, spec.labelHeight) - 2 * spec.padding) * POINTS_PER_MM
+        module = side / count
+        
+        cellX, cellY = spec.cellOrigin(index)
+        left = (cellX + spec.labelWidth / 2) * POINTS_PER_MM - side / 2
+        top = (spec.pageHeight - cellY - spec.labelHeight / 2) * POINTS_PER_MM + side / 2
+        
+        if self.drawBackground:
+            parts.append(f"{self.bgColor} rg\n{left:.3f} {top - side:.3f} {side:.3f} {side:.3f} re f\n")
+        
+        parts.append(f"{self.fgColor} rg\n")
+        for r, row in enumerate(matrix):
+            y = top - (r + 1) * module
+            c = 0
+            # Merge horizontal runs of dark modules into one rectangle
+            while c < count:
+                if not row[c]:
+                    c += 1
+                    continue
+                start = c
+                while c < count and row[c]:
+                    c += 1
+                parts.append(f"{left + start * module:.3f} {y:.3f} {(c - start) * module:.3f} {module:.3f} re\n")
+        parts.append("f\n")
+    
+    def export(self, payloads: Iterable[str], outputPath: str) -> int:
+        """Render payloads onto sheets, writing each page as soon as it is full"""
+        matrices = (QRGenerator.getMatrix(content, self.errorCorrection, self.border) for content in payloads)
+        return self.exportMatrices(matrices, outputPath)
+    
+    def exportMatrices(self, matrices: Iterable[List[List[bool]]], outputPath: str) -> int:
+        """Lay already encoded module matrices (border included) onto sheets"""
+        perPage = self.spec.labelsPerPage
+        total = 0
+        
+        try:
+            with open(outputPath, 'wb') as f:
+                writer = PdfPageWriter(
+                    f,
+                    self.spec.pageWidth * POINTS_PER_MM,
+                    self.spec.pageHeight * POINTS_PER_MM
+                )
+                
+                parts: List[str] = []
+                slot = 0
+                for matrix in matrices:
+                    self._drawCode(parts, matrix, slot)
+                    slot += 1
+                    total += 1
+                    
+                    if slot == perPage:
+                        writer.addPage("".join(parts).encode('ascii'))
+                        parts = []
+                        slot = 0
+                
+                if slot or not writer.pageIds:
+                    writer.addPage("".join(parts).encode('ascii'))
+                
+                writer.finish()
+            
+            logger.info("Label sheets exported: %s codes on %s pages to %s", total, len(writer.pageIds), outputPath)
+            return total
+        
+        except Exception as e:
+            logger.error("Failed to export label sheets: %s", e)
+            raise
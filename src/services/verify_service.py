@@ -0,0 +1,246 @@
+import csv
+import io
+import json
+import logging
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import compress
+from operator import xor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import qrcode
+from qrcode import base
+from PIL import Image, ImageColor
+
+from core.metrics import metrics
+from core.models import ErrorCorrection, RenderOptions
+from core.qr_layout import layoutFor
+from core.serial_template import SerialTemplate
+
+logger = logging.getLogger(__name__)
+
+CODES_VERIFIED = metrics.counter("qr_codes_verified_total", "Rendered codes checked against their payload", ("result",))
+
+# Format information is BCH(15,5) coded and corrects up to three bit errors
+FORMAT_CORRECTABLE = 3
+
+# ISO/IEC 18004 table 9: error correction codewords of the smallest symbols kept back as
+# misdecode protection (p), keyed by (version, qrcode error correction constant)
+MISDECODE_PROTECTION = {
+    (1, qrcode.constants.ERROR_CORRECT_L): 3,
+    (1, qrcode.constants.ERROR_CORRECT_M): 2,
+    (1, qrcode.constants.ERROR_CORRECT_Q): 1,
+    (1, qrcode.constants.ERROR_CORRECT_H): 1,
+    (2, qrcode.constants.ERROR_CORRECT_L): 2,
+    (3, qrcode.constants.ERROR_CORRECT_L): 1,
+}
+
+
+@dataclass
+class VerifyResult:
+    """Outcome of checking one rendered code"""
+    name: str
+    payload: str
+    ok: bool
+    moduleErrors: int = 0
+    worstBlockErrors: int = 0
+    blockCapacity: int = 0
+    reason: str = ""
+
+
+@dataclass
+class VerifyReport:
+    """Summary of a verification run"""
+    results: List[VerifyResult] = field(default_factory=list)
+    seconds: float = 0.0
+    
+    @property
+    def failures(self) -> List[VerifyResult]:
+        """Codes that are unreadable or do not match their payload"""
+        return [result for result in self.results if not result.ok]
+    
+    @property
+    def codesPerSecond(self) -> float:
+        """Verification throughput"""
+        return len(self.results) / self.seconds if self.seconds else 0.0
+    
+    def summary(self) -> str:
+        """One-line summary for logs and the CLI"""
+        return (
+            f"{len(self.results)} codes verified, {len(self.failures)} failed "
+            f"in {self.seconds:.2f}s ({self.codesPerSecond:.0f} codes/s)"
+        )
+
+
+@lru_cache(maxsize=None)
+def _codewordBlocks(version: int, errorCorrection: int) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """Block of every codeword in interleaved order, and the codewords each block can correct"""
+    blocks = base.rs_blocks(version, errorCorrection)
+    order = []
+    # Same interleaving as util.create_bytes: data codewords first, then error correction codewords
+    for i in range(max(block.data_count for block in blocks)):
+        order.extend(b for b, block in enumerate(blocks) if i < block.data_count)
+    for i in range(max(block.total_count - block.data_count for block in blocks)):
+        order.extend(b for b, block in enumerate(blocks) if i < block.total_count - block.data_count)
+    # These symbols have a single block, so p applies to it whole
+    protected = MISDECODE_PROTECTION.get((version, errorCorrection), 0)
+    capacity = tuple((block.total_count - block.data_count - protected) // 2 for block in blocks)
+    return tuple(order), capacity
+
+
+@lru_cache(maxsize=None)
+def _placementRank(version: int) -> Dict[int, int]:
+    """Data bit position of every data module, keyed by flat index"""
+    return {index: position for position, index in enumerate(layoutFor(version).placement)}
+
+
+@lru_cache(maxsize=None)
+def _finderIndices(size: int) -> frozenset:
+    """Finder patterns and their separators, as flat indices"""
+    corners = ((0, 0), (0, size - 8), (size - 8, 0))
+    return frozenset((top + r) * size + left + c for top, left in corners for r in range(8) for c in range(8))
+
+
+@lru_cache(maxsize=None)
+def _darkTable(fgColor: str, bgColor: str) -> bytes:
+    """Translation table from luminance to 1 (dark module) or 0"""
+    fg = ImageColor.getcolor(fgColor, 'L')
+    bg = ImageColor.getcolor(bgColor, 'L')
+    threshold = (fg + bg) / 2
+    if fg <= bg:
+        return bytes(level < threshold for level in range(256))
+    return bytes(level > threshold for level in range(256))
+
+
+class CodeVerifier:
+    """Checks rendered codes against the matrix their payload encodes to.
+    
+    Each image is sampled at every module centre and compared with the
+    expected modules. Mismatched data modules are mapped to codewords, and a
+    code passes while every Reed-Solomon block stays within its correction
+    capacity, the finder patterns are intact and the format information is
+    recoverable. This catches logos, styles or colours that break a code
+    without a full decoder.
+    """
+    
+    def __init__(self, options: Optional[RenderOptions] = None, workers: Optional[int] = None):
+        self.options = options or RenderOptions()
+        self.workers = workers
+    
+    @staticmethod
+    def _expected(payload: str, errorCorrection: ErrorCorrection, width: int, border: int) -> Tuple[int, bytes]:
+        # Renders use whole pixels per module, so take the smallest fitting version that divides the width;
+        # serial runs may share a larger version than the payload's own best fit
+        qr = qrcode.QRCode(version=1, error_correction=errorCorrection.value[0])
+        qr.add_data(payload)
+        version = qr.best_fit(start=1)
+        while version <= 40 and width % (version * 4 + 17 + 2 * border):
+            version += 1
+        if version > 40:
+            raise ValueError("image size does not match any version that fits the payload")
+        modules, _ = SerialTemplate(errorCorrection, version).encode(payload)
+        return version, bytes(module for row in modules for module in row)
+    
+    def verifyImage(self, image: Image.Image, payload: str, name: str = "") -> VerifyResult:
+        """Check one rendered image against its payload"""
+        options = self.options
+        try:
+            if image.width != image.height:
+                raise ValueError(f"image is not square ({image.width}x{image.height})")
+            version, expected = self._expected(payload, options.errorCorrection, image.width, options.border)
+        except ValueError as e:
+            return VerifyResult(name, payload, False, reason=str(e))
+        
+        layout = layoutFor(version)
+        size = layout.size
+        margin = options.border * image.width / (size + 2 * options.border)
+        inner = (margin, margin, image.width - margin, image.height - margin)
+        # Nearest-neighbour resampling to one pixel per module reads each module centre
+        sampled = image.convert('L').resize((size, size), Image.Resampling.NEAREST, box=inner).tobytes()
+        sampled = sampled.translate(_darkTable(options.fgColor, options.bgColor))
+        
+        errors = list(compress(range(size * size), map(xor, expected, sampled)))
+        if not errors:
+            return VerifyResult(name, payload, True)
+        
+        if any(index in _finderIndices(size) for index in errors):
+            return VerifyResult(name, payload, False, len(errors), reason="finder patterns differ")
+        formatIndices = set(layout.formatIndices)
+        if sum(index in formatIndices for index in errors) > FORMAT_CORRECTABLE:
+            return VerifyResult(name, payload, False, len(errors), reason="format information differs")
+        
+        blockOf, capacity = _codewordBlocks(version, options.errorCorrection.value[0])
+        rank = _placementRank(version)
+        damaged = {rank[index] // 8 for index in errors if index in rank and rank[index] // 8 < len(blockOf)}
+        blockErrors = [0] * len(capacity)
+        for codeword in damaged:
+            blockErrors[blockOf[codeword]] += 1
+        worst = max(range(len(capacity)), key=lambda b: blockErrors[b] / capacity[b])
+        ok = all(count <= limit for count, limit in zip(blockErrors, capacity))
+        return VerifyResult(
+            name, payload, ok, len(errors), blockErrors[worst], capacity[worst],
+            "" if ok else "more differing codewords than error correction can repair"
+        )
+    
+    def verifyBytes(self, data: bytes, payload: str, name: str = "") -> VerifyResult:
+        """Check one encoded image file"""
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                return self.verifyImage(image, payload, name)
+        except OSError as e:
+            return VerifyResult(name, payload, False, reason=f"unreadable image: {e}")
+    
+    def verifyItems(self, items: Iterable[Tuple[str, bytes, str]], executor: Optional[Executor] = None) -> VerifyReport:
+        """Verify (name, image bytes, payload) items in a process pool, keeping results in input order"""
+        started = time.perf_counter()
+        report = VerifyReport()
+        ownPool = executor is None
+        executor = executor or ProcessPoolExecutor(max_workers=self.workers)
+        
+        try:
+            for result in self._stream(executor, items):
+                CODES_VERIFIED.inc(result='ok' if result.ok else 'failed')
+                if not result.ok:
+                    logger.info("Verification failed: %s (%s)", result.name, result.reason)
+                report.results.append(result)
+        finally:
+            if ownPool:
+                executor.shutdown()
+        
+        report.seconds = time.perf_counter() - started
+        logger.info("Verification finished: %s", report.summary())
+        return report
+    
+    def _stream(self, executor: Executor, items: Iterable[Tuple[str, bytes, str]]) -> Iterator[VerifyResult]:
+        # A bounded window of pending jobs keeps memory flat on large archives
+        window = 4 * (self.workers or os.cpu_count() or 1)
+        pending = deque()
+        for name, data, payload in items:
+            pending.append(executor.submit(_verifyJob, self.options, data, payload, name))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    
+    def verifyArchive(self, archivePath: str, executor: Optional[Executor] = None) -> VerifyReport:
+        """Verify every image listed in a batch ZIP's manifest"""
+        with zipfile.ZipFile(archivePath) as archive:
+            names = archive.namelist()
+            if 'manifest.csv' in names:
+                with archive.open('manifest.csv') as manifest:
+                    rows = list(csv.DictReader(io.TextIOWrapper(manifest, encoding='utf-8', newline='')))
+            elif 'manifest.json' in names:
+                rows = json.loads(archive.read('manifest.json'))
+            else:
+                raise ValueError(f"{archivePath} has no manifest")
+            items = ((row['entry'], archive.read(row['entry']), row['payload']) for row in rows)
+            return self.verifyItems(items, executor)
+
+
+def _verifyJob(options: RenderOptions, data: bytes, payload: str, name: str) -> VerifyResult:
+    return CodeVerifier(options).verifyBytes(data, payload, name)
@@ -2,10 +2,12 @@ from .main_window import QRGeneratorView
 from .input_panel import InputPanel
 from .settings_panel import SettingsPanel
 from .preview_panel import PreviewPanel
+from .batch_dialog import BatchDialog
 
 __all__ = [
     'QRGeneratorView',
     'InputPanel',
     'SettingsPanel',
-    'PreviewPanel'
+    'PreviewPanel',
+    'BatchDialog'
 ]
@@ -0,0 +1,287 @@
+import csv
+import logging
+import multiprocessing
+import os
+import tkinter as tk
+from concurrent.futures import ProcessPoolExecutor
+from tkinter import ttk, filedialog, messagebox
+from dataclasses import replace
+from typing import Dict, Iterator, List, Optional
+
+from core.batch_formatter import BatchFormatter
+from core.models import QRType, RenderOptions
+from core.styles import QUALITY_LEVELS
+from services.batch_service import BatchJob, BatchRunner
+from services.export_service import ZipExportSink
+from ui.theme import FONTS, SPACING
+
+logger = logging.getLogger(__name__)
+
+NO_COLUMN = "(none)"
+
+
+def countRows(csvPath: str) -> int:
+    """Estimate the data rows in a CSV file by counting line breaks"""
+    lines = 0
+    lastByte = b"\n"
+    with open(csvPath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            lines += chunk.count(b"\n")
+            lastByte = chunk[-1:]
+    if lastByte != b"\n":
+        lines += 1
+    # The header row is not a code
+    return max(lines - 1, 0)
+
+
+class BatchDialog(tk.Toplevel):
+    """Dialog that renders every row of a CSV file into a ZIP archive in the background.
+    
+    CSV columns are mapped onto the payload fields of the chosen QR type,
+    renders run in a process pool, and progress is polled on the Tk event
+    loop so the main window stays responsive.
+    """
+    
+    # Progress refresh interval in milliseconds
+    POLL_MS = 100
+    
+    def __init__(self, parent, options: RenderOptions, qrType: QRType, settingsService):
+        super().__init__(parent)
+        self.options = options
+        self.settingsService = settingsService
+        self.job: Optional[BatchJob] = None
+        self.pollId: Optional[str] = None
+        self.columns: List[str] = []
+        self.columnVars: Dict[str, tk.StringVar] = {}
+        
+        self.title("Batch Generate")
+        self.transient(parent)
+        self.resizable(True, False)
+        self.protocol("WM_DELETE_WINDOW", self._onClose)
+        
+        self.csvVar = tk.StringVar()
+        self.outputVar = tk.StringVar()
+        self.qrTypeVar = tk.StringVar(value=qrType.value)
+        self.workersVar = tk.IntVar(value=self.settingsService.get("batch_workers", 0) or os.cpu_count() or 1)
+        self.dedupVar = tk.BooleanVar(value=True)
+        self.qualityVar = tk.StringVar(value=options.quality)
+        self.progressVar = tk.DoubleVar(value=0)
+        self.statusVar = tk.StringVar(value="Choose a CSV file to start")
+        
+        self._createLayout()
+        logger.info("Batch dialog opened")
+    
+    def _createLayout(self) -> None:
+        """Create dialog layout"""
+        frame = ttk.Frame(self, padding=SPACING['lg'])
+        frame.pack(fill="both", expand=True)
+        frame.grid_columnconfigure(1, weight=1)
+        
+        ttk.Label(frame, text="CSV File:", font=FONTS['body']).grid(row=0, column=0, sticky="w", pady=SPACING['xs'])
+        ttk.Entry(frame, textvariable=self.csvVar, font=FONTS['body'], state="readonly").grid(
+            row=0, column=1, sticky="ew", padx=SPACING['sm']
+        )
+        ttk.Button(frame, text="Browse...", command=self._chooseCsv, cursor="hand2").grid(row=0, column=2)
+        
+        ttk.Label(frame, text="Output ZIP:", font=FONTS['body']).grid(row=1, column=0, sticky="w", pady=SPACING['xs'])
+        ttk.Entry(frame, textvariable=self.outputVar, font=FONTS['body']).grid(
+            row=1, column=1, sticky="ew", padx=SPACING['sm']
+        )
+        ttk.Button(frame, text="Browse...", command=self._chooseOutput, cursor="hand2").grid(row=1, column=2)
+        
+        ttk.Label(frame, text="QR Type:", font=FONTS['body']).grid(row=2, column=0, sticky="w", pady=SPACING['xs'])
+        typeMenu = ttk.Combobox(
+            frame,
+            textvariable=self.qrTypeVar,
+            values=[t.value for t in QRType],
+            state="readonly",
+            font=FONTS['body']
+        )
+        typeMenu.grid(row=2, column=1, sticky="ew", padx=SPACING['sm'])
+        typeMenu.bind('<<ComboboxSelected>>', lambda e: self._createMappingFields())
+        
+        self.mappingFrame = ttk.LabelFrame(frame, text="Columns", padding=SPACING['md'])
+        self.mappingFrame.grid(row=3, column=0, columnspan=3, sticky="ew", pady=SPACING['md'])
+        self.mappingFrame.grid_columnconfigure(1, weight=1)
+        self._createMappingFields()
+        
+        optionsFrame = ttk.Frame(frame)
+        optionsFrame.grid(row=4, column=0, columnspan=3, sticky="ew")
+        ttk.Label(optionsFrame, text="Workers:", font=FONTS['body']).pack(side="left")
+        ttk.Spinbox(optionsFrame, from_=1, to=64, textvariable=self.workersVar, width=5).pack(
+            side="left", padx=SPACING['sm']
+        )
+        ttk.Checkbutton(optionsFrame, text="Reuse renders of repeated rows", variable=self.dedupVar).pack(
+            side="left", padx=SPACING['md']
+        )
+        # "none" suits 1-bit thermal label printers, where antialiased edges are wasted work
+        ttk.Label(optionsFrame, text="Antialiasing:", font=FONTS['body']).pack(side="left")
+        ttk.Combobox(
+            optionsFrame,
+            textvariable=self.qualityVar,
+            values=list(QUALITY_LEVELS),
+            state="readonly",
+            width=6,
+            font=FONTS['body']
+        ).pack(side="left", padx=SPACING['sm'])
+        
+        ttk.Progressbar(frame, variable=self.progressVar, maximum=100, mode="determinate").grid(
+            row=5, column=0, columnspan=3, sticky="ew", pady=(SPACING['lg'], SPACING['xs'])
+        )
+        ttk.Label(frame, textvariable=self.statusVar, font=FONTS['small']).grid(
+            row=6, column=0, columnspan=3, sticky="w"
+        )
+        
+        btnFrame = ttk.Frame(frame)
+        btnFrame.grid(row=7, column=0, columnspan=3, sticky="e", pady=(SPACING['md'], 0))
+        self.startBtn = ttk.Button(
+            btnFrame, text="Start", command=self._start, style="primary.TButton", width=12, cursor="hand2"
+        )
+        self.startBtn.pack(side="left", padx=(0, SPACING['sm']))
+        self.cancelBtn = ttk.Button(btnFrame, text="Close", command=self._onClose, width=12, cursor="hand2")
+        self.cancelBtn.pack(side="left")
+    
+    def _createMappingFields(self) -> None:
+        """Create one column selector per payload field of the chosen QR type"""
+        for widget in self.mappingFrame.winfo_children():
+            widget.destroy()
+        self.columnVars = {}
+        
+        byName = {column.strip().lower(): column for column in self.columns}
+        fieldNames = BatchFormatter(QRType(self.qrTypeVar.get())).fieldNames
+        for row, field in enumerate(fieldNames):
+            ttk.Label(self.mappingFrame, text=f"{field.capitalize()}:", font=FONTS['body']).grid(
+                row=row, column=0, sticky="w", pady=SPACING['xs']
+            )
+            # Columns named like the field are selected automatically
+            var = tk.StringVar(value=byName.get(field, NO_COLUMN))
+            ttk.Combobox(
+                self.mappingFrame,
+                textvariable=var,
+                values=[NO_COLUMN] + self.columns,
+                state="readonly",
+                font=FONTS['body']
+            ).grid(row=row, column=1, sticky="ew", padx=(SPACING['sm'], 0))
+            self.columnVars[field] = var
+    
+    def _chooseCsv(self) -> None:
+        """Pick the CSV file and read its header row"""
+        csvPath = filedialog.askopenfilename(
+            parent=self,
+            title="Choose CSV File",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+            initialdir=self.settingsService.get("last_save_directory", "")
+        )
+        if not csvPath:
+            return
+        
+        try:
+            with open(csvPath, encoding='utf-8-sig', newline='') as f:
+                self.columns = next(csv.reader(f), [])
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            messagebox.showerror("Error", f"Failed to read CSV file: {e}", parent=self)
+            return
+        
+        self.csvVar.set(csvPath)
+        if not self.outputVar.get():
+            self.outputVar.set(os.path.splitext(csvPath)[0] + ".zip")
+        self._createMappingFields()
+        self.statusVar.set(f"{len(self.columns)} columns found")
+    
+    def _chooseOutput(self) -> None:
+        """Pick the output archive"""
+        outputPath = filedialog.asksaveasfilename(
+            parent=self,
+            title="Save Batch As",
+            defaultextension=".zip",
+            filetypes=[("ZIP archives", "*.zip")],
+            initialfile=os.path.basename(self.outputVar.get()) or "codes.zip"
+        )
+        if outputPath:
+            self.outputVar.set(outputPath)
+    
+    def _payloads(self, csvPath: str, formatter: BatchFormatter, columnMap: Dict[str, str]) -> Iterator[str]:
+        # Runs on the job thread; the file stays open only while the batch is read
+        with open(csvPath, encoding='utf-8-sig', newline='') as f:
+            yield from formatter.formatRows(csv.DictReader(f), columnMap)
+    
+    def _start(self) -> None:
+        """Validate the mapping and start the batch job"""
+        csvPath, outputPath = self.csvVar.get(), self.outputVar.get()
+        columnMap = {field: var.get() for field, var in self.columnVars.items() if var.get() != NO_COLUMN}
+        if not csvPath or not outputPath:
+            messagebox.showerror("Error", "Choose a CSV file and an output ZIP", parent=self)
+            return
+        if not columnMap:
+            messagebox.showerror("Error", "Map at least one column to a field", parent=self)
+            return
+        
+        try:
+            formatter = BatchFormatter(QRType(self.qrTypeVar.get()))
+            expected = countRows(csvPath)
+            workers = max(1, int(self.workersVar.get()))
+            sink = ZipExportSink(outputPath)
+        except (OSError, ValueError, tk.TclError) as e:
+            messagebox.showerror("Error", f"Failed to start batch: {e}", parent=self)
+            return
+        
+        # Spawned workers never inherit the Tk interpreter
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        runner = BatchRunner(replace(self.options, quality=self.qualityVar.get()), "PNG", self.dedupVar.get())
+        self.job = BatchJob(
+            runner, self._payloads(csvPath, formatter, columnMap), sink, executor, expected, workers
+        ).start()
+        
+        self.startBtn.configure(state="disabled")
+        self.cancelBtn.configure(text="Cancel", command=self._cancel)
+        self.statusVar.set(f"Starting {workers} workers...")
+        logger.info("Batch started: %s -> %s (%s rows)", csvPath, outputPath, expected)
+        self.pollId = self.after(self.POLL_MS, self._poll)
+    
+    def _cancel(self) -> None:
+        """Stop the running job after the codes in flight"""
+        if self.job:
+            self.job.cancel()
+            self.cancelBtn.configure(state="disabled")
+            self.statusVar.set("Cancelling...")
+    
+    def _poll(self) -> None:
+        """Refresh progress from the job; only this Tk callback touches widgets"""
+        self.pollId = None
+        job = self.job
+        if job is None:
+            return
+        
+        stats = job.stats if job.done and job.stats else job.latest
+        if stats.expected:
+            self.progressVar.set(min(100.0, 100.0 * stats.total / stats.expected))
+        
+        if not job.done:
+            if stats.total and not job.cancelRequested:
+                eta = stats.etaSeconds
+                etaText = f" • ETA {int(eta) // 60}:{int(eta) % 60:02d}" if eta is not None else ""
+                self.statusVar.set(f"{stats.total} / {stats.expected} codes • {stats.codesPerSecond:.0f} codes/s{etaText}")
+            self.pollId = self.after(self.POLL_MS, self._poll)
+            return
+        
+        self.job = None
+        self.startBtn.configure(state="normal")
+        self.cancelBtn.configure(text="Close", command=self._onClose, state="normal")
+        if job.error:
+            self.statusVar.set("Batch failed")
+            messagebox.showerror("Error", f"Batch failed: {job.error}", parent=self)
+        else:
+            self.progressVar.set(100.0 if not stats.cancelled else self.progressVar.get())
+            self.statusVar.set(stats.summary())
+    
+    def _onClose(self) -> None:
+        """Close the dialog, cancelling a running job first"""
+        if self.job and not self.job.done:
+            if not messagebox.askyesno("Batch Running", "Cancel the running batch?", parent=self):
+                return
+            self.job.cancel()
+        # A poll still scheduled would touch the destroyed widgets and variables
+        if self.pollId is not None:
+            self.after_cancel(self.pollId)
+            self.pollId = None
+        self.destroy()
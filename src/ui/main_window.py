@@ -95,10 +95,10 @@ class QRGeneratorView(ttkb.Window):
             if os.path.exists(iconPath):
                 self.iconbitmap(iconPath)
             else:                
-                logger.warning(f"Icon not found at: {iconPath}")
+                logger.warning("Icon not found at: %s", iconPath)
                 
         except Exception as e:
-            logger.warning(f"Could not load icon: {e}")
+            logger.warning("Could not load icon: %s", e)
         # -----------------------
         
         # Variables
@@ -199,12 +199,22 @@ class QRGeneratorView(ttkb.Window):
             cursor="hand2"
         )
         self.copyBtn.pack(side="left")
+        
+        self.batchBtn = ttk.Button(
+            saveFrame,
+            text="Batch...",
+            command=self.controller.openBatchDialog,
+            width=12,
+            cursor="hand2"
+        )
+        self.batchBtn.pack(side="right")
     
     def _bindShortcuts(self) -> None:
         """Bind keyboard shortcuts"""
         self.bind("<Control-g>", lambda e: self.controller.generateQr())
         self.bind("<Control-s>", lambda e: self.controller.saveQr())
         self.bind("<Control-c>", lambda e: self.controller.copyToClipboard())
+        self.bind("<Control-b>", lambda e: self.controller.openBatchDialog())
         self.bind("<F1>", lambda e: self.controller.showHelp())
     
     def getInputData(self) -> Dict[str, str]:
@@ -45,12 +45,18 @@ class PreviewPanel:
         )
         self.infoLabel.pack(pady=SPACING['md'])
     
-    def updateImage(self, image: Image.Image) -> None:
-        """Update QR code preview with new image"""
-        # Resize for display
+    @staticmethod
+    def prepareImage(image: Image.Image) -> Image.Image:
+        """Resize a copy of the image for display"""
         displaySize = (450, 450)
         imgCopy = image.copy()
         imgCopy.thumbnail(displaySize, Image.Resampling.LANCZOS)
+        return imgCopy
+    
+    def updateImage(self, image: Image.Image) -> None:
+        """Update QR code preview with new image"""
+        # Resize for display
+        imgCopy = self.prepareImage(image)
         
         photo = ImageTk.PhotoImage(imgCopy)
         self.previewLabel.configure(image=photo, text="")
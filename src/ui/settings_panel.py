@@ -1,6 +1,6 @@
 import tkinter as tk
 from tkinter import ttk
-from core.models import QRStyle
+from core.styles import styleNames
 from ui.theme import FONTS, SPACING, COLORS
 
 
@@ -83,7 +83,7 @@ class SettingsPanel:
         styleMenu = ttk.Combobox(
             styleFrame,
             textvariable=self.mainView.styleVar,
-            values=[s.value for s in QRStyle],
+            values=styleNames(),
             state="readonly",
             width=15,
             font=FONTS['body'],
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The application imports its packages from src/, as main.py arranges at startup
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
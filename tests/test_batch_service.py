@@ -0,0 +1,40 @@
+import os
+import zipfile
+
+from core.models import RenderOptions
+from services.batch_service import BatchJob, BatchRunner
+from services.export_service import DirectoryExportSink, ZipExportSink
+
+
+def failingPayloads():
+    yield "first"
+    yield "second"
+    raise OSError("CSV went away")
+
+
+def runJob(payloads, sink) -> BatchJob:
+    job = BatchJob(BatchRunner(RenderOptions()), payloads, sink).start()
+    job._thread.join()
+    return job
+
+
+def testFinishedJobWritesArchive(tmp_path):
+    path = tmp_path / "codes.zip"
+    job = runJob(["first", "second"], ZipExportSink(str(path)))
+    assert job.error is None
+    with zipfile.ZipFile(path) as archive:
+        assert sorted(archive.namelist()) == ['000000.png', '000001.png', 'manifest.csv']
+
+
+def testFailedJobRemovesPartialArchive(tmp_path):
+    path = tmp_path / "codes.zip"
+    job = runJob(failingPayloads(), ZipExportSink(str(path)))
+    assert isinstance(job.error, OSError)
+    assert not path.exists()
+
+
+def testFailedJobRemovesOnlyItsOwnFiles(tmp_path):
+    (tmp_path / "keep.txt").write_text("unrelated")
+    job = runJob(failingPayloads(), DirectoryExportSink(str(tmp_path)))
+    assert isinstance(job.error, OSError)
+    assert os.listdir(tmp_path) == ["keep.txt"]
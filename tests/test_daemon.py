@@ -0,0 +1,32 @@
+import socket
+
+import pytest
+
+from server.daemon import QRDaemon
+
+
+def testRegularFileIsNotRemoved(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("keep me")
+    with pytest.raises(FileExistsError):
+        QRDaemon(str(path))._removeStaleSocket()
+    assert path.read_text() == "keep me"
+
+
+def testStaleSocketIsRemoved(tmp_path):
+    path = tmp_path / "qr.sock"
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(path))
+    stale.close()
+    QRDaemon(str(path))._removeStaleSocket()
+    assert not path.exists()
+
+
+def testLiveSocketIsKept(tmp_path):
+    path = tmp_path / "qr.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as live:
+        live.bind(str(path))
+        live.listen()
+        with pytest.raises(FileExistsError):
+            QRDaemon(str(path))._removeStaleSocket()
+    assert path.exists()
@@ -0,0 +1,32 @@
+import os
+
+import pytest
+from PIL import Image
+
+from services.file_service import FileService, writeAtomically
+
+
+def testSaveImageRoundTrips(tmp_path):
+    path = tmp_path / "code.png"
+    FileService.saveImage(Image.new('RGB', (8, 8), (255, 0, 0)), str(path))
+    with Image.open(path) as image:
+        assert image.getpixel((0, 0)) == (255, 0, 0)
+    assert os.listdir(tmp_path) == ["code.png"]
+
+
+def testFailedSaveKeepsExistingFile(tmp_path):
+    path = tmp_path / "code.jpg"
+    path.write_bytes(b"previous")
+    # JPEG has no LA mode, so encoding fails after the output file was opened
+    with pytest.raises(OSError):
+        FileService.saveImage(Image.new('LA', (8, 8)), str(path))
+    assert path.read_bytes() == b"previous"
+    assert os.listdir(tmp_path) == ["code.jpg"]
+
+
+def testWriteAtomicallyUsesDefaultPermissions(tmp_path):
+    path = tmp_path / "status.json"
+    writeAtomically(str(path), b"{}")
+    umask = os.umask(0)
+    os.umask(umask)
+    assert path.stat().st_mode & 0o777 == 0o666 & ~umask
@@ -0,0 +1,40 @@
+import os
+
+from PIL import Image
+
+from core.fills import fillFor, fillImage
+from core.models import RenderOptions
+
+
+def writeTexture(path, color, size, mtime):
+    Image.new('RGB', (size, size), color).save(path)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def testEditedTextureIsReloaded(tmp_path):
+    path = tmp_path / "texture.png"
+    fill = fillFor(f"image:{path}")
+    
+    writeTexture(path, (255, 0, 0), 32, 1_000_000_000)
+    assert fillImage(fill, 16).getpixel((8, 8)) == (255, 0, 0)
+    
+    writeTexture(path, (0, 0, 255), 48, 2_000_000_000)
+    assert fillImage(fill, 16).getpixel((8, 8)) == (0, 0, 255)
+
+
+def testEditedTextureChangesCacheKey(tmp_path):
+    path = tmp_path / "texture.png"
+    options = RenderOptions(fill=f"image:{path}")
+    
+    writeTexture(path, (255, 0, 0), 32, 1_000_000_000)
+    before = options.cacheKey("content")
+    assert options.cacheKey("content") == before
+    
+    writeTexture(path, (0, 0, 255), 32, 2_000_000_000)
+    assert options.cacheKey("content") != before
+
+
+def testGradientCacheKeyIgnoresStamp():
+    options = RenderOptions(fill="linear:#F00,#00F")
+    assert 'fillStamp' not in options.toDict()
+    assert options.cacheKey("content") == RenderOptions(fill="linear:#F00,#00F").cacheKey("content")
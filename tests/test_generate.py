@@ -0,0 +1,23 @@
+import zipfile
+
+import pytest
+
+from cli import generate
+
+
+@pytest.mark.parametrize("count", ["0", "-1"])
+def testSerialCountBelowOneIsRejected(count, tmp_path, capsys):
+    output = tmp_path / "codes.zip"
+    with pytest.raises(SystemExit) as exit:
+        generate.main(["--text", "item-", "--serial-count", count, "-o", str(output)])
+    assert exit.value.code == 2
+    assert "--serial-count" in capsys.readouterr().err
+    assert not output.exists()
+
+
+def testSerialCountWritesEveryCode(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    output = tmp_path / "codes.zip"
+    assert generate.main(["--text", "item-", "--serial-count", "3", "-o", str(output)]) == 0
+    with zipfile.ZipFile(output) as archive:
+        assert sorted(archive.namelist()) == ['000000.png', '000001.png', '000002.png', 'manifest.csv']
@@ -0,0 +1,46 @@
+import pytest
+
+from core.batch_formatter import BatchFormatter
+from core.models import QRGeneratorModel, QRType, encodeMailto, escapeVcard, escapeWifi, parseBool
+
+
+@pytest.mark.parametrize("value", [True, 1, "1", "true", "TRUE", " yes ", "y", "on", "x"])
+def testParseBoolTrue(value):
+    assert parseBool(value) is True
+
+
+@pytest.mark.parametrize("value", [False, None, 0, "", "0", "false", "no", "off", "hidden"])
+def testParseBoolFalse(value):
+    assert parseBool(value) is False
+
+
+def testEscapeWifi():
+    assert escapeWifi('a\\b;c,d:e"f') == 'a\\\\b\\;c\\,d\\:e\\"f'
+
+
+@pytest.mark.parametrize("value", ["line\nbreak", "line\rbreak"])
+def testEscapeWifiRejectsLineBreaks(value):
+    with pytest.raises(ValueError):
+        escapeWifi(value)
+
+
+def testEscapeVcard():
+    assert escapeVcard('a\\b;c,d\r\ne') == 'a\\\\b\\;c\\,d\\ne'
+
+
+def testEncodeMailto():
+    assert encodeMailto("a b&c=d?") == "a%20b%26c%3Dd%3F"
+    assert encodeMailto("x+y@example.com", safe='@,+') == "x+y@example.com"
+
+
+@pytest.mark.parametrize("hidden", [True, False, "y", "x", "true", "false", "0", "", None])
+def testWifiHiddenMatchesBatchFormatter(hidden):
+    data = {'ssid': 'Cafe; Guest', 'password': 'p:w', 'security': 'WPA', 'hidden': hidden}
+    single = QRGeneratorModel().formatContent(QRType.WIFI, data)
+    batch = BatchFormatter(QRType.WIFI).formatColumns({key: [value] for key, value in data.items()})
+    assert list(batch) == [single]
+
+
+def testWifiLineBreakRejectedInBatch():
+    with pytest.raises(ValueError):
+        list(BatchFormatter(QRType.WIFI).formatColumns({'ssid': ["ok", "bad\nssid"]}))
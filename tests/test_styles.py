@@ -0,0 +1,67 @@
+from PIL import Image
+
+from core.models import RenderOptions
+from core.qr_generator import QRGenerator
+from core.styles import ModuleDrawer, StampDrawer, callWithQuality, registerStyle, upscale
+
+
+class LegacyStampDrawer(StampDrawer):
+    """Plugin written against the API before quality levels"""
+    
+    def stamp(self, modulePx):
+        return Image.new('L', (modulePx, modulePx), 255)
+
+
+class KeywordOnlyDrawer(ModuleDrawer):
+    """Plugin taking the quality as a keyword-only argument"""
+    
+    def __init__(self):
+        self.qualities = []
+    
+    def paint(self, modules, modulePx, *, quality='high'):
+        self.qualities.append(quality)
+        return upscale(modules, modulePx)
+
+
+class ExtraParameterDrawer(ModuleDrawer):
+    """Plugin with an unrelated optional positional parameter"""
+    
+    def __init__(self):
+        self.levels = []
+    
+    def paint(self, modules, modulePx, level=0):
+        self.levels.append(level)
+        return upscale(modules, modulePx)
+
+
+def render(style: str, quality: str) -> Image.Image:
+    return QRGenerator.generate("styles", **RenderOptions(style=style, quality=quality).toKwargs())
+
+
+def testLegacyDrawerRendersAtEveryQuality():
+    registerStyle("Test Legacy", LegacyStampDrawer(), replace=True)
+    assert render("Test Legacy", "none").tobytes() == render("Test Legacy", "high").tobytes()
+
+
+def testKeywordOnlyDrawerReceivesQuality():
+    drawer = KeywordOnlyDrawer()
+    registerStyle("Test Keyword", drawer, replace=True)
+    render("Test Keyword", "fast")
+    assert drawer.qualities == ['fast']
+
+
+def testExtraPositionalParameterIsLeftAlone():
+    drawer = ExtraParameterDrawer()
+    registerStyle("Test Extra", drawer, replace=True)
+    render("Test Extra", "none")
+    assert drawer.levels == [0]
+
+
+def testKeywordArgumentsReceiveQuality():
+    received = {}
+    
+    def paint(modules, modulePx, **options):
+        received.update(options)
+    
+    callWithQuality(paint, None, 1, quality='none')
+    assert received == {'quality': 'none'}
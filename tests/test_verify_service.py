@@ -0,0 +1,37 @@
+import pytest
+from PIL import Image
+
+from core.models import ErrorCorrection, RenderOptions
+from core.qr_layout import layoutFor
+from services.verify_service import CodeVerifier, _codewordBlocks
+
+
+@pytest.mark.parametrize("version, level, capacity", [
+    (1, ErrorCorrection.LOW, 2),
+    (1, ErrorCorrection.MEDIUM, 4),
+    (1, ErrorCorrection.QUARTILE, 6),
+    (1, ErrorCorrection.HIGH, 8),
+    (2, ErrorCorrection.LOW, 4),
+    (2, ErrorCorrection.MEDIUM, 8),
+    (3, ErrorCorrection.LOW, 7),
+    (4, ErrorCorrection.LOW, 10),
+])
+def testCapacityLeavesMisdecodeProtection(version, level, capacity):
+    assert set(_codewordBlocks(version, level.value[0])[1]) == {capacity}
+
+
+def damagedCode(verifier: CodeVerifier, payload: str, codewords: int) -> Image.Image:
+    """One pixel per module, with the first bit of the first few codewords flipped"""
+    version, expected = verifier._expected(payload, verifier.options.errorCorrection, 21, 0)
+    modules = bytearray(expected)
+    placement = layoutFor(version).placement
+    for codeword in range(codewords):
+        modules[placement[codeword * 8]] ^= 1
+    return Image.frombytes('L', (21, 21), bytes(0 if module else 255 for module in modules))
+
+
+@pytest.mark.parametrize("codewords, ok", [(2, True), (3, False)])
+def testVersionOneLowRepairsTwoCodewords(codewords, ok):
+    verifier = CodeVerifier(RenderOptions(errorCorrection=ErrorCorrection.LOW, border=0))
+    result = verifier.verifyImage(damagedCode(verifier, "hi", codewords), "hi")
+    assert (result.ok, result.worstBlockErrors, result.blockCapacity) == (ok, codewords, 2)